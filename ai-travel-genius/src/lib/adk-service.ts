@@ -213,6 +213,82 @@ export const adkService = {
     }
   },
 
+  /**
+   * Generate itinerary over SSE (/run_itinerary_sse)
+   * header -> onStateUpdate, each DailyPlan -> onChunk, summary -> onStateUpdate, done -> onComplete
+   */
+  async generateItineraryStream(userInput: any, callbacks: StreamCallbacks): Promise<TravelItinerary | null> {
+    const userId = generateUserId();
+    const sessionId = generateSessionId();
+    const query = `Create a complete ${userInput.days}-day travel itinerary for ${userInput.destination} with budget ₹${userInput.budget} for ${userInput.groupSize} ${userInput.personality} ${userInput.preferences && userInput.preferences.length > 0? userInput.preferences.join(", "): "no specific preferences"}.`;
+
+    try {
+      const response = await fetch(`${ADK_API_URL}/run_itinerary_sse`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json', 'Accept': 'text/event-stream' },
+        body: JSON.stringify({
+          appName: 'agent',
+          userId: userId,
+          sessionId: sessionId,
+          newMessage: { role: "user", parts: [{ text: query }] }
+        }),
+        signal: callbacks.signal,
+      });
+      if (!response.ok || !response.body) {
+        throw new Error(`Stream request failed with status ${response.status}`);
+      }
+
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      let result: TravelItinerary | null = null;
+
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+          const raw = buffer.slice(0, boundary);
+          buffer = buffer.slice(boundary + 2);
+          const dataLine = raw.split('\n').find(line => line.startsWith('data: '));
+          if (!dataLine) continue;
+
+          const event: SSEEvent = JSON.parse(dataLine.slice(6));
+          switch (event.type) {
+            case 'progress':
+              callbacks.onProgress?.(event.data.message);
+              break;
+            case 'header':
+            case 'summary':
+            case 'reset':
+              callbacks.onStateUpdate?.({ [event.type]: event.data });
+              break;
+            case 'day':
+              callbacks.onChunk?.(event.data);
+              break;
+            case 'done':
+              result = event.data.itinerary;
+              callbacks.onComplete?.(result);
+              break;
+            case 'error':
+              throw new Error(event.data.message || event.data.code);
+          }
+        }
+      }
+
+      return result;
+    } catch (error: any) {
+      if (callbacks.signal?.aborted || error.name === 'AbortError') {
+        return null;
+      }
+      console.error('Error streaming itinerary:', error);
+      callbacks.onError?.(error);
+      throw new Error('Could not generate itinerary. Please try again.');
+    }
+  },
+
   async getSession(userId: string, sessionId: string) {
     try {
       const response = await axios.post(
@@ -0,0 +1,498 @@
+#!/usr/bin/env python3
+"""
+Travel Genius - open-loop load generator.
+
+Same flow and scenarios as traffic_generator.sh (create a session with initial state,
+then POST /run with a "Create a complete N-day travel itinerary ..." message), but driven
+at a target arrival rate instead of one request at a time:
+
+  * open loop: requests start on schedule whether or not earlier ones have finished, so a
+    slow backend shows up as latency and errors instead of silently lowering the load.
+    Latency is measured from the scheduled start (no coordinated omission).
+  * arrival rate: constant (--rate) or a ramp profile (--ramp "0:1,60:20,300:20", pairs of
+    seconds:requests-per-second, linearly interpolated), Poisson or evenly spaced.
+  * thousands of sessions in flight on one pooled aiohttp client (--connections).
+  * HDR-style latency histograms (log-linear buckets, ~1% relative error) for session
+    create, /run and end to end, overall and per scenario.
+  * verdict against the README performance targets (success rate, p95 latency, error rate);
+    exit code 0 = pass (good or acceptable), 1 = poor.
+
+Usage:
+  python load_generator.py --rate 2 --duration 120
+  python load_generator.py --ramp "0:0.5,60:5,240:5" --output results.json
+  API_BASE_URL=http://localhost:8000 python load_generator.py --rate 1 --duration 30 --json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import signal
+import string
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import aiohttp
+
+API_BASE_URL = os.getenv("API_BASE_URL", "https://travel-genius-backend-308693249359.us-central1.run.app")
+APP_NAME = "agent"
+
+SESSION_STATE = {"key1": "value1", "key2": 42}
+SESSION_TIMEOUT_S = 10
+RUN_TIMEOUT_S = 120
+
+# Same scenarios as traffic_generator.sh
+SCENARIOS = [
+    {"name": "tokyo_adventure", "destination": "Tokyo, Japan", "duration": 1, "budget": "90000",
+     "travelers": 2, "personality": "adventure",
+     "preferences": "temples, street food, nightlife, photography spots"},
+    {"name": "dubai_luxury", "destination": "Dubai, UAE", "duration": 2, "budget": "150000",
+     "travelers": 2, "personality": "luxury",
+     "preferences": "five-star hotels, fine dining, private tours, spa"},
+    {"name": "kyoto_cultural", "destination": "Kyoto, Japan", "duration": 3, "budget": "80000",
+     "travelers": 2, "personality": "cultural",
+     "preferences": "temples, tea ceremonies, traditional gardens, local crafts"},
+    {"name": "bangkok_party", "destination": "Bangkok, Thailand", "duration": 2, "budget": "60000",
+     "travelers": 4, "personality": "party",
+     "preferences": "nightlife, street markets, affordable hostels, rooftop bars"},
+]
+
+# README "Performance Targets"
+SUCCESS_RATE_TARGETS = {"good": 98.0, "acceptable": 95.0}  # percent, higher is better
+LATENCY_TARGETS_S = {"good": 4.0, "acceptable": 6.0}       # p95 end to end, lower is better
+ERROR_RATE_TARGETS = {"good": 2.0, "acceptable": 5.0}      # percent, lower is better
+
+PERCENTILE_LADDER = (50.0, 75.0, 90.0, 95.0, 99.0, 99.9, 99.99, 100.0)
+
+
+def request_text(scenario: Dict[str, Any]) -> str:
+    preferences = scenario["preferences"]
+    if preferences == "no specific preferences" or not preferences:
+        return (f"Create a complete {scenario['duration']}-day travel itinerary for {scenario['destination']} "
+                f"with budget ₹{scenario['budget']} for {scenario['travelers']} {scenario['personality']} "
+                f"no specific preferences.")
+    return (f"Create a complete {scenario['duration']}-day travel itinerary for {scenario['destination']} "
+            f"with budget ₹{scenario['budget']} for {scenario['travelers']} {scenario['personality']} "
+            f"travelers with preferences for {preferences}.")
+
+
+def generate_ids(rng: random.Random) -> Tuple[str, str]:
+    timestamp = int(time.time() * 1000)
+    suffix = "".join(rng.choices(string.ascii_lowercase + string.digits, k=8))
+    return f"u_{timestamp}_{suffix}", f"s_{timestamp}_{suffix}"
+
+
+# ==============================================================================
+# HDR-style histogram
+# ==============================================================================
+
+class LatencyHistogram:
+    """
+    Log-linear histogram in the HdrHistogram layout: values (microseconds) are bucketed by
+    power of two, each power split into 2^sub_bits linear sub-buckets, so every recorded value
+    is kept to within 1 / 2^(sub_bits-1) relative error at any magnitude (sub_bits=8: < 1%).
+    Memory is bounded by the number of distinct buckets hit, not the number of samples.
+    """
+
+    def __init__(self, sub_bits: int = 8):
+        self.sub_bits = sub_bits
+        self.counts: Dict[Tuple[int, int], int] = {}
+        self.count = 0
+        self.total_us = 0
+        self.min_us: Optional[int] = None
+        self.max_us = 0
+
+    def record(self, seconds: float) -> None:
+        value = max(0, int(seconds * 1_000_000))
+        shift = max(0, value.bit_length() - self.sub_bits)
+        key = (shift, value >> shift)
+        self.counts[key] = self.counts.get(key, 0) + 1
+        self.count += 1
+        self.total_us += value
+        self.min_us = value if self.min_us is None else min(self.min_us, value)
+        self.max_us = max(self.max_us, value)
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        for key, n in other.counts.items():
+            self.counts[key] = self.counts.get(key, 0) + n
+        self.count += other.count
+        self.total_us += other.total_us
+        if other.min_us is not None:
+            self.min_us = other.min_us if self.min_us is None else min(self.min_us, other.min_us)
+        self.max_us = max(self.max_us, other.max_us)
+
+    @staticmethod
+    def _bucket_value_us(key: Tuple[int, int]) -> float:
+        shift, sub = key
+        return ((sub << shift) + ((1 << shift) - 1) / 2) if shift else float(sub)
+
+    def percentile(self, p: float) -> float:
+        """Value in ms at percentile p (0-100)."""
+        if not self.count:
+            return 0.0
+        if p >= 100:
+            return self.max_us / 1000
+        rank = max(1, math.ceil(p / 100 * self.count))
+        seen = 0
+        for key in sorted(self.counts):
+            seen += self.counts[key]
+            if seen >= rank:
+                return min(self._bucket_value_us(key), self.max_us) / 1000
+        return self.max_us / 1000
+
+    def summary(self) -> Dict[str, Any]:
+        if not self.count:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "min_ms": round(self.min_us / 1000, 2),
+            "mean_ms": round(self.total_us / self.count / 1000, 2),
+            "max_ms": round(self.max_us / 1000, 2),
+            "percentiles_ms": {f"p{p:g}": round(self.percentile(p), 2) for p in PERCENTILE_LADDER},
+        }
+
+    def export(self) -> Dict[str, Any]:
+        """Summary plus the raw non-empty buckets as [value_ms, count], mergeable across runs."""
+        return {**self.summary(), "buckets": [[round(self._bucket_value_us(k) / 1000, 3), self.counts[k]]
+                                              for k in sorted(self.counts)]}
+
+
+# ==============================================================================
+# Arrival schedule
+# ==============================================================================
+
+def parse_ramp(spec: str) -> List[Tuple[float, float]]:
+    """'0:1,60:20,300:20' -> [(0, 1), (60, 20), (300, 20)] (seconds, requests per second)."""
+    points = []
+    for part in spec.split(","):
+        at, _, rate = part.strip().partition(":")
+        if not rate:
+            raise ValueError(f"ramp point '{part}' is not seconds:rate")
+        points.append((float(at), float(rate)))
+    points.sort()
+    if not points or points[0][0] > 0:
+        points.insert(0, (0.0, points[0][1] if points else 0.0))
+    if any(rate < 0 for _, rate in points):
+        raise ValueError("ramp rates must be >= 0")
+    return points
+
+
+def rate_at(points: List[Tuple[float, float]], t: float) -> float:
+    if t >= points[-1][0]:
+        return points[-1][1]
+    for (t0, r0), (t1, r1) in zip(points, points[1:]):
+        if t0 <= t < t1:
+            return r0 + (r1 - r0) * (t - t0) / (t1 - t0) if t1 > t0 else r1
+    return points[0][1]
+
+
+def next_gap(rate: float, arrival: str, rng: random.Random) -> float:
+    return rng.expovariate(rate) if arrival == "poisson" else 1.0 / rate
+
+
+# ==============================================================================
+# Load run
+# ==============================================================================
+
+class LoadRun:
+    def __init__(self, args):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.scenarios = [s for s in SCENARIOS if not args.scenario or s["name"] in args.scenario]
+        self.histograms = {phase: LatencyHistogram() for phase in ("session_create", "run", "end_to_end")}
+        self.per_scenario: Dict[str, LatencyHistogram] = {s["name"]: LatencyHistogram() for s in self.scenarios}
+        self.outcomes: Dict[str, int] = {}
+        self.per_scenario_outcomes: Dict[str, Dict[str, int]] = {s["name"]: {} for s in self.scenarios}
+        self.scheduled = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.stop = asyncio.Event()
+        self.started_at = 0.0
+        self.schedule_seconds = 0.0
+        self.wall_seconds = 0.0
+
+    def _count(self, scenario: str, outcome: str) -> None:
+        self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+        bucket = self.per_scenario_outcomes[scenario]
+        bucket[outcome] = bucket.get(outcome, 0) + 1
+
+    async def one_request(self, http: aiohttp.ClientSession, scenario: Dict[str, Any], scheduled: float) -> None:
+        base = self.args.base_url.rstrip("/")
+        user_id, session_id = generate_ids(self.rng)
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        outcome = "incomplete"  # only a 200 from /run makes it "ok"
+        try:
+            started = time.perf_counter()
+            async with http.post(f"{base}/apps/{APP_NAME}/users/{user_id}/sessions/{session_id}",
+                                 json={"state": SESSION_STATE},
+                                 timeout=aiohttp.ClientTimeout(total=self.args.session_timeout)) as resp:
+                await resp.read()
+                if resp.status not in (200, 201):
+                    outcome = f"session_http_{resp.status}"
+                    return
+            self.histograms["session_create"].record(time.perf_counter() - started)
+
+            payload = {"appName": APP_NAME, "userId": user_id, "sessionId": session_id,
+                       "newMessage": {"role": "user", "parts": [{"text": request_text(scenario)}]}}
+            started = time.perf_counter()
+            async with http.post(f"{base}/run", json=payload,
+                                 timeout=aiohttp.ClientTimeout(total=self.args.timeout)) as resp:
+                await resp.read()
+                if resp.status != 200:
+                    outcome = f"http_{resp.status}"
+                    return
+            outcome = "ok"
+            finished = time.perf_counter()
+            self.histograms["run"].record(finished - started)
+            self.histograms["end_to_end"].record(finished - scheduled)
+            self.per_scenario[scenario["name"]].record(finished - scheduled)
+        except asyncio.TimeoutError:
+            outcome = "timeout"
+        except aiohttp.ClientError as e:
+            outcome = f"connection_{type(e).__name__}"
+        except asyncio.CancelledError:
+            outcome = "cancelled"  # still in flight when the run was stopped
+            raise
+        finally:
+            self.in_flight -= 1
+            self._count(scenario["name"], outcome)
+
+    async def report_progress(self) -> None:
+        while not self.stop.is_set():
+            try:
+                await asyncio.wait_for(self.stop.wait(), timeout=self.args.progress_interval)
+            except asyncio.TimeoutError:
+                pass
+            if self.args.json:
+                continue
+            done = sum(self.outcomes.values())
+            ok = self.outcomes.get("ok", 0)
+            e2e = self.histograms["end_to_end"]
+            print(f"[Load] ⏱️ t={time.perf_counter() - self.started_at:6.1f}s scheduled={self.scheduled} "
+                  f"done={done} ok={ok} in_flight={self.in_flight} "
+                  f"p50={e2e.percentile(50) / 1000:.2f}s p95={e2e.percentile(95) / 1000:.2f}s", flush=True)
+
+    async def run(self) -> None:
+        args = self.args
+        points = parse_ramp(args.ramp) if args.ramp else [(0.0, args.rate)]
+        duration = args.duration if args.duration else (points[-1][0] if args.ramp else 60.0)
+
+        connector = aiohttp.TCPConnector(limit=args.connections, limit_per_host=0, ttl_dns_cache=300)
+        tasks = set()
+        async with aiohttp.ClientSession(connector=connector) as http:
+            await self.check_health(http)
+            self.started_at = time.perf_counter()
+            progress = asyncio.create_task(self.report_progress())
+
+            next_at = self.started_at
+            while not self.stop.is_set():
+                elapsed = next_at - self.started_at
+                if elapsed >= duration or (args.max_requests and self.scheduled >= args.max_requests):
+                    break
+                rate = rate_at(points, elapsed)
+                if rate <= 0:
+                    next_at += 0.1  # idle segment of the ramp
+                    continue
+                delay = next_at - time.perf_counter()
+                if delay > 0:
+                    try:
+                        await asyncio.wait_for(self.stop.wait(), timeout=delay)
+                        break
+                    except asyncio.TimeoutError:
+                        pass
+                scenario = self.scenarios[self.scheduled % len(self.scenarios)] if args.round_robin \
+                    else self.rng.choice(self.scenarios)
+                self.scheduled += 1
+                if self.in_flight >= args.max_in_flight:
+                    # Client-side saturation: keep the open-loop schedule and count the miss
+                    self._count(scenario["name"], "dropped_client_saturated")
+                else:
+                    task = asyncio.create_task(self.one_request(http, scenario, next_at))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                next_at += next_gap(rate, args.arrival, self.rng)
+
+            self.schedule_seconds = time.perf_counter() - self.started_at
+            if tasks:
+                if not args.json:
+                    print(f"[Load] ⏳ Draining {len(tasks)} in-flight requests...", flush=True)
+                await asyncio.wait(tasks, timeout=args.timeout + args.session_timeout)
+                stragglers = list(tasks)
+                for task in stragglers:
+                    task.cancel()
+                # Let them record their "cancelled" outcome before the results are read
+                await asyncio.gather(*stragglers, return_exceptions=True)
+            self.wall_seconds = time.perf_counter() - self.started_at
+            self.stop.set()
+            await progress
+
+    async def check_health(self, http: aiohttp.ClientSession) -> None:
+        if self.args.json:
+            return
+        print("[Load] 🔍 Testing API connectivity...", flush=True)
+        try:
+            async with http.get(f"{self.args.base_url.rstrip('/')}/health",
+                                timeout=aiohttp.ClientTimeout(total=5)) as resp:
+                if resp.status == 200:
+                    print("[Load] ✅ API is reachable", flush=True)
+                    return
+                print(f"[Load] ⚠️ API health check failed (HTTP {resp.status}). Continuing anyway...")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"[Load] ⚠️ API health check failed ({type(e).__name__}). Continuing anyway...")
+
+    def results(self) -> Dict[str, Any]:
+        completed = sum(self.outcomes.values())
+        ok = self.outcomes.get("ok", 0)
+        success_rate = 100.0 * ok / completed if completed else 0.0
+        p95_s = self.histograms["end_to_end"].percentile(95) / 1000
+        return {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "base_url": self.args.base_url,
+            "config": {
+                "rate": self.args.rate, "ramp": self.args.ramp, "duration_s": self.args.duration,
+                "arrival": self.args.arrival, "connections": self.args.connections,
+                "max_in_flight": self.args.max_in_flight, "max_requests": self.args.max_requests,
+                "timeout_s": self.args.timeout, "seed": self.args.seed,
+                "scenarios": [s["name"] for s in self.scenarios],
+            },
+            "scheduled": self.scheduled,
+            "completed": completed,
+            "outcomes": dict(sorted(self.outcomes.items())),
+            "offered_rps": round(self.scheduled / self.schedule_seconds, 3) if self.schedule_seconds else 0.0,
+            "achieved_rps": round(ok / self.wall_seconds, 3) if self.wall_seconds else 0.0,
+            "wall_seconds": round(self.wall_seconds, 2),
+            "peak_in_flight": self.peak_in_flight,
+            "success_rate": round(success_rate, 2),
+            "latency": {phase: h.export() for phase, h in self.histograms.items()},
+            "scenarios": {name: {"outcomes": self.per_scenario_outcomes[name], **h.summary()}
+                          for name, h in self.per_scenario.items()},
+            "verdict": verdict(success_rate, p95_s, completed),
+        }
+
+
+def grade(value: float, targets: Dict[str, float], higher_is_better: bool) -> str:
+    for level in ("good", "acceptable"):
+        if (value >= targets[level]) if higher_is_better else (value < targets[level]):
+            return level
+    return "poor"
+
+
+def verdict(success_rate: float, p95_s: float, completed: int) -> Dict[str, Any]:
+    if not completed:
+        return {"result": "fail", "reason": "no requests completed"}
+    checks = {
+        "success_rate": {"value": round(success_rate, 2), "targets": SUCCESS_RATE_TARGETS,
+                         "grade": grade(success_rate, SUCCESS_RATE_TARGETS, True)},
+        "latency_p95_s": {"value": round(p95_s, 3), "targets": LATENCY_TARGETS_S,
+                          "grade": grade(p95_s, LATENCY_TARGETS_S, False)},
+        "error_rate": {"value": round(100.0 - success_rate, 2), "targets": ERROR_RATE_TARGETS,
+                       "grade": grade(100.0 - success_rate, ERROR_RATE_TARGETS, False)},
+    }
+    grades = [c["grade"] for c in checks.values()]
+    overall = "poor" if "poor" in grades else "acceptable" if "acceptable" in grades else "good"
+    return {"result": "fail" if overall == "poor" else "pass", "grade": overall, "checks": checks}
+
+
+def print_report(results: Dict[str, Any]) -> None:
+    line = "═" * 64
+    print(f"\n{line}\n📊 Load Generation Results\n{line}")
+    print(f"Scheduled: {results['scheduled']}   Completed: {results['completed']}   "
+          f"Peak in flight: {results['peak_in_flight']}")
+    print(f"Offered: {results['offered_rps']} rps   Achieved: {results['achieved_rps']} rps   "
+          f"Wall: {results['wall_seconds']}s")
+    print(f"Outcomes: {results['outcomes']}")
+    print(f"\n{'latency (ms)':<16}{'count':>8}" + "".join(f"{f'p{p:g}':>10}" for p in PERCENTILE_LADDER))
+    rows = [(phase, h) for phase, h in results["latency"].items()]
+    rows += [(f"  {name}", s) for name, s in results["scenarios"].items()]
+    for name, summary in rows:
+        pcts = summary.get("percentiles_ms", {})
+        print(f"{name:<16}{summary['count']:>8}" + "".join(f"{pcts.get(f'p{p:g}', 0):>10.0f}"
+                                                            for p in PERCENTILE_LADDER))
+    v = results["verdict"]
+    print()
+    for check, info in v.get("checks", {}).items():
+        print(f"  {check:<15} {info['value']:>8}  {info['grade']}")
+    icon = "✅" if v["result"] == "pass" else "❌"
+    print(f"\n{icon} Verdict: {v['result'].upper()} ({v.get('grade', v.get('reason'))})\n{line}")
+
+
+def raise_fd_limit(wanted: int) -> None:
+    """Each pooled connection is a file descriptor; lift the soft limit toward the hard one."""
+    try:
+        import resource
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        target = wanted if hard == resource.RLIM_INFINITY else min(wanted, hard)
+        if soft != resource.RLIM_INFINITY and soft < target:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+    except (ImportError, ValueError, OSError):
+        pass
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default=API_BASE_URL, help="API base URL (default: $API_BASE_URL)")
+    parser.add_argument("--rate", type=float, default=1.0, help="constant arrival rate, requests/s")
+    parser.add_argument("--ramp", help="ramp profile 'seconds:rate,...' (overrides --rate)")
+    parser.add_argument("--duration", type=float, default=0,
+                        help="seconds to keep scheduling (default: end of --ramp, else 60)")
+    parser.add_argument("--arrival", choices=("poisson", "constant"), default="poisson")
+    parser.add_argument("--max-requests", type=int, default=0, help="stop scheduling after N requests")
+    parser.add_argument("--connections", type=int, default=1000, help="connection pool size")
+    parser.add_argument("--max-in-flight", type=int, default=5000,
+                        help="requests over this many in flight are counted as dropped, not queued")
+    parser.add_argument("--timeout", type=float, default=RUN_TIMEOUT_S, help="/run timeout, seconds")
+    parser.add_argument("--session-timeout", type=float, default=SESSION_TIMEOUT_S)
+    parser.add_argument("--scenario", action="append", choices=[s["name"] for s in SCENARIOS],
+                        help="limit to these scenarios (repeatable)")
+    parser.add_argument("--round-robin", action="store_true", help="cycle scenarios instead of random choice")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--progress-interval", type=float, default=10.0)
+    parser.add_argument("--json", action="store_true", help="print machine-readable results only")
+    parser.add_argument("--output", help="also write the JSON results to this file")
+    args = parser.parse_args()
+    if not args.ramp and args.rate <= 0:
+        parser.error("--rate must be > 0")
+    if args.ramp:
+        try:
+            parse_ramp(args.ramp)
+        except ValueError as e:
+            parser.error(str(e))
+
+    raise_fd_limit(args.connections + 256)
+    load = LoadRun(args)
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, load.stop.set)  # stop scheduling, then drain
+            except (NotImplementedError, RuntimeError):
+                pass
+        await load.run()
+
+    if not args.json:
+        print(f"[Load] 🎯 Base URL: {args.base_url}")
+        print(f"[Load] 📊 Arrivals: {args.ramp or f'{args.rate} rps'} ({args.arrival}), "
+              f"pool={args.connections}, max_in_flight={args.max_in_flight}")
+    asyncio.run(run())
+    results = load.results()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_report(results)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        if not args.json:
+            print(f"[Load] 💾 Results written to {args.output}")
+    return 0 if results["verdict"]["result"] == "pass" else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
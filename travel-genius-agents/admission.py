@@ -0,0 +1,214 @@
+# admission.py
+import asyncio
+import json
+import math
+import os
+import time
+from collections import Counter, OrderedDict, deque
+from typing import Any, Deque, Dict, Optional
+
+# Every admitted request starts a full agent pipeline (seven Gemini calls), so the cap is
+# per worker process and deliberately small. Requests beyond it wait in a bounded queue
+# that is drained round-robin across users; anything that cannot be served in time gets
+# an immediate 429 with Retry-After instead of a slow timeout.
+ADMISSION_MAX_INFLIGHT = int(os.getenv("ADMISSION_MAX_INFLIGHT", "8"))
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "32"))
+ADMISSION_MAX_QUEUED_PER_USER = int(os.getenv("ADMISSION_MAX_QUEUED_PER_USER", "4"))
+ADMISSION_MAX_QUEUE_WAIT_S = float(os.getenv("ADMISSION_MAX_QUEUE_WAIT_S", "10"))
+
+# Endpoints that start a pipeline run
+ADMISSION_PATHS = ("/run", "/run_sse", "/run_itinerary_sse")
+
+_WAIT_SAMPLES = 1000
+
+
+class Rejected(Exception):
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """In-flight cap + bounded per-user fair wait queue for pipeline runs (one per process)."""
+
+    def __init__(self, max_inflight: int = ADMISSION_MAX_INFLIGHT, max_queue: int = ADMISSION_MAX_QUEUE,
+                 max_queued_per_user: int = ADMISSION_MAX_QUEUED_PER_USER,
+                 max_queue_wait: float = ADMISSION_MAX_QUEUE_WAIT_S):
+        self.max_inflight = max_inflight
+        self.max_queue = max_queue
+        self.max_queued_per_user = max_queued_per_user
+        self.max_queue_wait = max_queue_wait
+        self.inflight = 0
+        self.queued = 0
+        # user -> waiters; dict order is the round-robin rotation
+        self._queues: "OrderedDict[str, Deque[asyncio.Future]]" = OrderedDict()
+        self._waits: Deque[float] = deque(maxlen=_WAIT_SAMPLES)
+        self._service_ewma = 20.0  # seconds per pipeline run, refined as runs complete
+        self.counters = Counter()
+
+    # ---------- ADMISSION ----------
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely free for a request arriving now."""
+        backlog = (self.queued + 1) / max(1, self.max_inflight)
+        return max(1, min(120, math.ceil(self._service_ewma * backlog)))
+
+    def _reject(self, reason: str) -> Rejected:
+        self.counters[f"rejected.{reason}"] += 1
+        self.counters["rejected"] += 1
+        return Rejected(reason, self.retry_after())
+
+    async def acquire(self, user: str) -> float:
+        """Wait for a slot; returns seconds spent queued or raises Rejected."""
+        if self.inflight < self.max_inflight and self.queued == 0:
+            self.inflight += 1
+            self._admitted(0.0)
+            return 0.0
+        if self.queued >= self.max_queue:
+            raise self._reject("queue_full")
+        waiters = self._queues.setdefault(user, deque())
+        if len(waiters) >= self.max_queued_per_user:
+            raise self._reject("user_queue_full")
+
+        fut = asyncio.get_running_loop().create_future()
+        waiters.append(fut)
+        self.queued += 1
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(fut, timeout=self.max_queue_wait)
+        except BaseException as e:
+            self._forget(user, fut)
+            if fut.done() and not fut.cancelled():
+                self.release()  # slot was granted as we gave up; hand it on
+            if isinstance(e, asyncio.TimeoutError):
+                raise self._reject("queue_timeout") from None
+            raise
+        waited = time.perf_counter() - started
+        self._admitted(waited)
+        return waited
+
+    def release(self, service_seconds: Optional[float] = None) -> None:
+        self.inflight -= 1
+        if service_seconds is not None:
+            self._service_ewma = 0.8 * self._service_ewma + 0.2 * service_seconds
+            self.counters["completed"] += 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        while self.inflight < self.max_inflight and self._queues:
+            user, waiters = self._queues.popitem(last=False)
+            fut = waiters.popleft()
+            self.queued -= 1
+            if waiters:
+                self._queues[user] = waiters  # back of the rotation
+            if fut.done():
+                continue
+            self.inflight += 1
+            fut.set_result(None)
+
+    def _forget(self, user: str, fut: asyncio.Future) -> None:
+        waiters = self._queues.get(user)
+        if waiters and fut in waiters:
+            waiters.remove(fut)
+            self.queued -= 1
+            if not waiters:
+                del self._queues[user]
+
+    def _admitted(self, waited: float) -> None:
+        self.counters["admitted"] += 1
+        self._waits.append(waited)
+
+    # ---------- METRICS ----------
+    def stats(self) -> Dict[str, Any]:
+        waits = sorted(self._waits)
+
+        def pct(p: float) -> float:
+            return round(waits[min(len(waits) - 1, int(p * len(waits)))] * 1000, 1) if waits else 0.0
+
+        return {
+            "inflight": self.inflight,
+            "max_inflight": self.max_inflight,
+            "queue_depth": self.queued,
+            "max_queue": self.max_queue,
+            "queued_users": len(self._queues),
+            "max_queue_wait_s": self.max_queue_wait,
+            **self.counters,
+            "wait_ms": {"p50": pct(0.50), "p95": pct(0.95), "max": pct(1.0),
+                        "avg": round(sum(waits) / len(waits) * 1000, 1) if waits else 0.0},
+            "avg_service_s": round(self._service_ewma, 2),
+        }
+
+
+admission_controller = AdmissionController()
+
+
+def _user_id(body: bytes, scope) -> str:
+    try:
+        user = json.loads(body).get("userId")
+        if user:
+            return str(user)
+    except (ValueError, AttributeError):
+        pass
+    client = scope.get("client")
+    return f"ip:{client[0]}" if client else "anonymous"
+
+
+class AdmissionMiddleware:
+    """Pure ASGI (so /run_sse streams are not buffered); the slot is held until the response ends."""
+
+    def __init__(self, app, controller: AdmissionController = admission_controller, paths=ADMISSION_PATHS):
+        self.app = app
+        self.controller = controller
+        self.paths = frozenset(paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        # Buffer the (small) JSON body to read userId, then replay it to the app
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body"):
+                break
+        body = b"".join(chunks)
+        replayed = False
+
+        async def replay():
+            nonlocal replayed
+            if not replayed:
+                replayed = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        try:
+            waited = await self.controller.acquire(_user_id(body, scope))
+        except Rejected as r:
+            print(f"[Admission] 🚦 Rejected {scope['path']} ({r.reason}), retry after {r.retry_after}s")
+            await self._reject(send, r)
+            return
+
+        started = time.perf_counter()
+        try:
+            if waited > 1:
+                print(f"[Admission] Admitted {scope['path']} after {waited:.1f}s in queue")
+            await self.app(scope, replay, send)
+        finally:
+            self.controller.release(time.perf_counter() - started)
+
+    @staticmethod
+    async def _reject(send, r: Rejected) -> None:
+        payload = json.dumps({"error": "Too many itinerary requests in progress, please retry shortly",
+                              "reason": r.reason, "retry_after": r.retry_after}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [(b"content-type", b"application/json"),
+                        (b"retry-after", str(r.retry_after).encode()),
+                        (b"content-length", str(len(payload)).encode())],
+        })
+        await send({"type": "http.response.body", "body": payload})
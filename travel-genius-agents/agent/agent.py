@@ -5,8 +5,6 @@ import os
 from dotenv import load_dotenv
 import nest_asyncio
 import atexit
-from pydantic import BaseModel, Field
-from typing import List, Optional, Literal
 from datetime import datetime
 from google.adk.tools import google_search_tool
 
@@ -20,6 +18,8 @@ sys.path.insert(0, project_root)
 
 
 from toolbox_core import ToolboxSyncClient
+from utils.forksafe import after_fork
+from utils.fault_injection import fault_injector, fault_injection_plugin
 
 from ddtrace.llmobs import LLMObs
 from ddtrace import tracer, config
@@ -70,51 +70,10 @@ except Exception as e:
 # PYDANTIC MODELS FOR STRUCTURED OUTPUT
 # ============================================
 
-class Activity(BaseModel):
-    """Individual activity in the itinerary"""
-    id: str = Field(description="Unique identifier for the activity")
-    title: str = Field(description="Activity title with emoji")
-    description: str = Field(description="Detailed description of the activity")
-    cost: int = Field(description="Cost in local currency", ge=0)
-    duration: str = Field(description="Duration of the activity (e.g., '3-4 hours')")
-    type: Literal["adventure", "food", "cultural", "instagram", "relaxation", "shopping", "nightlife"] = Field(
-        description="Type of activity"
-    )
-    timing: str = Field(description="Time slot for the activity (e.g., '9:00 AM - 1:00 PM')")
-    rating: float = Field(description="Activity rating from 0.0 to 5.0", ge=0.0, le=5.0)
-
-class DailyWeatherSummary(BaseModel):
-    """Weather summary for a specific day"""
-    condition: str = Field(description="Weather condition (e.g., 'Sunny', 'Partly Cloudy', 'Rainy')")
-    outdoorScore: int = Field(description="Weather suitability score for outdoor activities (1-10)", ge=1, le=10)
-    indoorScore: int = Field(description="Weather suitability score for indoor activities (1-10)", ge=1, le=10)
-    recommendations: List[str] = Field(description="Weather-specific recommendations for the day")
-
-class DailyPlan(BaseModel):
-    """Daily plan with activities and weather summary"""
-    day: int = Field(description="Day number", ge=1)
-    activities: List[Activity] = Field(description="List of activities for the day (2-4 activities)", min_items=2, max_items=4)
-    weatherSummary: DailyWeatherSummary = Field(description="Weather summary for this day")
-
-class OverallWeatherSummary(BaseModel):
-    """Overall weather summary for the entire trip"""
-    overallScore: float = Field(description="Overall weather score (0.0-10.0)", ge=0.0, le=10.0)
-    suitableForOutdoor: bool = Field(description="Whether weather is suitable for outdoor activities")
-    alerts: List[str] = Field(description="Weather alerts or warnings", default_factory=list)
-    recommendations: List[str] = Field(description="General weather recommendations for the trip")
-
-class TravelItinerary(BaseModel):
-    """Complete travel itinerary with structured data"""
-    tripTitle: str = Field(description="Title of the trip itinerary")
-    totalEstimatedCost: int = Field(description="Total estimated cost in local currency", ge=0)
-    dailyPlans: List[DailyPlan] = Field(description="List of daily plans", min_items=1)
-    weatherOptimized: bool = Field(description="Whether the itinerary is weather-optimized", default=True)
-    sustainabilityScore: float = Field(description="Sustainability score (0.0-10.0)", ge=0.0, le=10.0)
-    weatherSummary: OverallWeatherSummary = Field(description="Overall weather summary")
-    aiRecommendations: List[str] = Field(description="AI-generated recommendations for the trip")
-    instagramSpots: List[str] = Field(description="Instagram-worthy spots to visit", default_factory=list)
-    generatedBy: str = Field(description="Name of the system that generated the itinerary", default="AI Travel Genius")
-    generatedAt: str = Field(description="ISO 8601 timestamp when itinerary was generated")
+from models import (
+    Activity, DailyWeatherSummary, DailyPlan, OverallWeatherSummary,
+    TravelItinerary, ItineraryAssistantResponse
+)
 
 
 # ============================================
@@ -138,17 +97,26 @@ def cleanup_toolbox():
 # Register cleanup
 atexit.register(cleanup_toolbox)
 
-try:
-    toolbox = ToolboxSyncClient(toolbox_url)
-    print("✅ MCP Toolbox connection successful!")
-    travel_tools = toolbox.load_toolset('travel_genius_toolset')
-    print(f"✅ Loaded {len(travel_tools)} travel tools from toolbox")
-except RuntimeError as e:
-    print(f"⚠️  Warning: Failed to load travel tools (RuntimeError): {e}")
-    print("   Continuing without toolbox tools. Agents will use local tools only.")
-except Exception as e:
-    print(f"⚠️  Warning: Failed to load travel tools: {type(e).__name__}: {e}")
-    print("   Continuing without toolbox tools. Agents will use local tools only.")
+def connect_toolbox():
+    """(Re)connect to the MCP toolbox; also run in every forked worker."""
+    global toolbox, travel_tools
+    try:
+        fault = fault_injector.inject_blocking("toolbox", "load_toolset")
+        toolbox = ToolboxSyncClient(toolbox_url)
+        print("✅ MCP Toolbox connection successful!")
+        travel_tools = fault.mangle(toolbox.load_toolset('travel_genius_toolset'))
+        print(f"✅ Loaded {len(travel_tools)} travel tools from toolbox")
+    except RuntimeError as e:
+        print(f"⚠️  Warning: Failed to load travel tools (RuntimeError): {e}")
+        print("   Continuing without toolbox tools. Agents will use local tools only.")
+    except Exception as e:
+        print(f"⚠️  Warning: Failed to load travel tools: {type(e).__name__}: {e}")
+        print("   Continuing without toolbox tools. Agents will use local tools only.")
+
+
+connect_toolbox()
+# The inherited client's session and loop thread are dead in a forked worker
+after_fork(connect_toolbox)
 
 # ============================================
 # TOOL ORGANIZATION - SIMPLIFIED
@@ -162,6 +130,19 @@ except Exception as e:
 from tools.weather_tools import get_weather_analysis
 from google.adk.tools import FunctionTool
 from tools.common_tools import get_accommodation_analysis
+from pipeline.router import TravelGeniusRouter
+from pipeline.budget import BudgetAllocatorAgent
+from pipeline.personality import PersonalityClassifierAgent
+from pipeline.sustainability import SustainabilityEngineAgent
+from pipeline.deadline import DeadlineGuardAgent
+from pipeline.cache import ItineraryCacheAgent
+from utils.itinerary_cache import itinerary_cache
+from utils.agent_memo import memo_callbacks
+from utils.context_projection import context_callbacks
+from utils.itinerary_validator import validate_itinerary_response
+from utils.rate_governor import throttle_model_call
+from utils.instrumentation import metrics_plugin
+from google.adk.apps import App
 
 # Weather tool - ONLY for weather_agent
 weather_tool = [FunctionTool(func=get_weather_analysis)]
@@ -175,7 +156,7 @@ print(f"✅ Other agents will read weather data from context.state.weather_data"
 # SUB-AGENT DEFINITIONS
 # ============================================
 
-personality_agent = Agent(
+personality_llm_agent = Agent(
     name="personality_analyzer",
     model="gemini-2.0-flash",
     description="Analyzes user personality quiz results and travel preferences",
@@ -196,33 +177,24 @@ personality_agent = Agent(
     
     Focus on personality analysis based on user responses. Weather details will be handled by other agents.
     """,
-    tools=[]  # No tools needed - pure personality analysis
+    tools=[],  # No tools needed - pure personality analysis
+    output_key="personality_profile",
+    **context_callbacks()
+)
+
+# Local keyword model first (utils/personality_classifier.py); Gemini only when it is
+# unsure (PERSONALITY_MIN_CONFIDENCE). Both write state.personality_profile.
+personality_agent = PersonalityClassifierAgent(
+    name="personality_classifier",
+    description="Classifies the travel personality locally, falling back to personality_analyzer",
+    llm_agent=personality_llm_agent,
 )
 
-budget_agent = Agent(
+# Budget split is arithmetic on a fixed per-personality table plus a weather contingency;
+# done in Python (pipeline/budget.py) instead of a Gemini turn. Writes state.budget_plan.
+budget_agent = BudgetAllocatorAgent(
     name="budget_optimizer",
-    model="gemini-2.0-flash", 
-    description="Optimizes budget allocation with weather-aware contingency planning",
-    instruction="""
-    You are a travel finance expert who creates realistic budget allocations based on personality and destination data.
-    
-    **READ WEATHER DATA FROM CONTEXT:**
-    - Read weather data from context.state.weather_data (provided by weather_agent)
-    - DO NOT call any weather tools - use the data from context
-    
-    Budget Allocation by Personality:
-    - HERITAGE: 40% transport, 35% accommodation, 20% cultural activities, 5% buffer
-    - ADVENTURE: 35% transport, 25% accommodation, 35% activities/experiences, 5% buffer  
-    - LUXURY: 30% transport, 45% accommodation, 20% premium experiences, 5% buffer
-    - PARTY: 35% transport, 30% accommodation, 30% nightlife/entertainment, 5% buffer
-    - CULTURAL: 40% transport, 30% accommodation, 25% authentic experiences, 5% buffer
-    
-    Weather Contingency (use weather data from context.state.weather_data):
-    - Always allocate 3-5% extra for weather-related changes (indoor alternatives, transport delays)
-    - Suggest flexible bookings during monsoon/winter seasons
-    - Include indoor activity options within the cultural/entertainment budget
-    """,
-    tools=[]  # No tools - reads from context.state.weather_data
+    description="Allocates the budget per category and per day with a weather contingency (no LLM call)",
 )
 
 
@@ -249,35 +221,48 @@ gems_agent = Agent(
     - Local interactions.
     - Weather-appropriate transitions (e.g., "Since the morning is hot, we start at this shaded pottery studio...").
     """,
-    tools=[gems_tool]
+    tools=[gems_tool],
+    **memo_callbacks("gems_discoverer"),  # output_key="hidden_gems", reused across sessions
+    **context_callbacks()
 )
 
 
-sustainability_agent = Agent(
-    name="sustainability_advisor",
-    model="gemini-2.0-flash",
-    description="Evaluates environmental impact including weather-related carbon footprint",
-    instruction="""
-    You are an eco-travel expert focused on sustainable and responsible tourism practices.
-    
-    **READ WEATHER DATA FROM CONTEXT:**
-    - Read weather data from context.state.weather_data (provided by weather_agent)
-    - DO NOT call any weather tools - use the data from context
-    
-    Your Responsibilities:
-    1. Estimate transport carbon footprints based on destination and travel mode
-    2. Prioritize accommodations and activities with high sustainability scores
-    3. Calculate total trip carbon footprint including weather-related adjustments
-    4. Recommend off-peak travel to reduce environmental impact
-    
-    Weather Sustainability Factors (use context.state.weather_data):
-    - Assess seasonal travel patterns from weather data
-    - Consider weather-related transport delays and alternatives
-    - Factor in energy consumption during extreme weather
-    - Encourage shoulder season travel to reduce overcrowding
-    """,
-    tools=[]  
-)
+# Footprint and score come from emission-factor tables and great-circle distance
+# (utils/sustainability.py), no Gemini turn. SUSTAINABILITY_ADVISOR=llm brings back the
+# Gemini advisor. Both write state.sustainability_notes.
+if os.getenv("SUSTAINABILITY_ADVISOR", "engine").lower() == "llm":
+    sustainability_agent = Agent(
+        name="sustainability_advisor",
+        model="gemini-2.0-flash",
+        description="Evaluates environmental impact including weather-related carbon footprint",
+        instruction="""
+        You are an eco-travel expert focused on sustainable and responsible tourism practices.
+        
+        **READ WEATHER DATA FROM CONTEXT:**
+        - Read weather data from context.state.weather_data (provided by weather_agent)
+        - DO NOT call any weather tools - use the data from context
+        
+        Your Responsibilities:
+        1. Estimate transport carbon footprints based on destination and travel mode
+        2. Prioritize accommodations and activities with high sustainability scores
+        3. Calculate total trip carbon footprint including weather-related adjustments
+        4. Recommend off-peak travel to reduce environmental impact
+        
+        Weather Sustainability Factors (use context.state.weather_data):
+        - Assess seasonal travel patterns from weather data
+        - Consider weather-related transport delays and alternatives
+        - Factor in energy consumption during extreme weather
+        - Encourage shoulder season travel to reduce overcrowding
+        """,
+        tools=[],
+        **memo_callbacks("sustainability_advisor"),  # output_key="sustainability_notes"
+        **context_callbacks()
+    )
+else:
+    sustainability_agent = SustainabilityEngineAgent(
+        name="sustainability_advisor",
+        description="Computes the trip carbon footprint and sustainability score (no LLM call)",
+    )
 
 accommodation_agent = Agent(
     name="accommodation_specialist", 
@@ -304,7 +289,9 @@ accommodation_agent = Agent(
     
     Always explain how each property handles different weather conditions.
     """,
-    tools=[accomation_tool]  
+    tools=[accomation_tool],
+    **memo_callbacks("accommodation_specialist"),  # output_key="accommodation_options"
+    **context_callbacks()
 )
 
 # Create weather agent with Datadog instrumentation
@@ -330,15 +317,16 @@ weather_agent = Agent(
     
     **EXAMPLE:**
     If get_weather_analysis returns:
-    {"destination": "Goa", "weather_suitable": true, "weather_score": 8.0, ...}
+    {"v": 1, "dst": "Goa", "ok": true, "sc": 8.0, "cols": [...], "days": [...], ...}
     
     Then your output should be EXACTLY:
-    {"destination": "Goa", "weather_suitable": true, "weather_score": 8.0, ...}
+    {"v": 1, "dst": "Goa", "ok": true, "sc": 8.0, "cols": [...], "days": [...], ...}
     
     DO NOT output: "Here is the weather data: {...}" or any other text.
     """,
     tools=weather_tool,  # Only weather agent has the tool
-    output_key="weather_data"  # Automatically stores in context.state.weather_data
+    output_key="weather_data",  # Automatically stores in context.state.weather_data
+    **context_callbacks()  # Sees only the user request and its own tool call
 )
 
 # ============================================
@@ -354,20 +342,23 @@ itinerary_generator = Agent(
 **EXECUTION FLOW:**
 STEP 1: Read weather data from context.state.weather_data (already provided by weather_planner in previous step)
 STEP 2: Generate the complete itinerary using:
-   - Weather data from context.state.weather_data (parse the JSON string to extract daily_forecast)
+   - Weather data from context.state.weather_data (parse the JSON string; one row per day in "days")
    - User requirements from the original request (destination, duration, budget, preferences)
    - Your travel expertise
 STEP 3: Return the structured TravelItinerary output - execution stops here
 
 **READING WEATHER DATA:**
 - Weather data is stored in context.state.weather_data as a JSON string by weather_planner agent
-- Parse the JSON string to extract: daily_forecast, suitability_scores (outdoor, indoor, beach), recommendations
+- Parse the JSON string to extract the per-day rows, suitability scores (outdoor, indoor, beach) and recommendations
 - DO NOT call any weather tools directly - use the weather data from context.state.weather_data
-- The weather data structure contains:
-  * daily_forecast: array with date, condition, suitability_scores (outdoor, indoor, beach), recommendations
-  * weather_score: overall score (0-10)
-  * weather_suitable: boolean
-  * recommendations: general recommendations
+- The weather data is compact (one array per day, columns named in "cols"):
+  * days: rows of [date, cond, tmin, tmax, tavg, rain (mm), wind, hum, uv, out, in, beach, tips]
+    - out/in/beach are the outdoor/indoor/beach suitability scores (1-10) for that day
+    - tips are indexes into the shared "tips" list of recommendation strings
+  * sc: overall weather score (0-10)
+  * ok: whether the weather is suitable overall (boolean)
+  * rec: general recommendations
+  * alerts: rows of [date, type, message]
 
 **CRITICAL RULES:**
 - ALWAYS include 2-4 activities per day (prefer 3-4 for better experiences)
@@ -375,8 +366,8 @@ STEP 3: Return the structured TravelItinerary output - execution stops here
 - Create SPECIFIC activities with real place names when possible
 - Vary activity types: mix adventure, food, cultural, instagram, relaxation
 - Use weather data to optimize timing (early morning for hot weather, afternoon for indoor activities)
-- Calculate totalEstimatedCost based on user budget and duration
-- Set sustainabilityScore based on transport choices and activity types (8-10 for eco-friendly, 5-7 for standard)
+- Take totalEstimatedCost from context.state.budget_plan.total (the user budget), unless budget_plan.budget_source is "default" (see COST ALLOCATION)
+- Set sustainabilityScore to context.state.sustainability_notes.sustainabilityScore (computed from transport, stay and activity types); if the notes carry no score, use 8-10 for eco-friendly and 5-7 for standard trips
 
 **ACTIVITY GUIDELINES:**
 - Morning (9 AM - 1 PM): Outdoor activities if weather permits, or cultural/indoor alternatives
@@ -388,7 +379,12 @@ STEP 3: Return the structured TravelItinerary output - execution stops here
 - outdoorScore 5-7: Mix outdoor and indoor, use morning/evening for outdoor
 - outdoorScore 1-4: Focus on museums, galleries, indoor markets, cultural centers, shows
 
-**COST ALLOCATION:**(use data from the Budget allocation agent)
+**COST ALLOCATION:** (use context.state.budget_plan, computed exactly from the user's budget)
+- budget_plan.per_day[n] is the spend for day n+1: transport, accommodation, activities, buffer, weather_contingency
+- Keep each day's activity costs within that day's `activities` amount (all travelers together)
+- Set totalEstimatedCost to budget_plan.total
+- If budget_plan.budget_source is "default", the request gave no budget we could read (or gave it in another currency) and the amounts assume ₹50000: use the user's own budget from the request converted to INR (or a realistic one if they gave none) and split it by budget_plan.split_pct instead
+- If budget_plan.days_source is "default", the request gave no trip length we could read and the plan assumes 3 days: plan the number of days the user asked for (3 if they did not say)
 
 **IMPORTANT:**
 - The output_schema enforces termination - once you provide structured TravelItinerary, execution completes
@@ -396,17 +392,38 @@ STEP 3: Return the structured TravelItinerary output - execution stops here
 - DO NOT transfer to budget_optimizer or any other agent - just generate the itinerary""",
     tools=[],  # No tools - reads weather from context.state.weather_data
     output_schema=TravelItinerary,  # This enforces structured output and prevents loops
-    output_key="itinerary"
+    output_key="itinerary",
+    # State block from the earlier agents instead of their full transcripts; near-miss
+    # outputs are repaired against the schema instead of failing the turn
+    **context_callbacks(validate_itinerary_response)
+)
+
+itinerary_assistant = Agent(
+    name="itinerary_assistant",
+    model="gemini-2.0-flash",
+    description="Answers follow-up questions about an itinerary that was already generated",
+    instruction="""You are the Travel Genius assistant. The user already has this itinerary:
+
+{itinerary}
+
+Answer the user's latest question about it (cheaper options, alternatives, swaps, timing, tips).
+- Keep the answer short and specific to the itinerary above
+- If the question is about a particular day or activity, set `day` and `activity`
+- Do NOT regenerate the whole itinerary and do NOT call any tools""",
+    tools=[],
+    include_contents="none",  # The itinerary in the instruction is all the context it needs
+    output_schema=ItineraryAssistantResponse,
+    output_key="assistant_response",
+    before_model_callback=throttle_model_call
 )
 
 # ============================================
-# ROOT AGENT - SEQUENTIAL CHAIN
+# ROOT AGENT - ROUTER IN FRONT OF THE SEQUENTIAL CHAIN
 # ============================================
 
-# Create SequentialAgent chain: weather_planner -> itinerary_generator
-# Wrap with Datadog workflow tracing
-root_agent = SequentialAgent(
-    name="travel_genius",
+# Full chain: weather_planner -> ... -> itinerary_generator (only for "generate" turns)
+generation_pipeline = SequentialAgent(
+    name="travel_genius_pipeline",
     description="Sequential pipeline for travel itinerary generation with weather optimization",
     sub_agents=[
         weather_agent,
@@ -417,26 +434,42 @@ root_agent = SequentialAgent(
     ]
 )
 
-# Configure Datadog to track sub-agents
-# According to Datadog docs, Google ADK should automatically create spans for sub-agents
-# The agent names will appear in traces. If not visible, check:
-# 1. APM traces view (not just LLM Observability)
-# 2. Ensure DD_API_KEY and DD_SITE are correct
-# 3. Check trace sampling settings
-try:
-    # Add tags to help identify agents in traces
-    with tracer.trace("travel_genius.workflow", service="travel-genius-agents") as span:
-        span.set_tag("workflow.name", "travel_itinerary_generation")
-        span.set_tag("workflow.type", "sequential_agent")
-        span.set_tag("sub_agents", "weather_planner,itinerary_generator")
-    
-    print("✅ Datadog LLM Observability configured for sub-agent tracking")
-    print("   - Check APM > Traces to see sub-agent spans")
-    print("   - Sub-agents: weather_planner, itinerary_generator")
-except Exception as e:
-    print(f"⚠️  Datadog tagging warning: {e}")
+# Caps tail latency: falls back to the deterministic itinerary when the chain can't make it
+guarded_pipeline = DeadlineGuardAgent(
+    name="deadline_guard",
+    description="Runs the generation pipeline under a per-request latency budget",
+    pipeline=generation_pipeline,
+)
+
+# Repeated trip requests within one forecast window are served without any LLM calls
+cached_pipeline = ItineraryCacheAgent(
+    name="itinerary_cache",
+    description="Returns cached itineraries for normalized repeat requests",
+    pipeline=guarded_pipeline,
+)
+
+# Follow-up chat against an existing itinerary skips the chain entirely
+root_agent = TravelGeniusRouter(
+    name="travel_genius",
+    description="Routes generate requests to the full pipeline and follow-up chat to the assistant",
+    generation_pipeline=cached_pipeline,
+    itinerary_assistant=itinerary_assistant,
+)
+
+# ADK loads `app` in preference to `root_agent`: same agent graph, plus the metrics plugin.
+# Per-request agent/model/tool latency goes to the local /metrics endpoint and one
+# travel_genius.workflow span per invocation goes to Datadog, next to ddtrace's own ADK spans.
+# With FAULT_SCENARIO set, model and tool faults are injected after the metrics plugin has
+# started its timers, so injected latency shows up in the histograms.
+app = App(name="agent", root_agent=root_agent,
+          plugins=[metrics_plugin] + ([fault_injection_plugin] if fault_injector.enabled else []))
 
 print("✅ All agents configured successfully!")
-print(f"   - Root agent: {root_agent.name} (SequentialAgent)")
-print(f"   - Sequential chain: weather_planner -> itinerary_generator")
+print(f"   - Root agent: {root_agent.name} (router)")
+print(f"   - Generate: {generation_pipeline.name} (SequentialAgent, {guarded_pipeline.budget_seconds:.0f}s budget)")
+print(f"   - Cache: {cached_pipeline.name} ({'enabled' if itinerary_cache.enabled else 'disabled'})")
+print(f"   - Chat: deterministic handlers -> {itinerary_assistant.name}")
+print("   - Metrics: agent, model and tool latency at GET /metrics")
+if fault_injector.enabled:
+    print(f"   - Faults: scenario '{fault_injector.scenario.get('name')}' injecting into {', '.join(sorted(fault_injector.faults))}")
 print("🚀 Travel Genius AI system ready!")
\ No newline at end of file
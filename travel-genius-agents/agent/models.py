@@ -0,0 +1,59 @@
+# models.py
+"""Pydantic models for the agents' structured output (shared by agents, tools and utils)."""
+from typing import List, Optional, Literal
+from pydantic import BaseModel, Field
+
+
+class Activity(BaseModel):
+    """Individual activity in the itinerary"""
+    id: str = Field(description="Unique identifier for the activity")
+    title: str = Field(description="Activity title with emoji")
+    description: str = Field(description="Detailed description of the activity")
+    cost: int = Field(description="Cost in local currency", ge=0)
+    duration: str = Field(description="Duration of the activity (e.g., '3-4 hours')")
+    type: Literal["adventure", "food", "cultural", "instagram", "relaxation", "shopping", "nightlife"] = Field(
+        description="Type of activity"
+    )
+    timing: str = Field(description="Time slot for the activity (e.g., '9:00 AM - 1:00 PM')")
+    rating: float = Field(description="Activity rating from 0.0 to 5.0", ge=0.0, le=5.0)
+
+class DailyWeatherSummary(BaseModel):
+    """Weather summary for a specific day"""
+    condition: str = Field(description="Weather condition (e.g., 'Sunny', 'Partly Cloudy', 'Rainy')")
+    outdoorScore: int = Field(description="Weather suitability score for outdoor activities (1-10)", ge=1, le=10)
+    indoorScore: int = Field(description="Weather suitability score for indoor activities (1-10)", ge=1, le=10)
+    recommendations: List[str] = Field(description="Weather-specific recommendations for the day")
+
+class DailyPlan(BaseModel):
+    """Daily plan with activities and weather summary"""
+    day: int = Field(description="Day number", ge=1)
+    activities: List[Activity] = Field(description="List of activities for the day (2-4 activities)", min_items=2, max_items=4)
+    weatherSummary: DailyWeatherSummary = Field(description="Weather summary for this day")
+
+class OverallWeatherSummary(BaseModel):
+    """Overall weather summary for the entire trip"""
+    overallScore: float = Field(description="Overall weather score (0.0-10.0)", ge=0.0, le=10.0)
+    suitableForOutdoor: bool = Field(description="Whether weather is suitable for outdoor activities")
+    alerts: List[str] = Field(description="Weather alerts or warnings", default_factory=list)
+    recommendations: List[str] = Field(description="General weather recommendations for the trip")
+
+class TravelItinerary(BaseModel):
+    """Complete travel itinerary with structured data"""
+    tripTitle: str = Field(description="Title of the trip itinerary")
+    totalEstimatedCost: int = Field(description="Total estimated cost in local currency", ge=0)
+    dailyPlans: List[DailyPlan] = Field(description="List of daily plans", min_items=1)
+    weatherOptimized: bool = Field(description="Whether the itinerary is weather-optimized", default=True)
+    sustainabilityScore: float = Field(description="Sustainability score (0.0-10.0)", ge=0.0, le=10.0)
+    weatherSummary: OverallWeatherSummary = Field(description="Overall weather summary")
+    aiRecommendations: List[str] = Field(description="AI-generated recommendations for the trip")
+    instagramSpots: List[str] = Field(description="Instagram-worthy spots to visit", default_factory=list)
+    generatedBy: str = Field(description="Name of the system that generated the itinerary", default="AI Travel Genius")
+    generatedAt: str = Field(description="ISO 8601 timestamp when itinerary was generated")
+
+
+class ItineraryAssistantResponse(BaseModel):
+    """Answer to a follow-up question about an existing itinerary"""
+    answer: str = Field(description="Direct answer to the user's question")
+    day: Optional[int] = Field(description="Day number the answer refers to, if any", default=None)
+    activity: Optional[str] = Field(description="Activity title the answer refers to, if any", default=None)
+    emoji: str = Field(description="Single emoji summarizing the answer", default="✨")
@@ -0,0 +1,51 @@
+# pipeline/budget.py
+import re
+from typing import AsyncGenerator
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from typing_extensions import override
+
+from pipeline.router import user_text
+from utils.budget_allocator import allocate_budget
+from utils.request_parser import PERSONALITIES, parse_trip_request
+from utils.weather_codec import read_weather_state
+
+_PERSONALITY = re.compile(r'\b(' + '|'.join(PERSONALITIES) + r')\b', re.IGNORECASE)
+
+
+class BudgetAllocatorAgent(BaseAgent):
+    """
+    Deterministic stand-in for the budget_optimizer LLM turn: splits the trip budget per
+    personality, holds back a 3-5% weather contingency derived from the forecast, and writes
+    the exact per-category and per-day allocation to state.budget_plan for the agents after it.
+    A budget or trip length the request does not state (or states in a form we do not parse,
+    e.g. "$2000", "a fortnight") is a default; budget_source / days_source say so, and
+    itinerary_generator then works from the user's own figures and the split percentages.
+    """
+
+    @override
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        state = ctx.session.state
+        trip = parse_trip_request(user_text(ctx))
+        # The type the request chose, else the personality_profile verdict; a type merely
+        # mentioned in the text ("No luxury please") is the last resort
+        personality = trip["personality"] if trip["personality_source"] == "request" else ""
+        if not personality and (m := _PERSONALITY.search(str(state.get("personality_profile") or ""))):
+            personality = m.group(1).lower()
+        personality = personality or trip["personality"]
+
+        plan = allocate_budget(trip["budget"], trip["days"], trip["groupSize"], personality,
+                               read_weather_state(state))
+        plan["budget_source"], plan["days_source"] = trip["budget_source"], trip["days_source"]
+        print(f"[Budget] 💰 {plan['total']} over {plan['days']} days for {plan['group_size']} "
+              f"({plan['personality']}), {plan['split_pct']['weather_contingency']}% weather contingency"
+              + "".join(f", {field} is a default" for field in ("budget", "days")
+                        if trip[f"{field}_source"] == "default"))
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            actions=EventActions(state_delta={"budget_plan": plan}),
+        )
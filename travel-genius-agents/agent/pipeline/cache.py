@@ -0,0 +1,68 @@
+# pipeline/cache.py
+from typing import AsyncGenerator
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.genai import types
+from typing_extensions import override
+
+from pipeline.router import user_text
+from utils.itinerary_cache import itinerary_cache
+from utils.request_parser import parse_trip_request
+
+# Session state flag a client can set (e.g. when creating the session) to force a fresh itinerary
+CACHE_OPT_OUT_KEY = "skip_itinerary_cache"
+
+
+class ItineraryCacheAgent(BaseAgent):
+    """
+    Serves repeated generate requests (same canonical destination, days, budget bucket,
+    personality, preferences and forecast window) from the itinerary cache without any LLM
+    calls. On a miss it runs the pipeline and stores the resulting itinerary unless it was
+    degraded by the deadline guard.
+    """
+
+    pipeline: BaseAgent
+
+    model_config = {"arbitrary_types_allowed": True}
+
+    def __init__(self, name: str, pipeline: BaseAgent, description: str = ""):
+        super().__init__(name=name, description=description, pipeline=pipeline, sub_agents=[pipeline])
+
+    @override
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        trip = parse_trip_request(user_text(ctx))
+        key, expires_at = itinerary_cache.key_for(trip)
+        if ctx.session.state.get(CACHE_OPT_OUT_KEY):
+            key = None
+
+        cached = itinerary_cache.get(key)
+        if cached:
+            print(f"[Cache Hit] Itinerary for {trip['destination']} ({key})")
+            yield Event(
+                invocation_id=ctx.invocation_id,
+                author=self.name,
+                branch=ctx.branch,
+                content=types.Content(role="model", parts=[types.Part(text=f"Here is your {trip['days']}-day itinerary for {trip['destination']}.")]),
+                actions=EventActions(state_delta={
+                    "itinerary": cached,
+                    "itinerary_cached": True,
+                    "itinerary_degraded": False,
+                    "itinerary_upgrade_pending": False,
+                }),
+            )
+            return
+
+        previous = ctx.session.state.get("itinerary")
+        async for event in self.pipeline.run_async(ctx):
+            yield event
+
+        state = ctx.session.state
+        if state.get("itinerary_cached"):
+            yield Event(invocation_id=ctx.invocation_id, author=self.name, branch=ctx.branch,
+                        actions=EventActions(state_delta={"itinerary_cached": False}))
+        fresh = state.get("itinerary") is not previous
+        if key and fresh and state.get("itinerary") and not state.get("itinerary_degraded"):
+            if itinerary_cache.put(key, state["itinerary"], expires_at):
+                print(f"[Cache Store] Cached itinerary for {trip['destination']} ({key})")
@@ -0,0 +1,212 @@
+# pipeline/deadline.py
+import asyncio
+import os
+import time
+from collections import Counter
+from typing import AsyncGenerator, Dict, Optional, Tuple
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.genai import types
+from pydantic import PrivateAttr, ValidationError
+from typing_extensions import override
+
+from models import TravelItinerary
+from pipeline.router import user_text
+from tools.weather_tools import cached_weather_analysis, fetch_weather_analysis
+from utils.itinerary_helper import create_schema_itinerary
+from utils.request_parser import parse_trip_request
+from utils.weather_codec import read_weather_state
+
+# Per-request latency budget for the whole generation chain (the frontend gives up at 120 s)
+DEFAULT_BUDGET_SECONDS = float(os.getenv("ITINERARY_LATENCY_BUDGET_SECONDS", "45"))
+
+# The fallback may look up the forecast if weather_planner never finished, but only this long:
+# it runs when the budget is already gone, so a slow weather API must not hold it up
+DEGRADED_WEATHER_TIMEOUT_SECONDS = float(os.getenv("DEGRADED_WEATHER_TIMEOUT_SECONDS", "2"))
+
+# Every Nth run ignores the prediction (the hard budget still applies) so the step
+# estimates keep getting fresh observations and recover after a slow spell; 0 disables
+DEADLINE_PROBE_EVERY = int(os.getenv("DEADLINE_PROBE_EVERY", "20"))
+
+# Starting guesses for sub-agent durations (seconds), replaced by the first observation and
+# then tracked as EWMAs. A run is only cut on a prediction once every step it depends on has
+# been observed at least once.
+_DEFAULT_STEP_SECONDS = 4.0
+_EWMA_ALPHA = 0.2
+
+degraded_counts = Counter()
+
+
+class DeadlineGuardAgent(BaseAgent):
+    """
+    Runs the generation pipeline under a latency budget. If the remaining sub-agents are
+    predicted to overrun the budget, the budget actually runs out, or a model call fails,
+    it returns the deterministic weather-scored itinerary instead (validated against
+    TravelItinerary and flagged with `itinerary_degraded`). `itinerary_upgrade_pending`
+    tells the client it can re-send the request later for the full LLM itinerary.
+
+    Each sub-agent is timed from its own start to its own end with before/after-agent
+    callbacks, so a step's Gemini call is charged to that step.
+    """
+
+    pipeline: BaseAgent
+    budget_seconds: float = DEFAULT_BUDGET_SECONDS
+    step_estimates: Dict[str, float] = {}
+    step_observations: Dict[str, int] = {}
+
+    model_config = {"arbitrary_types_allowed": True}
+
+    # invocation id -> (running step, monotonic start)
+    _running: Dict[str, Tuple[str, float]] = PrivateAttr(default_factory=dict)
+    _runs: int = PrivateAttr(default=0)
+
+    def __init__(self, name: str, pipeline: BaseAgent,
+                 budget_seconds: float = DEFAULT_BUDGET_SECONDS, description: str = ""):
+        super().__init__(
+            name=name,
+            description=description,
+            pipeline=pipeline,
+            budget_seconds=budget_seconds,
+            step_estimates={agent.name: _DEFAULT_STEP_SECONDS for agent in pipeline.sub_agents},
+            step_observations={agent.name: 0 for agent in pipeline.sub_agents},
+            sub_agents=[pipeline],
+        )
+        for agent in pipeline.sub_agents:
+            agent.before_agent_callback = [self._step_started, *agent.canonical_before_agent_callbacks]
+            agent.after_agent_callback = [*agent.canonical_after_agent_callbacks, self._step_finished]
+
+    # ---------- STEP TIMING ----------
+    def _step_started(self, callback_context: CallbackContext) -> None:
+        now = time.monotonic()
+        # A step skipped by an earlier before-callback (memo hit) never reaches its after-callback
+        self._finish_step(callback_context.invocation_id, now)
+        self._running[callback_context.invocation_id] = (callback_context.agent_name, now)
+        return None
+
+    def _step_finished(self, callback_context: CallbackContext) -> None:
+        self._finish_step(callback_context.invocation_id, time.monotonic())
+        return None
+
+    def _finish_step(self, invocation_id: str, now: float) -> None:
+        running = self._running.pop(invocation_id, None)
+        if running:
+            self._observe(running[0], now - running[1])
+
+    @override
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        started = time.monotonic()
+        deadline = started + self.budget_seconds
+        step_order = [agent.name for agent in self.pipeline.sub_agents]
+        self._runs += 1
+        probe = DEADLINE_PROBE_EVERY > 0 and self._runs % DEADLINE_PROBE_EVERY == 0
+        if probe:
+            print(f"[Deadline] 🔬 Probe run: only the {self.budget_seconds:.0f}s budget applies")
+        reason: Optional[str] = None
+
+        events = self.pipeline.run_async(ctx)
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    reason = "latency budget exhausted"
+                    break
+                try:
+                    event = await asyncio.wait_for(events.__anext__(), timeout=remaining)
+                except StopAsyncIteration:
+                    self._finish_step(ctx.invocation_id, time.monotonic())
+                    if ctx.session.state.get("itinerary_upgrade_pending"):
+                        # A full run replaced an earlier degraded itinerary
+                        yield self._state_event(ctx, {"itinerary_degraded": False,
+                                                      "itinerary_upgrade_pending": False})
+                    return
+                except asyncio.TimeoutError:
+                    current_step = self._running.get(ctx.invocation_id, ("pipeline",))[0]
+                    # It ran at least this long: a lower bound is better than no observation
+                    self._finish_step(ctx.invocation_id, time.monotonic())
+                    reason = f"latency budget exhausted during {current_step}"
+                    break
+
+                if event.error_code:
+                    reason = f"model error in {event.author}: {event.error_code}"
+                    break
+
+                running = self._running.get(ctx.invocation_id)
+                if running and not probe:
+                    now = time.monotonic()
+                    predicted = self._predicted_remaining(step_order, running[0], now - running[1])
+                    if predicted is not None and predicted > deadline - now:
+                        reason = f"predicted to miss budget at {running[0]}"
+                        break
+
+                yield event
+        except Exception as e:
+            reason = f"pipeline failed: {type(e).__name__}: {e}"
+        finally:
+            await events.aclose()
+            self._running.pop(ctx.invocation_id, None)  # a cut step's partial time says nothing
+
+        degraded_counts[reason.split(":")[0]] += 1
+        print(f"⚠️  Degraded itinerary after {time.monotonic() - started:.1f}s ({reason})")
+        yield await self._degraded_event(ctx, reason)
+
+    def _observe(self, step: str, seconds: float) -> None:
+        if self.step_observations.get(step):
+            previous = self.step_estimates.get(step, _DEFAULT_STEP_SECONDS)
+            self.step_estimates[step] = (1 - _EWMA_ALPHA) * previous + _EWMA_ALPHA * seconds
+        else:
+            self.step_estimates[step] = seconds  # the first observation replaces the guess
+        self.step_observations[step] = self.step_observations.get(step, 0) + 1
+
+    def _predicted_remaining(self, step_order, current_step: str, elapsed_in_step: float) -> Optional[float]:
+        """Seconds the rest of the chain should take, or None while any of it is unobserved."""
+        upcoming = step_order[step_order.index(current_step):]
+        if not all(self.step_observations.get(step) for step in upcoming):
+            return None
+        return (max(0.0, self.step_estimates[current_step] - elapsed_in_step)
+                + sum(self.step_estimates[step] for step in upcoming[1:]))
+
+    async def _fallback_weather(self, ctx: InvocationContext, trip: dict) -> dict:
+        """Weather from state or the tool cache; else a short, awaited fetch; else none (default scores)."""
+        weather = read_weather_state(ctx.session.state)
+        if weather.get("daily_forecast") or not trip["destination"]:
+            return weather
+        cached = cached_weather_analysis(trip["destination"], "", trip["days"])
+        if cached:
+            return cached
+        try:
+            return await asyncio.wait_for(fetch_weather_analysis(trip["destination"], "", trip["days"]),
+                                          timeout=DEGRADED_WEATHER_TIMEOUT_SECONDS)
+        except Exception as e:  # includes the timeout; default outdoor/indoor scores are used
+            print(f"[Warning] Degraded itinerary without forecast: {type(e).__name__}: {e}")
+            return {}
+
+    async def _degraded_event(self, ctx: InvocationContext, reason: str) -> Event:
+        trip = parse_trip_request(user_text(ctx))
+        weather = await self._fallback_weather(ctx, trip)
+
+        itinerary = create_schema_itinerary(weather, trip)
+        try:
+            itinerary = TravelItinerary.model_validate(itinerary).model_dump()
+        except ValidationError as e:
+            print(f"[Error] Degraded itinerary failed validation: {e}")
+
+        return self._state_event(ctx, {
+            "itinerary": itinerary,
+            "itinerary_degraded": True,
+            "itinerary_upgrade_pending": True,
+            "degraded_reason": reason,
+        }, text=f"Here is a quick weather-optimized itinerary for {trip['destination'] or 'your trip'}; "
+                "a fully personalized version can be generated on request.")
+
+    def _state_event(self, ctx: InvocationContext, state_delta: dict, text: Optional[str] = None) -> Event:
+        content = types.Content(role="model", parts=[types.Part(text=text)]) if text else None
+        return Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=content,
+            actions=EventActions(state_delta=state_delta),
+        )
@@ -0,0 +1,80 @@
+# pipeline/personality.py
+from collections import Counter
+from typing import AsyncGenerator
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from typing_extensions import override
+
+from pipeline.router import user_text
+from utils.personality_classifier import personality_classifier
+
+# What the downstream agents need to know about each type (personality_analyzer's own rubric)
+PERSONALITY_PROFILES = {
+    "heritage": {
+        "traits": "Loves historical sites, cultural experiences, museums, traditional accommodations",
+        "weather_guidance": "Indoor alternatives (museums, palaces) during poor weather",
+    },
+    "adventure": {
+        "traits": "Seeks active experiences, outdoor activities, unique challenges, offbeat destinations",
+        "weather_guidance": "Put outdoor activities on the best weather days",
+    },
+    "cultural": {
+        "traits": "Wants authentic local interactions, community experiences, traditional festivals",
+        "weather_guidance": "Mix indoor and outdoor based on the weather",
+    },
+    "party": {
+        "traits": "Enjoys nightlife, social experiences, vibrant cities, entertainment venues",
+        "weather_guidance": "Keep evenings free; indoor venues on wet nights",
+    },
+    "luxury": {
+        "traits": "Prefers premium experiences, comfort, exclusive services, high-end accommodations",
+        "weather_guidance": "Spa and fine dining as rainy-day alternatives",
+    },
+}
+
+# request / classifier / llm_fallback, exported as travel_genius_personality_total
+personality_counts = Counter()
+
+
+class PersonalityClassifierAgent(BaseAgent):
+    """
+    Takes the personality the request names (the frontend's quiz result) or classifies it
+    with the local keyword model, and writes state.personality_profile without an LLM call;
+    only when the classifier is not confident enough does it run the personality_analyzer
+    LLM agent, which writes the same state key.
+    """
+
+    llm_agent: BaseAgent
+
+    model_config = {"arbitrary_types_allowed": True}
+
+    def __init__(self, name: str, llm_agent: BaseAgent, description: str = ""):
+        super().__init__(name=name, description=description, llm_agent=llm_agent, sub_agents=[llm_agent])
+
+    @override
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        result = personality_classifier.classify_request(user_text(ctx))
+        if not result["confident"]:
+            personality_counts["llm_fallback"] += 1
+            print(f"[Personality] 🤔 {result['personality']} at {result['confidence']:.2f} "
+                  f"is below {personality_classifier.min_confidence:.2f}, asking {self.llm_agent.name}")
+            async for event in self.llm_agent.run_async(ctx):
+                yield event
+            return
+
+        personality_counts[result["source"]] += 1
+        label = result["personality"]
+        print(f"[Personality] 🧠 {label} ({result['confidence']:.2f}, {result['source']}) without an LLM call")
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            actions=EventActions(state_delta={"personality_profile": {
+                "personality": label.upper(),
+                "confidence": result["confidence"],
+                **PERSONALITY_PROFILES[label],
+                "source": result["source"],
+            }}),
+        )
@@ -0,0 +1,79 @@
+# pipeline/router.py
+from collections import Counter
+from typing import AsyncGenerator, Optional
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.genai import types
+from typing_extensions import override
+
+from utils.routing_helper import determine_intent
+from utils.chat_helper import answer_from_itinerary
+
+# How many turns took each route; exposed for metrics/debugging
+route_counts = Counter()
+
+
+def user_text(ctx: InvocationContext) -> str:
+    """Concatenated text parts of the message that started this invocation."""
+    content = ctx.user_content
+    if not content or not content.parts:
+        return ""
+    return " ".join(part.text for part in content.parts if getattr(part, "text", None))
+
+
+class TravelGeniusRouter(BaseAgent):
+    """
+    Front door for /run. Only true "generate" turns pay for the full sequential chain;
+    follow-up chat about an existing itinerary is answered deterministically when possible,
+    otherwise by a single lightweight assistant agent.
+    """
+
+    generation_pipeline: BaseAgent
+    itinerary_assistant: BaseAgent
+
+    model_config = {"arbitrary_types_allowed": True}
+
+    def __init__(self, name: str, generation_pipeline: BaseAgent,
+                 itinerary_assistant: BaseAgent, description: str = ""):
+        super().__init__(
+            name=name,
+            description=description,
+            generation_pipeline=generation_pipeline,
+            itinerary_assistant=itinerary_assistant,
+            sub_agents=[generation_pipeline, itinerary_assistant],
+        )
+
+    @override
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        query = user_text(ctx)
+        itinerary = ctx.session.state.get("itinerary")
+        intent = determine_intent(query, has_existing_itinerary=bool(itinerary))
+
+        if intent == "chat" and itinerary:
+            answer = answer_from_itinerary(query, itinerary)
+            if answer:
+                route_counts["deterministic"] += 1
+                yield self._text_event(ctx, answer["answer"],
+                                       {"assistant_response": answer})
+                return
+
+            route_counts["assistant"] += 1
+            async for event in self.itinerary_assistant.run_async(ctx):
+                yield event
+            return
+
+        route_counts["generate"] += 1
+        async for event in self.generation_pipeline.run_async(ctx):
+            yield event
+
+    def _text_event(self, ctx: InvocationContext, text: str,
+                    state_delta: Optional[dict] = None) -> Event:
+        return Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text=text)]),
+            actions=EventActions(state_delta=state_delta or {}),
+        )
@@ -0,0 +1,92 @@
+# pipeline/streaming.py
+import json
+from typing import AsyncGenerator, Dict, Any, Tuple
+
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.runners import Runner
+from google.genai import types
+
+from utils.request_parser import parse_trip_request
+from utils.state_helper import read_json_state
+from utils.stream_helper import ItineraryStreamAssembler, itinerary_as_stream
+
+# Author whose streamed text is the TravelItinerary JSON
+ITINERARY_AUTHOR = "itinerary_generator"
+
+_PROGRESS_MESSAGES = {
+    "weather_planner": "🌤️ Checking the weather forecast...",
+    "itinerary_generator": "🗓️ Planning your days...",
+    "deadline_guard": "⚡ Finishing a quick itinerary...",
+    "itinerary_cache": "⚡ Found a matching itinerary...",
+}
+
+
+def format_sse(kind: str, payload: Any) -> str:
+    """One server-sent event in the {type, data} shape the frontend's SSEEvent expects."""
+    return f"event: {kind}\ndata: {json.dumps({'type': kind, 'data': payload}, default=str)}\n\n"
+
+
+def _event_text(event) -> str:
+    if not event.content or not event.content.parts:
+        return ""
+    return "".join(p.text for p in event.content.parts if p.text and not p.thought)
+
+
+async def stream_itinerary(runner: Runner, user_id: str, session_id: str,
+                           new_message: types.Content) -> AsyncGenerator[Tuple[str, Dict[str, Any]], None]:
+    """
+    Runs the agent with SSE streaming and yields ("progress"|"header"|"day"|"summary"|"done", payload)
+    as soon as each part of the itinerary is complete. Itineraries that arrive in one piece
+    (degraded or non-streaming model) are replayed through the same event sequence at the end.
+    """
+    request_text = " ".join(p.text for p in new_message.parts or [] if p.text)
+    assembler = ItineraryStreamAssembler(context=parse_trip_request(request_text))
+    streamed_partials = False
+    last_author = None
+
+    async for event in runner.run_async(
+        user_id=user_id,
+        session_id=session_id,
+        new_message=new_message,
+        run_config=RunConfig(streaming_mode=StreamingMode.SSE),
+    ):
+        if event.author != last_author and event.author in _PROGRESS_MESSAGES and event.content:
+            last_author = event.author
+            yield "progress", {"agent": event.author, "message": _PROGRESS_MESSAGES[event.author]}
+
+        if event.error_code:
+            yield "error", {"agent": event.author, "code": event.error_code, "message": event.error_message}
+            continue
+        if event.author != ITINERARY_AUTHOR:
+            continue
+
+        if event.partial:
+            streamed_partials = True
+            chunk = _event_text(event)
+        elif not streamed_partials:
+            # The model returned the whole itinerary in one response
+            chunk = _event_text(event)
+        else:
+            continue
+        for kind, payload in assembler.feed(chunk):
+            yield kind, payload
+
+    session = await runner.session_service.get_session(
+        app_name=runner.app_name, user_id=user_id, session_id=session_id
+    )
+    state = session.state if session else {}
+    itinerary = read_json_state(state, "itinerary")
+
+    if not assembler.complete and itinerary.get("dailyPlans"):
+        if assembler.header_sent:
+            # The streamed itinerary was abandoned (deadline guard); the client discards what it has
+            yield "reset", {"reason": state.get("degraded_reason", "")}
+        for kind, payload in itinerary_as_stream(itinerary):
+            yield kind, payload
+
+    yield "done", {
+        "itinerary": itinerary or None,
+        "degraded": bool(state.get("itinerary_degraded")),
+        "cached": bool(state.get("itinerary_cached")),
+        "assistant_response": state.get("assistant_response"),
+    }
@@ -0,0 +1,72 @@
+# pipeline/sustainability.py
+import math
+import re
+from typing import AsyncGenerator
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from typing_extensions import override
+
+from pipeline.router import user_text
+from utils.request_parser import parse_trip_request
+from utils.sustainability import GUESTS_PER_ROOM, sustainability_tips, trip_footprint
+from utils.weather_codec import read_weather_state
+
+_ORIGIN = re.compile(r"\bfrom\s+([A-Za-z][A-Za-z .'-]{1,40}?)\s+to\b", re.IGNORECASE)
+
+# Typical day for each personality before the itinerary exists (models.Activity types)
+PERSONALITY_ACTIVITIES = {
+    "heritage": ("cultural", "food", "cultural"),
+    "adventure": ("adventure", "food", "instagram"),
+    "luxury": ("relaxation", "food", "shopping"),
+    "party": ("food", "nightlife", "instagram"),
+    "cultural": ("cultural", "food", "cultural"),
+}
+DEFAULT_ACTIVITIES = ("cultural", "food", "instagram")
+
+# Nightly room spend (budget_plan accommodation per room-night, INR) -> hotels.price_tier
+_PRICE_TIERS = ((2000, "Budget"), (4000, "Upper Midscale"), (8000, "Upscale"), (15000, "Upper Upscale"))
+
+
+def _price_tier(plan: dict, days: int, group_size: int) -> str:
+    nightly = (plan.get("categories") or {}).get("accommodation", 0) / (
+        max(1, days - 1) * math.ceil(group_size / GUESTS_PER_ROOM))
+    return next((tier for limit, tier in _PRICE_TIERS if nightly < limit), "Luxury")
+
+
+class SustainabilityEngineAgent(BaseAgent):
+    """
+    Deterministic stand-in for the sustainability_advisor LLM turn: computes the trip's
+    carbon footprint and sustainability score with utils/sustainability.py and writes them,
+    with concrete tips, to state.sustainability_notes for itinerary_generator.
+    """
+
+    @override
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        state = ctx.session.state
+        text = user_text(ctx)
+        trip = parse_trip_request(text)
+        origin = _ORIGIN.search(text)
+        plan = state.get("budget_plan") or {}
+        # budget_optimizer already settled the type (request, else personality_profile)
+        personality = plan.get("personality") or trip["personality"]
+
+        kinds = PERSONALITY_ACTIVITIES.get(personality, DEFAULT_ACTIVITIES)
+        footprint = trip_footprint(
+            trip["destination"], trip["days"], trip["groupSize"],
+            activities=[{"type": kind} for kind in kinds * trip["days"]],
+            hotel=({"price_tier": _price_tier(plan, trip["days"], trip["groupSize"])}
+                   if plan and plan.get("budget_source") != "default" else None),
+            origin=origin.group(1) if origin else None,
+        )
+        footprint["tips"] = sustainability_tips(footprint, read_weather_state(state))
+        print(f"[Sustainability] 🌱 {footprint['origin']} -> {footprint['destination']} by "
+              f"{footprint['mode']}: {footprint['kg_co2e']['total']} kg CO2e, "
+              f"score {footprint['sustainabilityScore']}")
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            actions=EventActions(state_delta={"sustainability_notes": footprint}),
+        )
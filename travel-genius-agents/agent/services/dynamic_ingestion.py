@@ -10,11 +10,18 @@ import googlemaps
 import requests
 from toolbox_core import ToolboxSyncClient
 from services.weather_service import weather_service
+from utils.destination_resolver import destination_resolver
+from utils.places_cache import PlacesCache
+from utils.upstream_tape import upstream_tape
+from utils.sustainability import place_sustainability_score
 class DynamicIngestionService:
     def __init__(self):
-        self.gmaps = googlemaps.Client(key=os.getenv('GOOGLE_MAPS_API_KEY'))
+        self.gmaps = upstream_tape.client(lambda: googlemaps.Client(key=os.getenv('GOOGLE_MAPS_API_KEY')),
+                                          "googlemaps")
         self.weather_api_key = os.getenv('WEATHER_API_KEY')
         self.toolbox = ToolboxSyncClient(os.getenv('MCP_TOOLBOX_URL'))
+        # Gathered Places data keyed on canonical destination id
+        self._places_cache = PlacesCache()
         
         logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(__name__)
@@ -26,8 +33,14 @@ class DynamicIngestionService:
         self.logger.info(f"🔍 Starting discovery for: {destination_name}")
         
         try:
-            # Step 1: Gather data from multiple sources
-            destination_data = await self._gather_destination_data(destination_name)
+            # Step 1: Gather data from multiple sources (once per canonical destination)
+            match = destination_resolver.resolve(destination_name)
+            canonical_id = match["canonical_id"]
+            destination_data = self._places_cache.get(canonical_id)
+            if destination_data is None:
+                destination_data = await self._gather_destination_data(match["name"] or destination_name)
+                if destination_data:
+                    self._places_cache.put(canonical_id, destination_data)
             
             if not destination_data:
                 return {"success": False, "message": f"Could not find data for {destination_name}"}
@@ -41,6 +54,7 @@ class DynamicIngestionService:
             return {
                 "success": True,
                 "destination": destination_name,
+                "canonical_id": canonical_id,
                 "activities_found": len(destination_data.get('activities', [])),
                 "hotels_found": len(destination_data.get('hotels', [])),
                 "message": f"🎉 {destination_name} is now available with {len(destination_data.get('activities', []))} activities!"
@@ -109,7 +123,9 @@ class DynamicIngestionService:
                 "rating": place_details.get('rating', 4.0),
                 "best_season": weather_data.get('best_season', 'Year-round'),
                 "avg_temperature": weather_data.get('avg_temp', 25),
-                "sustainability_rating": self._calculate_sustainability_score(place_details),
+                "sustainability_rating": place_sustainability_score(place_details.get('rating'),
+                                                                    place_details.get('user_ratings_total'),
+                                                                    place_details.get('types', [])),
                 "hidden_gem": place_details.get('user_ratings_total', 0) < 5000
             },
             "activities": activities,
@@ -149,7 +165,8 @@ class DynamicIngestionService:
                         "type": self._map_to_activity_type(activity_type),
                         "price": self._estimate_price(place, activity_type),
                         "duration_hours": self._estimate_duration(activity_type),
-                        "sustainability_score": min(9, place.get('rating', 4) * 2),
+                        "sustainability_score": place_sustainability_score(place.get('rating'), place.get('user_ratings_total'),
+                                                                           place.get('types', [activity_type])),
                         "description": f"Popular {activity_type.replace('_', ' ')} in {destination}",
                         "hidden_gem": place.get('user_ratings_total', 0) < 500 and place.get('rating', 0) >= 4.2
                     }
@@ -178,7 +195,7 @@ class DynamicIngestionService:
                     "location": destination,
                     "price_tier": self._determine_price_tier(hotel.get('price_level', 2)),
                     "rating": hotel.get('rating', 4.0),
-                    "sustainability_score": min(9, int(hotel.get('rating', 4) * 2)),
+                    "sustainability_score": place_sustainability_score(hotel.get('rating'), hotel.get('user_ratings_total')),
                     "amenities": ["WiFi", "Restaurant"],  # Basic amenities
                     "coordinates": {
                         "lat": hotel['geometry']['location']['lat'],
@@ -251,18 +268,6 @@ class DynamicIngestionService:
         else:
             return f"{name} is an interesting place worth visiting for its unique character."
 
-    def _calculate_sustainability_score(self, place_details: Dict) -> int:
-        """Calculate sustainability score based on available data"""
-        rating = place_details.get('rating', 4)
-        total_ratings = place_details.get('user_ratings_total', 100)
-        
-        # Higher rating + fewer crowds = more sustainable
-        base_score = int(rating * 2)
-        if total_ratings < 1000:  # Less crowded = more sustainable
-            base_score += 1
-            
-        return min(9, base_score)
-
     async def _store_destination_data(self, data: Dict[str, Any]) -> bool:
         """Store the discovered data in Cloud SQL via direct SQL"""
         try:
@@ -7,15 +7,27 @@ from dotenv import load_dotenv
 import os
 import asyncio
 import logging
+import time
 from datetime import datetime
 from typing import Dict, Any, List, Optional
 import requests
 import psycopg2
 from toolbox_core import ToolboxSyncClient
+from utils.destination_resolver import destination_resolver
+from utils.places_cache import PlacesCache
+from utils.forksafe import after_fork
+from utils.metrics import record_cache_lookup, timed_upstream
+from utils.rate_governor import rate_governor, background_priority
+from utils.fault_injection import fault_injector
+from utils.upstream_tape import upstream_tape
+from utils.sustainability import place_sustainability_score
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Overridable so benchmarks and tests can point ingestion at a local stand-in
+PLACES_API_BASE_URL = os.getenv("PLACES_API_BASE_URL", "https://places.googleapis.com/v1").rstrip("/")
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -170,25 +182,77 @@ class DynamicIngestionService:
         
         self.weather_api_key = os.getenv('WEATHER_API_KEY')
         self.toolbox = ToolboxSyncClient(os.getenv('MCP_TOOLBOX_URL'))
+        after_fork(self._reconnect_toolbox)
         self.db_integration = DatabaseIntegration()
+        # Places text-search results keyed on canonical destination id
+        self._places_cache = PlacesCache()
         
         self.logger = logging.getLogger("DynamicIngestion")
         self.logger.info(f"✅ Dynamic Ingestion Service initialized with NEW Places API")
 
+    def _reconnect_toolbox(self) -> None:
+        self.toolbox = ToolboxSyncClient(os.getenv('MCP_TOOLBOX_URL'))
+
+    def _post_places(self, operation: str, url: str, headers: Dict[str, str], data: Dict[str, Any],
+                     timeout: int) -> Dict[str, Any]:
+        """
+        POST to the Places API (or the recorded tape) and return the JSON body. Blocks (requests,
+        and the quota wait), so async callers run it via asyncio.to_thread, which carries the
+        caller's rate priority into the thread.
+        """
+        with timed_upstream("places", operation):
+            if upstream_tape.replaying:
+                fault = fault_injector.inject_blocking("places", operation)
+                return fault.mangle(upstream_tape.replay_blocking("places", "POST", url, data))
+            rate_governor.acquire_blocking("places")
+            fault = fault_injector.inject_blocking("places", operation)
+            started = time.perf_counter()
+            response = requests.post(url, headers=headers, json=data, timeout=timeout)
+            response.raise_for_status()
+            raw = response.json()
+        # Tape the raw body and network time; the injected fault only shapes what we return
+        upstream_tape.record("places", "POST", url, data, raw, time.perf_counter() - started)
+        return fault.mangle(raw)
+
     async def discover_missing_destination(self, destination_name: str) -> Dict[str, Any]:
         """Main function: Discovers and adds missing destination data using NEW API"""
-        
+        # Ingestion runs behind the user's answer: its upstream calls yield to interactive quota
+        with background_priority():
+            return await self._discover_missing_destination(destination_name)
+
+    async def _discover_missing_destination(self, destination_name: str) -> Dict[str, Any]:
         self.logger.info(f"🔍 Starting discovery for: {destination_name}")
         
         try:
+            # Step 0: Canonicalize so "Bankok" and "Bangkok, Thailand" upsert the same row
+            match = destination_resolver.resolve(destination_name)
+            canonical_id = match["canonical_id"]
+            canonical_name = match["name"] or destination_name
+            self.logger.info(f"📍 Resolved '{destination_name}' -> {canonical_id} (confidence {match['confidence']})")
+
             # Step 1: Search for the destination using NEW Places API
-            destination_data = await self._search_destination_new_api(destination_name)
+            destination_data = self._places_cache.get(canonical_id)
+            record_cache_lookup("places", destination_data is not None)
+            if destination_data is None:
+                destination_data = await self._search_destination_new_api(canonical_name)
+                if destination_data:
+                    self._places_cache.put(canonical_id, destination_data)
             
             if not destination_data:
                 return {
                     "success": False, 
                     "message": f"Could not find comprehensive data for {destination_name}"
                 }
+
+            if not match["matched"]:
+                # Remember newly discovered places so later misspellings resolve to them
+                destination_resolver.add({
+                    "id": canonical_id,
+                    "name": canonical_name,
+                    "country": destination_data.get("country"),
+                    "lat": destination_data["coordinates"]["lat"],
+                    "lng": destination_data["coordinates"]["lng"],
+                })
             
             # Step 2: Get nearby places using NEW API
             activities = await self._discover_activities_new_api(destination_data['coordinates'])
@@ -201,14 +265,17 @@ class DynamicIngestionService:
             }
             
             # Step 3: Store in database
-            destination_id = self.db_integration.insert_discovered_destination(result_data)
+            with timed_upstream("cloudsql", "insert_destination"):
+                fault_injector.inject_blocking("cloudsql", "insert_destination")
+                destination_id = self.db_integration.insert_discovered_destination(result_data)
             
             if destination_id:
                 self.logger.info(f"✅ Successfully discovered and stored {destination_name}!")
                 
                 return {
                     "success": True,
-                    "destination": destination_name,
+                    "destination": canonical_name,
+                    "canonical_id": canonical_id,
                     "destination_id": destination_id,
                     "activities_found": len(activities),
                     "hotels_found": len(hotels),
@@ -228,7 +295,7 @@ class DynamicIngestionService:
         """Search for destination using NEW Places API Text Search"""
         
         try:
-            url = "https://places.googleapis.com/v1/places:searchText"
+            url = f"{PLACES_API_BASE_URL}/places:searchText"
             
             headers = {
                 "Content-Type": "application/json",
@@ -242,10 +309,7 @@ class DynamicIngestionService:
                 "maxResultCount": 1
             }
             
-            response = requests.post(url, headers=headers, json=data, timeout=10)
-            response.raise_for_status()
-            
-            result = response.json()
+            result = await asyncio.to_thread(self._post_places, "search_text", url, headers, data, timeout=10)
             
             if not result.get('places'):
                 self.logger.warning(f"No places found for {destination}")
@@ -269,7 +333,8 @@ class DynamicIngestionService:
                 "description": self._generate_description(destination, place.get('types', [])),
                 "best_season": "Year-round",
                 "avg_temperature": 25,
-                "sustainability_rating": self._calculate_sustainability_score(place),
+                "sustainability_rating": place_sustainability_score(place.get('rating'), place.get('userRatingCount'),
+                                                                    place.get('types', [])),
                 "hidden_gem": place.get('userRatingCount', 0) < 5000
             }
             
@@ -289,7 +354,7 @@ class DynamicIngestionService:
         """Discover activities using NEW Places API Nearby Search"""
         
         try:
-            url = "https://places.googleapis.com/v1/places:searchNearby"
+            url = f"{PLACES_API_BASE_URL}/places:searchNearby"
             
             headers = {
                 "Content-Type": "application/json",
@@ -311,10 +376,7 @@ class DynamicIngestionService:
                 }
             }
             
-            response = requests.post(url, headers=headers, json=data, timeout=15)
-            response.raise_for_status()
-            
-            result = response.json()
+            result = await asyncio.to_thread(self._post_places, "nearby_activities", url, headers, data, timeout=15)
             activities = []
             
             for place in result.get('places', []):
@@ -323,7 +385,8 @@ class DynamicIngestionService:
                     "type": self._map_to_activity_type(place.get('types', [])),
                     "price": self._estimate_price_from_level(place.get('priceLevel')),
                     "duration_hours": self._estimate_duration(place.get('types', [])),
-                    "sustainability_score": min(9, int(place.get('rating', 4) * 2)),
+                    "sustainability_score": place_sustainability_score(place.get('rating'), place.get('userRatingCount'),
+                                                                       place.get('types', [])),
                     "description": f"Popular {place.get('types', ['attraction'])[0].replace('_', ' ')} near {place.get('formattedAddress', '')}",
                     "hidden_gem": place.get('userRatingCount', 0) < 1000 and place.get('rating', 0) >= 4.2,
                     "coordinates": {
@@ -343,7 +406,7 @@ class DynamicIngestionService:
         """Discover hotels using NEW Places API"""
         
         try:
-            url = "https://places.googleapis.com/v1/places:searchNearby"
+            url = f"{PLACES_API_BASE_URL}/places:searchNearby"
             
             headers = {
                 "Content-Type": "application/json", 
@@ -365,10 +428,7 @@ class DynamicIngestionService:
                 }
             }
             
-            response = requests.post(url, headers=headers, json=data, timeout=15)
-            response.raise_for_status()
-            
-            result = response.json()
+            result = await asyncio.to_thread(self._post_places, "nearby_lodging", url, headers, data, timeout=15)
             hotels = []
             
             for place in result.get('places', []):
@@ -377,7 +437,7 @@ class DynamicIngestionService:
                     "location": place.get('formattedAddress', ''),
                     "price_tier": self._determine_price_tier(place.get('priceLevel')),
                     "rating": place.get('rating', 4.0),
-                    "sustainability_score": min(9, int(place.get('rating', 4) * 2)),
+                    "sustainability_score": place_sustainability_score(place.get('rating'), place.get('userRatingCount')),
                     "amenities": ["WiFi", "Restaurant"],  # Basic amenities
                     "coordinates": {
                         "lat": place['location']['latitude'],
@@ -445,17 +505,6 @@ class DynamicIngestionService:
         tier_map = {0: 'Budget', 1: 'Upper Midscale', 2: 'Upscale', 3: 'Upper Upscale', 4: 'Luxury'}
         return tier_map.get(price_level, 'Upscale')
 
-    def _calculate_sustainability_score(self, place: Dict) -> int:
-        """Calculate sustainability score based on place data"""
-        rating = place.get('rating', 4.0)
-        user_count = place.get('userRatingCount', 100)
-        
-        base_score = int(rating * 2)
-        if user_count < 1000:  # Less crowded = more sustainable
-            base_score += 1
-        
-        return min(9, base_score)
-
     def _generate_description(self, destination: str, types: List[str]) -> str:
         """Generate a description based on destination and types"""
         if 'locality' in types:
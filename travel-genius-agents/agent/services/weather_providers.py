@@ -0,0 +1,236 @@
+# services/weather_providers.py
+import asyncio
+import os
+import time
+from collections import Counter, defaultdict, deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+from utils.destination_resolver import destination_resolver
+
+FetchJson = Callable[..., Awaitable[Dict[str, Any]]]
+
+# Hedge once the primary is slower than its own recent p90; until enough samples exist,
+# fall back to a fixed delay. Never hedge sooner than the floor.
+WEATHER_HEDGE_DELAY_S = float(os.getenv("WEATHER_HEDGE_DELAY_S", "2.0"))
+WEATHER_HEDGE_MIN_DELAY_S = float(os.getenv("WEATHER_HEDGE_MIN_DELAY_S", "0.3"))
+# Open-Meteo's free tier is for non-commercial use only, so the hedge is opt-in per deployment
+WEATHER_SECONDARY_PROVIDER = os.getenv("WEATHER_SECONDARY_PROVIDER", "none").lower()
+OPEN_METEO_BASE_URL = os.getenv("OPEN_METEO_BASE_URL", "https://api.open-meteo.com/v1").rstrip("/")
+OPEN_METEO_GEOCODING_URL = os.getenv("OPEN_METEO_GEOCODING_URL", "https://geocoding-api.open-meteo.com/v1").rstrip("/")
+_LATENCY_SAMPLES = 200
+_MIN_SAMPLES_FOR_P90 = 20
+
+# WMO weather interpretation codes (Open-Meteo) -> OpenWeatherMap-style descriptions
+_WMO_CONDITIONS = {
+    0: "clear sky", 1: "few clouds", 2: "scattered clouds", 3: "overcast clouds",
+    45: "fog", 48: "fog", 51: "light drizzle", 53: "drizzle", 55: "heavy drizzle",
+    56: "freezing drizzle", 57: "freezing drizzle", 61: "light rain", 63: "moderate rain",
+    65: "heavy rain", 66: "freezing rain", 67: "freezing rain", 71: "light snow", 73: "snow",
+    75: "heavy snow", 77: "snow grains", 80: "light rain showers", 81: "rain showers",
+    82: "heavy rain showers", 85: "snow showers", 86: "heavy snow showers",
+    95: "thunderstorm", 96: "thunderstorm with hail", 99: "thunderstorm with hail",
+}
+
+
+def is_valid_forecast(forecast: Any) -> bool:
+    days = forecast.get("forecastday") if isinstance(forecast, dict) else None
+    return bool(days) and all(isinstance(d, dict) and "date" in d and "max_temp" in d for d in days)
+
+
+# ---------- PROVIDERS ----------
+# Every provider returns {"forecastday": [{date, condition, min_temp, max_temp, avg_temp,
+# precipitation (mm), wind_speed (m/s), humidity (%), uv_index}, ...]} or raises.
+class WeatherProvider:
+    name = "provider"
+
+    async def forecast(self, destination: str, duration_days: int) -> Dict[str, Any]:
+        raise NotImplementedError
+
+
+class OpenWeatherMapProvider(WeatherProvider):
+    name = "openweathermap"
+
+    def __init__(self, fetch_json: FetchJson, api_key: str,
+                 base_url: str = "https://api.openweathermap.org/data/2.5/forecast"):
+        self.fetch_json = fetch_json
+        self.api_key = api_key
+        self.base_url = base_url
+
+    async def forecast(self, destination: str, duration_days: int) -> Dict[str, Any]:
+        url = f"{self.base_url}?q={destination}&appid={self.api_key}&units=metric"
+        data = await self.fetch_json(url)
+
+        daily_data = defaultdict(list)
+        for item in data.get("list", []):
+            date_str = item["dt_txt"].split(" ")[0]
+            daily_data[date_str].append(item)
+
+        forecast_days = []
+        for i, (date, items) in enumerate(daily_data.items()):
+            if i >= duration_days:
+                break
+            min_temp = min(item["main"]["temp_min"] for item in items)
+            max_temp = max(item["main"]["temp_max"] for item in items)
+            avg_temp = sum(item["main"]["temp"] for item in items) / len(items)
+            precipitation = sum(item.get("rain", {}).get("3h", 0) for item in items)
+            wind_speed = max(item["wind"]["speed"] for item in items)
+            humidity = sum(item["main"]["humidity"] for item in items) / len(items)
+            condition = items[len(items)//2]["weather"][0]["description"]
+            uv_index = 5  # Default since free API does not provide UV
+
+            # Rounded at the source: extra digits are noise to the planner and cost tokens downstream
+            forecast_days.append({
+                "date": date,
+                "condition": condition,
+                "min_temp": round(min_temp, 1),
+                "max_temp": round(max_temp, 1),
+                "avg_temp": round(avg_temp, 1),
+                "precipitation": round(precipitation, 1),
+                "wind_speed": round(wind_speed, 1),
+                "humidity": round(humidity),
+                "uv_index": uv_index
+            })
+        return {"forecastday": forecast_days}
+
+
+class OpenMeteoProvider(WeatherProvider):
+    """Keyless secondary. Known destinations use gazetteer coordinates, others one geocoding call."""
+    name = "open-meteo"
+
+    def __init__(self, fetch_json: FetchJson,
+                 base_url: str = f"{OPEN_METEO_BASE_URL}/forecast",
+                 geocode_url: str = f"{OPEN_METEO_GEOCODING_URL}/search"):
+        self.fetch_json = fetch_json
+        self.base_url = base_url
+        self.geocode_url = geocode_url
+
+    async def _coordinates(self, destination: str) -> Optional[Dict[str, float]]:
+        name = destination.split(",")[0].strip()  # weather_query_for() adds ",CC"
+        match = destination_resolver.resolve(name)
+        entry = destination_resolver.get(match["canonical_id"]) if match["matched"] else None
+        if entry and entry.get("lat") is not None:
+            return {"lat": entry["lat"], "lng": entry["lng"]}
+        data = await self.fetch_json(f"{self.geocode_url}?name={name}&count=1", retries=1, upstream="openmeteo")
+        results = data.get("results") or []
+        return {"lat": results[0]["latitude"], "lng": results[0]["longitude"]} if results else None
+
+    async def forecast(self, destination: str, duration_days: int) -> Dict[str, Any]:
+        coords = await self._coordinates(destination)
+        if not coords:
+            raise ValueError(f"no coordinates for {destination}")
+        url = (f"{self.base_url}?latitude={coords['lat']}&longitude={coords['lng']}"
+               "&daily=weather_code,temperature_2m_max,temperature_2m_min,temperature_2m_mean,"
+               "precipitation_sum,wind_speed_10m_max,relative_humidity_2m_mean,uv_index_max"
+               f"&wind_speed_unit=ms&timezone=auto&forecast_days={max(1, min(16, duration_days))}")
+        daily = (await self.fetch_json(url, retries=1, upstream="openmeteo")).get("daily") or {}
+
+        def col(key, i, default=0.0):
+            values = daily.get(key) or []
+            return values[i] if i < len(values) and values[i] is not None else default
+
+        forecast_days = []
+        for i, date in enumerate((daily.get("time") or [])[:duration_days]):
+            lo, hi = col("temperature_2m_min", i, None), col("temperature_2m_max", i, None)
+            if lo is None or hi is None:
+                break  # model horizon reached; a partial day would read as 0°C
+            forecast_days.append({
+                "date": date,
+                "condition": _WMO_CONDITIONS.get(int(col("weather_code", i, 0)), "clear sky"),
+                "min_temp": round(lo, 1),
+                "max_temp": round(hi, 1),
+                "avg_temp": round(col("temperature_2m_mean", i, (lo + hi) / 2), 1),
+                "precipitation": round(col("precipitation_sum", i), 1),
+                "wind_speed": round(col("wind_speed_10m_max", i), 1),
+                "humidity": round(col("relative_humidity_2m_mean", i, 60)),
+                "uv_index": round(col("uv_index_max", i, 5)),
+            })
+        return {"forecastday": forecast_days}
+
+
+# ---------- HEDGING ----------
+class HedgedForecast:
+    """
+    Asks the primary first. If it has not answered by its observed p90 latency (or fails),
+    the secondary is asked too and the first valid forecast wins; the other call is cancelled.
+    """
+
+    def __init__(self, primary: WeatherProvider, secondary: Optional[WeatherProvider] = None,
+                 default_delay: float = WEATHER_HEDGE_DELAY_S, min_delay: float = WEATHER_HEDGE_MIN_DELAY_S):
+        self.primary = primary
+        self.secondary = secondary
+        self.default_delay = default_delay
+        self.min_delay = min_delay
+        self._latencies: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=_LATENCY_SAMPLES))
+        self.counters = Counter()
+
+    def hedge_delay(self) -> float:
+        samples = sorted(self._latencies[self.primary.name])
+        if len(samples) < _MIN_SAMPLES_FOR_P90:
+            return self.default_delay
+        return max(self.min_delay, samples[int(0.9 * (len(samples) - 1))])
+
+    async def _timed(self, provider: WeatherProvider, destination: str, duration_days: int) -> Dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            result = await provider.forecast(destination, duration_days)
+        except asyncio.CancelledError:
+            # A loser cancelled after the hedge would have taken at least this long. Dropping
+            # it would leave only the fast answers in the window and drag the p90 (and with it
+            # the hedge delay) down; its elapsed time is a lower bound, so keep that instead.
+            self._latencies[provider.name].append(time.perf_counter() - started)
+            raise
+        if not is_valid_forecast(result):
+            raise ValueError(f"{provider.name} returned no forecast days")
+        self._latencies[provider.name].append(time.perf_counter() - started)
+        return result
+
+    async def forecast(self, destination: str, duration_days: int) -> Dict[str, Any]:
+        self.counters["requests"] += 1
+        tasks = {asyncio.ensure_future(self._timed(self.primary, destination, duration_days)): self.primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.hedge_delay() if self.secondary else None)
+            if self.secondary:
+                if not done:
+                    self.counters["hedged"] += 1
+                    print(f"[Weather] ⏱️ {self.primary.name} slower than {self.hedge_delay():.2f}s; "
+                          f"hedging with {self.secondary.name}")
+                elif next(iter(done)).exception() is not None:
+                    self.counters["failovers"] += 1
+                    print(f"[Weather] {self.primary.name} failed; falling back to {self.secondary.name}")
+                if not done or next(iter(done)).exception() is not None:
+                    tasks[asyncio.ensure_future(self._timed(self.secondary, destination, duration_days))] = self.secondary
+
+            errors = []
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        self.counters[f"wins.{tasks[task].name}"] += 1
+                        return task.result()
+                    errors.append(f"{tasks[task].name}: {task.exception()}")
+            raise RuntimeError("; ".join(errors))
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        requests = self.counters["requests"]
+        out = {
+            "primary": self.primary.name,
+            "secondary": self.secondary.name if self.secondary else None,
+            **self.counters,
+            "hedge_rate": round(self.counters["hedged"] / requests, 4) if requests else 0.0,
+            "hedge_delay_s": round(self.hedge_delay(), 3),
+            "latency_ms": {},
+        }
+        for name, samples in self._latencies.items():
+            ordered = sorted(samples)
+            if ordered:
+                out["latency_ms"][name] = {
+                    "p50": round(ordered[len(ordered) // 2] * 1000, 1),
+                    "p90": round(ordered[int(0.9 * (len(ordered) - 1))] * 1000, 1),
+                    "samples": len(ordered),
+                }
+        return out
@@ -1,10 +1,17 @@
 import os
 import aiohttp
 import asyncio
+import time
 from dotenv import load_dotenv
 from typing import Dict, Any, List
 from datetime import datetime, timedelta
-from collections import defaultdict
+from utils.metrics import timed_upstream
+from utils.rate_governor import rate_governor
+from utils.fault_injection import fault_injector
+from utils.upstream_tape import TapeMissError, upstream_tape
+from services.weather_providers import (
+    HedgedForecast, OpenMeteoProvider, OpenWeatherMapProvider, WEATHER_SECONDARY_PROVIDER,
+)
 
 load_dotenv()
 
@@ -14,21 +21,47 @@ class WeatherService:
         self.api_key = os.getenv("WEATHER_API_KEY")
         if not self.api_key:
             raise ValueError("WEATHER_API_KEY not found in environment variables")
-        self.base_url_current = "https://api.openweathermap.org/data/2.5/weather"
-        self.base_url_forecast = "https://api.openweathermap.org/data/2.5/forecast"
+        base_url = os.getenv("OPENWEATHERMAP_BASE_URL", "https://api.openweathermap.org/data/2.5").rstrip("/")
+        self.base_url_current = f"{base_url}/weather"
+        self.base_url_forecast = f"{base_url}/forecast"
+        # OpenWeatherMap first; a keyless secondary is raced in when it runs slow or fails
+        self.forecaster = self._build_forecaster()
         print("[Init] WeatherService initialized successfully.")
 
-    async def _fetch_json(self, url: str, retries: int = 3, timeout: int = 10) -> Dict:
+    def _build_forecaster(self) -> HedgedForecast:
+        # Providers resolve _fetch_json at call time so it can be swapped (benchmarks, tests)
+        fetch = lambda *args, **kwargs: self._fetch_json(*args, **kwargs)
+        primary = OpenWeatherMapProvider(fetch, self.api_key, self.base_url_forecast)
+        secondary = OpenMeteoProvider(fetch) if WEATHER_SECONDARY_PROVIDER == "open-meteo" else None
+        return HedgedForecast(primary, secondary)
+
+    async def _fetch_json(self, url: str, retries: int = 3, timeout: int = 10,
+                          upstream: str = "openweathermap") -> Dict:
         """Internal method to fetch JSON with retries, timeout, and debug prints"""
         for attempt in range(1, retries + 1):
             try:
                 print(f"[Attempt {attempt}] Fetching {url} ...")
+                if upstream_tape.replaying:
+                    # Offline: served from the recorded tape; a miss fails fast instead of retrying
+                    with timed_upstream(upstream, "GET"):
+                        fault = await fault_injector.inject(upstream, "GET")
+                        return fault.mangle(await upstream_tape.replay(upstream, "GET", url))
+                await rate_governor.acquire(upstream)  # retries spend quota too
                 async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=timeout)) as session:
-                    async with session.get(url) as response:
-                        response.raise_for_status()
-                        data = await response.json()
+                    with timed_upstream(upstream, "GET"):
+                        fault = await fault_injector.inject(upstream, "GET")
+                        # The tape keeps what the upstream really did: the raw body and the
+                        # network time, not the injected delay or truncation
+                        started = time.perf_counter()
+                        async with session.get(url) as response:
+                            response.raise_for_status()
+                            raw = await response.json()
+                        upstream_tape.record(upstream, "GET", url, None, raw, time.perf_counter() - started)
+                        data = fault.mangle(raw)
                         print(f"[Success] Fetched data from {url}")
                         return data
+            except TapeMissError:
+                raise
             except asyncio.TimeoutError:
                 print(f"[Attempt {attempt}] Timeout fetching {url}")
             except aiohttp.ClientResponseError as e:
@@ -61,43 +94,12 @@ class WeatherService:
             return {"current": {}, "error": str(e)}
 
     async def get_forecast(self, destination: str, duration_days: int = 5) -> dict:
-        """Get daily forecast summary from OpenWeatherMap 3-hour interval data"""
+        """Daily forecast summary (OpenWeatherMap, hedged with the secondary provider)"""
         print(f"[Start] get_forecast for {destination}, duration_days={duration_days}")
         try:
-            url = f"{self.base_url_forecast}?q={destination}&appid={self.api_key}&units=metric"
-            data = await self._fetch_json(url)
-
-            daily_data = defaultdict(list)
-            for item in data.get("list", []):
-                date_str = item["dt_txt"].split(" ")[0]
-                daily_data[date_str].append(item)
-
-            forecast_days = []
-            for i, (date, items) in enumerate(daily_data.items()):
-                if i >= duration_days:
-                    break
-                min_temp = min(item["main"]["temp_min"] for item in items)
-                max_temp = max(item["main"]["temp_max"] for item in items)
-                avg_temp = sum(item["main"]["temp"] for item in items) / len(items)
-                precipitation = sum(item.get("rain", {}).get("3h", 0) for item in items)
-                wind_speed = max(item["wind"]["speed"] for item in items)
-                humidity = sum(item["main"]["humidity"] for item in items) / len(items)
-                condition = items[len(items)//2]["weather"][0]["description"]
-                uv_index = 5  # Default since free API does not provide UV
-
-                forecast_days.append({
-                    "date": date,
-                    "condition": condition,
-                    "min_temp": min_temp,
-                    "max_temp": max_temp,
-                    "avg_temp": avg_temp,
-                    "precipitation": precipitation,
-                    "wind_speed": wind_speed,
-                    "humidity": humidity,
-                    "uv_index": uv_index
-                })
-            print(f"[Success] Processed forecast for {destination}, days={len(forecast_days)}")
-            return {"forecastday": forecast_days}
+            forecast = await self.forecaster.forecast(destination, duration_days)
+            print(f"[Success] Processed forecast for {destination}, days={len(forecast['forecastday'])}")
+            return forecast
         except Exception as e:
             print(f"[Error] Failed to fetch forecast for {destination}: {str(e)}")
             return {"forecastday": [], "error": str(e)}
@@ -198,7 +200,8 @@ class WeatherService:
                 "duration_days": duration_days,
                 "overall_weather_score": round(overall_score / max(1, duration_days), 1),
                 "daily_weather": daily_weather,
-                "best_days_for_outdoor": sorted(daily_weather, key=lambda x: x["suitability_scores"]["outdoor"], reverse=True)[:3],
+                # Dates only; the day objects are already in daily_weather
+                "best_days_for_outdoor": [d["date"] for d in sorted(daily_weather, key=lambda x: x["suitability_scores"]["outdoor"], reverse=True)[:3]],
                 "weather_alerts": self._generate_weather_alerts(daily_weather)
             }
             print(f"[Success] Weather summary generated for {destination}")
@@ -2,6 +2,7 @@
 import asyncio
 from google.adk.tools import FunctionTool
 from services.dynamic_ingestion_service import ingestion_service
+from utils.destination_resolver import resolve_destination
 
 def discover_new_destination(destination: str) -> dict:
     try:
@@ -24,7 +25,14 @@ def check_destination_exists(destination: str,
     except Exception as e:
         return {"destination": destination, "exists": False, "error": str(e)}
 
+def resolve_destination_name(destination: str) -> dict:
+    try:
+        return resolve_destination(destination)
+    except Exception as e:
+        return {"query": destination, "matched": False, "error": str(e)}
+
 destination_function_tools = [
     FunctionTool(func=discover_new_destination),
     FunctionTool(func=check_destination_exists),
+    FunctionTool(func=resolve_destination_name),
 ]
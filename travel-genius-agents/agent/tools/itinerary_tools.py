@@ -1,31 +1,17 @@
 # tools/itinerary_tools.py
-import json
-import re
 from google.adk.tools import FunctionTool
 from utils.itinerary_helper import (
     create_weather_optimized_itinerary
 )
-
-def _fix_python_json(json_str: str) -> str:
-    """Convert Python boolean/None values to JSON-compatible values"""
-    if not json_str:
-        return json_str
-    # Replace Python True/False/None with JSON true/false/null
-    json_str = re.sub(r'\bTrue\b', 'true', json_str)
-    json_str = re.sub(r'\bFalse\b', 'false', json_str)
-    json_str = re.sub(r'\bNone\b', 'null', json_str)
-    return json_str
+from utils.json_parser import parse_tolerant
 
 def parse_and_structure_itinerary(weather_data_json: str,
                                   user_input_json: str,
                                   agent_text: str) -> dict:
     try:
-        # Fix Python booleans in JSON strings before parsing
-        weather_json = _fix_python_json(weather_data_json) if weather_data_json else "{}"
-        user_json = _fix_python_json(user_input_json) if user_input_json else "{}"
-        
-        weather = json.loads(weather_json) if weather_json else {}
-        user    = json.loads(user_json)   if user_json   else {}
+        # Tolerant single-pass parse: Python True/False/None outside strings, fences, truncation
+        weather = parse_tolerant(weather_data_json, default={})
+        user    = parse_tolerant(user_input_json,   default={})
         itinerary = create_weather_optimized_itinerary(weather, user, agent_text)
         return {"success": True, "itinerary": itinerary}
     except Exception as e:
@@ -4,17 +4,24 @@ from google.adk.tools import FunctionTool
 from utils.weather_helper import (
     extract_destination_from_text, analyze_weather_suitability
 )
+from utils.destination_resolver import canonical_destination_key, weather_query_for
+from utils.gazetteer import extract_destination
+from utils.weather_codec import compact_weather
 from services.weather_service import weather_service
+from utils.metrics import record_cache_lookup
 
 # ---------- CACHE FOR WEATHER DATA (PREVENTS DUPLICATE CALLS) ----------
 _weather_cache = {}
 
 def _get_cache_key(destination: str, start_date: str, duration_days: int) -> str:
-    """Generate cache key from parameters"""
-    return f"{destination}:{start_date}:{duration_days}"
+    """Generate cache key from parameters ("Bankok" and "Bangkok, Thailand" share one entry)"""
+    return f"{canonical_destination_key(destination)}:{start_date}:{duration_days}"
 
 # ---------- WRAPPED FUNCTIONS ----------
 def extract_destination_from_query(query: str) -> dict:
+    # Gazetteer hits carry the canonical id and coordinates as well
+    if (match := extract_destination(query)):
+        return match
     return {"destination": extract_destination_from_text(query)}
 
 def get_weather_analysis(destination: str,
@@ -23,19 +30,22 @@ def get_weather_analysis(destination: str,
     """
     Get weather analysis with caching to prevent duplicate API calls.
     Returns cached result if same parameters were used recently.
+    The result is in the compact per-day row format (utils/weather_codec.py);
+    deterministic callers use expand_weather() to get the full dicts back.
     """
     # Check cache first
     cache_key = _get_cache_key(destination, start_date, duration_days)
+    record_cache_lookup("weather_tool", cache_key in _weather_cache)
     if cache_key in _weather_cache:
         print(f"[Cache Hit] Returning cached weather data for {destination}")
-        return _weather_cache[cache_key]
+        return compact_weather(_weather_cache[cache_key])
     
     # Cache miss - fetch new data
     try:
         print(f"[Cache Miss] Fetching weather data for {destination}")
         data = asyncio.get_event_loop().run_until_complete(
             weather_service.get_weather_summary_for_dates(
-                destination, start_date, duration_days)
+                weather_query_for(destination), start_date, duration_days)
         )
         result = analyze_weather_suitability(data, destination)
         
@@ -43,12 +53,26 @@ def get_weather_analysis(destination: str,
         _weather_cache[cache_key] = result
         print(f"[Cache Store] Cached weather data for {destination}")
         
-        return result
+        return compact_weather(result)
     except Exception as e:
         error_result = {"destination": destination, "error": str(e)}
         # Don't cache errors
         return error_result
 
+def cached_weather_analysis(destination: str, start_date: str, duration_days: int):
+    """The cached get_weather_analysis result (full dicts), or None; never calls the API."""
+    return _weather_cache.get(_get_cache_key(destination, start_date, duration_days))
+
+
+async def fetch_weather_analysis(destination: str, start_date: str, duration_days: int) -> dict:
+    """Async get_weather_analysis for callers already on the event loop (full dicts, cached)."""
+    cache_key = _get_cache_key(destination, start_date, duration_days)
+    if cache_key not in _weather_cache:
+        data = await weather_service.get_weather_summary_for_dates(
+            weather_query_for(destination), start_date, duration_days)
+        _weather_cache[cache_key] = analyze_weather_suitability(data, destination)
+    return _weather_cache[cache_key]
+
 def get_current_weather_report(destination: str) -> dict:
     try:
         current  = asyncio.get_event_loop().run_until_complete(
@@ -0,0 +1,202 @@
+# utils/agent_memo.py
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional, Callable
+
+from google.adk.agents.callback_context import CallbackContext
+from google.genai import types
+
+from utils.destination_resolver import canonical_destination_key
+from utils.itinerary_cache import budget_bucket
+from utils.request_parser import parse_trip_request
+from utils.weather_codec import read_weather_state
+
+# Sub-agents whose output depends on the destination and weather rather than on the user.
+# `inputs` are the only request features in the key; bump `version` when the prompt changes.
+MEMO_POLICIES: Dict[str, Dict[str, Any]] = {
+    "gems_discoverer": {
+        "output_key": "hidden_gems",
+        "inputs": ("destination", "wetness"),
+        "ttl_seconds": 7 * 86400,   # search results for a city change slowly
+        "version": 1,
+    },
+    "accommodation_specialist": {
+        "output_key": "accommodation_options",
+        "inputs": ("destination", "personality", "budget_bucket", "temperature_band"),
+        "ttl_seconds": 86400,       # prices and availability move daily
+        "version": 1,
+    },
+    "sustainability_advisor": {
+        "output_key": "sustainability_notes",
+        "inputs": ("destination", "season", "wetness"),
+        "ttl_seconds": 30 * 86400,  # emission factors and seasonal advice barely move
+        "version": 1,
+    },
+}
+
+# Same opt-out flag as the itinerary cache (pipeline/cache.py)
+MEMO_OPT_OUT_KEY = "skip_itinerary_cache"
+
+AGENT_MEMO_MAX_ENTRIES = int(os.getenv("AGENT_MEMO_MAX_ENTRIES", "2000"))
+
+
+def _user_text(callback_context: CallbackContext) -> str:
+    content = callback_context.user_content
+    if not content or not content.parts:
+        return ""
+    return " ".join(part.text for part in content.parts if getattr(part, "text", None))
+
+
+def _daily(weather: Dict[str, Any]) -> list:
+    return [d for d in weather.get("daily_forecast") or [] if isinstance(d, dict)]
+
+
+def memo_inputs(trip: Dict[str, Any], weather: Dict[str, Any]) -> Dict[str, str]:
+    """Coarse request features a memo key can be built from."""
+    days = _daily(weather)
+    wet_days = sum(1 for d in days
+                   if (d.get("precipitation") or 0) > 1 or "rain" in str(d.get("condition", "")).lower())
+    if not days:
+        wetness = "unknown"
+    elif wet_days == 0:
+        wetness = "dry"
+    elif wet_days * 2 <= len(days):
+        wetness = "mixed"
+    else:
+        wetness = "wet"
+
+    temps = [d["avg_temp"] for d in days if isinstance(d.get("avg_temp"), (int, float))]
+    temperature_band = f"{int(sum(temps) / len(temps) // 5 * 5)}c" if temps else "unknown"
+
+    first_date = days[0].get("date", "") if days else ""
+    try:
+        month = datetime.strptime(first_date[:10], "%Y-%m-%d").month
+    except ValueError:
+        month = datetime.now(timezone.utc).month
+
+    destination = trip.get("canonical_id") or canonical_destination_key(weather.get("destination", ""))
+    return {
+        "destination": destination,
+        "personality": trip.get("personality") or "any",
+        # A default budget says nothing about the user's: keys that use it are not memoized
+        "budget_bucket": str(budget_bucket(trip.get("budget", 0))) if trip.get("budget_source") != "default" else "",
+        "wetness": wetness,
+        "temperature_band": temperature_band,
+        "season": f"m{month:02d}",
+    }
+
+
+class AgentMemo:
+    """
+    Cross-session store of sub-agent outputs keyed on each agent's policy inputs: a bounded
+    LRU (like ItineraryCache) whose expired entries are swept on every store.
+    """
+
+    def __init__(self, policies: Dict[str, Dict[str, Any]] = MEMO_POLICIES,
+                 max_entries: int = AGENT_MEMO_MAX_ENTRIES):
+        self.policies = policies
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.metrics = Counter()
+
+    def key_for(self, agent_name: str, inputs: Dict[str, str]) -> Optional[str]:
+        policy = self.policies.get(agent_name)
+        if not policy or not inputs.get("destination"):
+            return None
+        parts = [inputs.get(name, "") for name in policy["inputs"]]
+        if not all(parts):
+            return None
+        return f"{agent_name}:v{policy['version']}:" + "|".join(parts)
+
+    def get(self, agent_name: str, key: Optional[str]) -> Optional[str]:
+        if not key:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.time():
+                self._entries.move_to_end(key)
+                self.metrics[f"{agent_name}.hits"] += 1
+                return entry[1]
+            if entry:
+                del self._entries[key]
+                self.metrics["expired"] += 1
+            self.metrics[f"{agent_name}.misses"] += 1
+            return None
+
+    def put(self, agent_name: str, key: Optional[str], value: Any) -> None:
+        if not key or not value:
+            return
+        now = time.time()
+        with self._lock:
+            for stale in [k for k, entry in self._entries.items() if entry[0] <= now]:
+                del self._entries[stale]
+                self.metrics["expired"] += 1
+            self._entries[key] = (now + self.policies[agent_name]["ttl_seconds"], value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.metrics["evictions"] += 1
+
+    def invalidate(self, agent_name: Optional[str] = None, destination: Optional[str] = None) -> int:
+        """Drop entries for one agent and/or one canonical destination (everything if both are None)."""
+        with self._lock:
+            doomed = [k for k in self._entries
+                      if (agent_name is None or k.startswith(f"{agent_name}:"))
+                      and (destination is None or k.split(":", 2)[2].split("|")[0] == destination)]
+            for k in doomed:
+                del self._entries[k]
+        return len(doomed)
+
+    def stats(self) -> Dict[str, Any]:
+        out = {"entries": len(self._entries), "max_entries": self.max_entries,
+               "expired": self.metrics["expired"], "evictions": self.metrics["evictions"]}
+        for name in self.policies:
+            hits, misses = self.metrics[f"{name}.hits"], self.metrics[f"{name}.misses"]
+            out[name] = {"hits": hits, "misses": misses,
+                         "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0}
+        return out
+
+    def _key_from_context(self, callback_context: CallbackContext) -> Optional[str]:
+        if callback_context.state.get(MEMO_OPT_OUT_KEY):
+            return None
+        trip = parse_trip_request(_user_text(callback_context))
+        weather = read_weather_state(callback_context.state)
+        return self.key_for(callback_context.agent_name, memo_inputs(trip, weather))
+
+    def before_agent(self, callback_context: CallbackContext) -> Optional[types.Content]:
+        """Skips the agent on a hit: the cached output goes into state and the agent's event."""
+        name = callback_context.agent_name
+        key = self._key_from_context(callback_context)
+        cached = self.get(name, key)
+        if cached is None:
+            return None
+        print(f"[Memo Hit] {name} ({key})")
+        callback_context.state[self.policies[name]["output_key"]] = cached
+        return types.Content(role="model", parts=[types.Part(text=cached)])
+
+    def after_agent(self, callback_context: CallbackContext) -> Optional[types.Content]:
+        name = callback_context.agent_name
+        output = callback_context.state.get(self.policies[name]["output_key"])
+        key = self._key_from_context(callback_context)
+        if key and isinstance(output, str) and output.strip():
+            self.put(name, key, output)
+            print(f"[Memo Store] {name} ({key})")
+        return None
+
+
+# Singleton
+agent_memo = AgentMemo()
+
+
+def memo_callbacks(agent_name: str) -> Dict[str, Callable]:
+    """before/after_agent_callback kwargs for an Agent(...) covered by MEMO_POLICIES."""
+    policy = MEMO_POLICIES[agent_name]
+    return {
+        "output_key": policy["output_key"],
+        "before_agent_callback": agent_memo.before_agent,
+        "after_agent_callback": agent_memo.after_agent,
+    }
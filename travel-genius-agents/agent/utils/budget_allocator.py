@@ -0,0 +1,128 @@
+# utils/budget_allocator.py
+from typing import Dict, Any, List, Optional
+
+# Budget split per travel personality, in percent of what is left after the weather
+# contingency (the table budget_optimizer's prompt used to hand to Gemini).
+PERSONALITY_SPLITS: Dict[str, Dict[str, int]] = {
+    "heritage":  {"transport": 40, "accommodation": 35, "activities": 20, "buffer": 5},
+    "adventure": {"transport": 35, "accommodation": 25, "activities": 35, "buffer": 5},
+    "luxury":    {"transport": 30, "accommodation": 45, "activities": 20, "buffer": 5},
+    "party":     {"transport": 35, "accommodation": 30, "activities": 30, "buffer": 5},
+    "cultural":  {"transport": 40, "accommodation": 30, "activities": 25, "buffer": 5},
+}
+DEFAULT_SPLIT = {"transport": 35, "accommodation": 30, "activities": 30, "buffer": 5}
+
+ACTIVITY_LABELS = {
+    "heritage": "cultural activities",
+    "adventure": "activities/experiences",
+    "luxury": "premium experiences",
+    "party": "nightlife/entertainment",
+    "cultural": "authentic experiences",
+}
+
+# Weather contingency: 3% on a dry trip, up to 5% when every day is wet and alerts pile up
+CONTINGENCY_MIN_PCT = 3.0
+CONTINGENCY_MAX_PCT = 5.0
+WET_DAY_MM = 5.0      # precipitation (mm) from which a day counts as wet
+HEAVY_RAIN_MM = 10.0  # ... and counts double
+# Share of intercity transport (arrival/departure) booked on the first and last day
+INTERCITY_SHARE = 0.5
+
+
+def _split_exact(total: int, weights: List[float]) -> List[int]:
+    """Largest-remainder apportionment: integer parts proportional to weights, summing to total."""
+    weight_sum = sum(weights)
+    if total <= 0 or weight_sum <= 0:
+        return [0] * len(weights)
+    raw = [total * w / weight_sum for w in weights]
+    parts = [int(r) for r in raw]
+    by_remainder = sorted(range(len(raw)), key=lambda i: (raw[i] - parts[i], -i), reverse=True)
+    for i in by_remainder[:total - sum(parts)]:
+        parts[i] += 1
+    return parts
+
+
+def _day_risk(day: Dict[str, Any]) -> float:
+    rain = day.get("precipitation") or 0
+    if rain >= HEAVY_RAIN_MM:
+        return 2.0
+    if rain >= WET_DAY_MM or "storm" in str(day.get("condition", "")).lower():
+        return 1.0
+    return 0.0
+
+
+def weather_contingency_pct(weather: Optional[Dict[str, Any]], days: int) -> float:
+    """3-5% of the budget, scaled by the share of wet days and the number of weather alerts."""
+    weather = weather or {}
+    forecast = [d for d in weather.get("daily_forecast") or [] if isinstance(d, dict)][:days]
+    if not forecast:
+        return CONTINGENCY_MIN_PCT
+    rain_score = min(1.0, sum(_day_risk(d) for d in forecast) / len(forecast))  # heavy rain counts double
+    alert_score = min(1.0, len(weather.get("alerts") or []) / max(1, days))
+    pressure = 0.6 * rain_score + 0.4 * alert_score
+    return round(CONTINGENCY_MIN_PCT + (CONTINGENCY_MAX_PCT - CONTINGENCY_MIN_PCT) * pressure, 2)
+
+
+def allocate_budget(budget: int, days: int, group_size: int = 1, personality: str = "",
+                    weather: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Exact budget allocation for a trip: per category and per day, in whole currency units,
+    every breakdown summing to the total. `weather` is the full get_weather_analysis dict
+    (expand_weather of state.weather_data); wet days hold the weather contingency.
+    """
+    budget = max(0, int(budget))
+    days = max(1, int(days))
+    group_size = max(1, int(group_size))
+    personality = (personality or "").lower()
+    split = PERSONALITY_SPLITS.get(personality, DEFAULT_SPLIT)
+
+    contingency_pct = weather_contingency_pct(weather, days)
+    contingency = round(budget * contingency_pct / 100)
+    names = list(split)
+    categories = dict(zip(names, _split_exact(budget - contingency, [split[n] for n in names])))
+    categories["weather_contingency"] = contingency
+
+    forecast = [d for d in (weather or {}).get("daily_forecast") or [] if isinstance(d, dict)]
+    risk = [_day_risk(forecast[i]) if i < len(forecast) else 0.0 for i in range(days)]
+
+    # Intercity transport lands on the first and last day; local transport, stays, activities
+    # and the buffer are spread evenly; the contingency sits on the wet days (evenly if none)
+    intercity = round(categories["transport"] * INTERCITY_SHARE) if days > 1 else categories["transport"]
+    ends = [1.0 if i in (0, days - 1) else 0.0 for i in range(days)]
+    per_category_day = {
+        "transport": [a + b for a, b in zip(_split_exact(intercity, ends),
+                                            _split_exact(categories["transport"] - intercity, [1.0] * days))],
+        "accommodation": _split_exact(categories["accommodation"], [1.0] * days),
+        "activities": _split_exact(categories["activities"], [1.0] * days),
+        "buffer": _split_exact(categories["buffer"], [1.0] * days),
+        "weather_contingency": _split_exact(contingency, risk if any(risk) else [1.0] * days),
+    }
+
+    per_day = []
+    for i in range(days):
+        row = {"day": i + 1}
+        if i < len(forecast) and forecast[i].get("date"):
+            row["date"] = forecast[i]["date"]
+        row.update({name: per_category_day[name][i] for name in per_category_day})
+        row["total"] = sum(per_category_day[name][i] for name in per_category_day)
+        per_day.append(row)
+
+    notes = [f"{contingency_pct:g}% weather contingency held back for "
+             f"{'the wet days' if any(risk) else 'indoor alternatives and transport delays'}"]
+    if any(risk):
+        notes.append("Prefer flexible, refundable bookings for outdoor plans on wet days")
+        notes.append("Keep indoor options inside the activities budget")
+
+    return {
+        "total": budget,
+        "days": days,
+        "group_size": group_size,
+        "personality": personality or "balanced",
+        "activities_label": ACTIVITY_LABELS.get(personality, "activities"),
+        "split_pct": {**split, "weather_contingency": contingency_pct},
+        "categories": categories,
+        "per_person": budget // group_size,
+        "per_person_per_day": budget // (group_size * days),
+        "per_day": per_day,
+        "notes": notes,
+    }
@@ -0,0 +1,91 @@
+# utils/chat_helper.py
+import re
+from typing import Dict, Any, List, Optional
+
+# Deterministic answers for follow-up questions that only need the stored itinerary.
+# Anything not matched here goes to the lightweight itinerary_assistant agent.
+
+_DAY_PATTERN = re.compile(r'\bday\s*(\d{1,2})\b', re.IGNORECASE)
+_COST_KEYWORDS = ('total cost', 'how much', 'overall cost', 'total budget', 'cost of the trip', 'spend')
+_WEATHER_KEYWORDS = ('weather', 'rain', 'sunny', 'forecast', 'temperature')
+_SCHEDULE_KEYWORDS = ('what is on', "what's on", 'what are we doing', 'plan for', 'schedule', 'activities')
+
+
+def _day_plan(itinerary: Dict[str, Any], day: int) -> Optional[Dict[str, Any]]:
+    for plan in itinerary.get("dailyPlans", []):
+        if plan.get("day") == day:
+            return plan
+    return None
+
+
+def _answer(text: str, day: Optional[int] = None, activity: Optional[str] = None,
+            emoji: str = "✨") -> Dict[str, Any]:
+    return {"answer": text, "day": day, "activity": activity, "emoji": emoji}
+
+
+def _cost_answer(itinerary: Dict[str, Any], day: Optional[int]) -> Optional[Dict[str, Any]]:
+    if day is not None:
+        plan = _day_plan(itinerary, day)
+        if not plan:
+            return None
+        day_total = sum(a.get("cost", 0) for a in plan.get("activities", []))
+        return _answer(f"Day {day} activities add up to about ₹{day_total:,}.", day=day, emoji="💰")
+    total = itinerary.get("totalEstimatedCost")
+    if total is None:
+        return None
+    return _answer(f"The whole trip is estimated at ₹{total:,}.", emoji="💰")
+
+
+def _weather_answer(itinerary: Dict[str, Any], day: Optional[int]) -> Optional[Dict[str, Any]]:
+    if day is None:
+        summary = itinerary.get("weatherSummary") or {}
+        if "overallScore" not in summary:
+            return None
+        recs = summary.get("recommendations") or []
+        text = f"Overall weather score is {summary['overallScore']}/10."
+        if recs:
+            text += f" {recs[0]}"
+        return _answer(text, emoji="🌤️")
+    plan = _day_plan(itinerary, day)
+    if not plan:
+        return None
+    ws = plan.get("weatherSummary") or {}
+    text = (f"Day {day}: {ws.get('condition', 'unknown conditions')}, outdoor score "
+            f"{ws.get('outdoorScore', '?')}/10, indoor score {ws.get('indoorScore', '?')}/10.")
+    if ws.get("recommendations"):
+        text += f" {ws['recommendations'][0]}"
+    return _answer(text, day=day, emoji="🌤️")
+
+
+def _schedule_answer(itinerary: Dict[str, Any], day: Optional[int]) -> Optional[Dict[str, Any]]:
+    if day is None:
+        return None
+    plan = _day_plan(itinerary, day)
+    if not plan:
+        return None
+    items: List[str] = [f"{a.get('timing', '')} {a.get('title', '')}".strip()
+                        for a in plan.get("activities", [])]
+    if not items:
+        return None
+    return _answer(f"Day {day}: " + "; ".join(items) + ".", day=day,
+                   activity=plan["activities"][0].get("title"), emoji="🗓️")
+
+
+def answer_from_itinerary(query: str, itinerary: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Answer simple factual questions about the itinerary without an LLM call (None = not handled)."""
+    if not query or not isinstance(itinerary, dict):
+        return None
+    q = query.lower()
+    m = _DAY_PATTERN.search(q)
+    day = int(m.group(1)) if m else None
+
+    # Requests to change something ("cheaper", "alternative") always need the assistant
+    if any(k in q for k in ('cheaper', 'alternative', 'change', 'replace', 'instead', 'suggest')):
+        return None
+    if any(k in q for k in _COST_KEYWORDS):
+        return _cost_answer(itinerary, day)
+    if any(k in q for k in _WEATHER_KEYWORDS):
+        return _weather_answer(itinerary, day)
+    if any(k in q for k in _SCHEDULE_KEYWORDS):
+        return _schedule_answer(itinerary, day)
+    return None
@@ -0,0 +1,143 @@
+# utils/context_projection.py
+import json
+import threading
+from collections import defaultdict
+from typing import Dict, Any, List, Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+from utils.rate_governor import throttle_model_call
+from utils.state_helper import load_json_value
+
+# What each pipeline agent actually needs to see.
+#   state_keys: session state injected as one compact context block (in this order)
+#   history:    "own"  -> the current user request plus this agent's own turns (tool calls/results)
+#               "full" -> leave the request untouched
+# Agents not listed here are never modified.
+CONTEXT_POLICIES: Dict[str, Dict[str, Any]] = {
+    "weather_planner": {"state_keys": (), "history": "own"},
+    "personality_analyzer": {"state_keys": (), "history": "own"},
+    "gems_discoverer": {"state_keys": ("weather_data",), "history": "own"},
+    "accommodation_specialist": {"state_keys": ("weather_data", "personality_profile", "budget_plan"), "history": "own"},
+    "sustainability_advisor": {"state_keys": ("weather_data",), "history": "own"},
+    "itinerary_generator": {
+        "state_keys": ("weather_data", "personality_profile", "budget_plan",
+                       "hidden_gems", "accommodation_options", "sustainability_notes"),
+        "history": "own",
+    },
+}
+
+# Rough chars-per-token ratio for Gemini, used only to report the projection's effect
+_CHARS_PER_TOKEN = 4
+
+_lock = threading.Lock()
+token_usage: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+
+def _content_chars(contents: List[types.Content]) -> int:
+    total = 0
+    for content in contents:
+        for part in content.parts or []:
+            if part.text:
+                total += len(part.text)
+            elif part.function_call:
+                total += len(str(part.function_call.args))
+            elif part.function_response:
+                total += len(str(part.function_response.response))
+    return total
+
+
+def _content_text(content: Optional[types.Content]) -> str:
+    if not content or not content.parts:
+        return ""
+    return "".join(p.text for p in content.parts if p.text)
+
+
+def _is_own_turn(content: types.Content) -> bool:
+    # Other agents' turns are re-presented by ADK as user-role "For context:" text;
+    # this agent's turns are model-role calls/text and user-role function responses
+    if content.role == "model":
+        return True
+    return any(p.function_response for p in content.parts or [])
+
+
+def _state_block(state, keys) -> Optional[types.Content]:
+    parts = []
+    for key in keys:
+        value = state.get(key)
+        if value in (None, "", {}, []):
+            continue
+        parsed = load_json_value(value) if isinstance(value, (str, dict)) else {}
+        text = json.dumps(parsed, separators=(",", ":"), ensure_ascii=False, default=str) if parsed else str(value).strip()
+        parts.append(types.Part(text=f"[state.{key}] {text}"))
+    if not parts:
+        return None
+    return types.Content(role="user", parts=[types.Part(text="For context:")] + parts)
+
+
+def project_context(callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[LlmResponse]:
+    """before_model_callback: replace the accumulated history with what the agent's policy declares."""
+    policy = CONTEXT_POLICIES.get(callback_context.agent_name)
+    contents = llm_request.contents or []
+    before = _content_chars(contents)
+
+    if policy and policy["history"] == "own" and contents:
+        request_text = _content_text(callback_context.user_content)
+        start = 0
+        for i in range(len(contents) - 1, -1, -1):
+            if contents[i].role == "user" and _content_text(contents[i]) == request_text:
+                start = i
+                break
+
+        projected = [contents[start]]
+        if (block := _state_block(callback_context.state, policy["state_keys"])):
+            projected.append(block)
+        projected.extend(c for c in contents[start + 1:] if _is_own_turn(c))
+        llm_request.contents = projected
+
+    after = _content_chars(llm_request.contents or [])
+    with _lock:
+        usage = token_usage[callback_context.agent_name]
+        usage["history_chars_before"] += before
+        usage["history_chars_after"] += after
+    return None
+
+
+def record_token_usage(callback_context: CallbackContext, llm_response: LlmResponse) -> Optional[LlmResponse]:
+    """after_model_callback: accumulate Gemini's reported token counts per agent."""
+    meta = llm_response.usage_metadata
+    if meta is None or llm_response.partial:
+        return None
+    with _lock:
+        usage = token_usage[callback_context.agent_name]
+        usage["calls"] += 1
+        usage["input_tokens"] += meta.prompt_token_count or 0
+        usage["output_tokens"] += meta.candidates_token_count or 0
+    return None
+
+
+def token_usage_stats() -> Dict[str, Dict[str, Any]]:
+    out = {}
+    with _lock:
+        for agent_name, usage in token_usage.items():
+            calls = usage["calls"]
+            saved_chars = usage["history_chars_before"] - usage["history_chars_after"]
+            out[agent_name] = {
+                **usage,
+                "avg_input_tokens": round(usage["input_tokens"] / calls, 1) if calls else 0.0,
+                "est_tokens_removed": saved_chars // _CHARS_PER_TOKEN,
+            }
+    return out
+
+
+def context_callbacks(*after_model) -> Dict[str, Any]:
+    """before/after_model_callback kwargs for an Agent(...) covered by CONTEXT_POLICIES;
+    the request is projected, then waits for a Gemini quota token. Extra after_model
+    callbacks run after the token accounting."""
+    return {
+        "before_model_callback": [project_context, throttle_model_call],
+        "after_model_callback": [record_token_usage, *after_model],
+    }
@@ -0,0 +1,187 @@
+# utils/destination_resolver.py
+import json
+import os
+import re
+import unicodedata
+from collections import defaultdict
+from typing import Callable, Dict, Any, List, Optional, Set
+
+_DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                          "data", "destinations.json")
+
+# Below this score we do not trust the match (pg_trgm uses 0.3 on bare trigram similarity;
+# ours is also scaled down by the words either side leaves unmatched)
+MIN_CONFIDENCE = 0.5
+# A word counts as matched when at least this share of its trigrams occurs on the other side
+# (typos and run-together names still match: "Bankok", "Capetown" -> "cape town")
+_WORD_COVERAGE = 0.5
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_destination_name(name: str) -> str:
+    """Lower-case, strip accents and punctuation: 'Bangkok, Thailand' -> 'bangkok thailand'."""
+    if not name:
+        return ""
+    text = unicodedata.normalize("NFKD", name)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return _NON_ALNUM.sub(" ", text.lower()).strip()
+
+
+def _slug(normalized: str) -> str:
+    return normalized.replace(" ", "-")
+
+
+def _trigrams(normalized: str) -> Set[str]:
+    """pg_trgm-style trigrams: every word padded with two leading and one trailing space."""
+    grams = set()
+    for word in normalized.split():
+        padded = f"  {word} "
+        for i in range(len(padded) - 2):
+            grams.add(padded[i:i + 3])
+    return grams
+
+
+def _word_coverage(word_grams: List[Set[str]], other_grams: Set[str]) -> float:
+    """Share of the words (given as their trigrams) that mostly occur in `other_grams`."""
+    covered = sum(len(grams & other_grams) >= _WORD_COVERAGE * len(grams) for grams in word_grams)
+    return covered / len(word_grams)
+
+
+class DestinationResolver:
+    """Maps free-text destination names onto canonical destination IDs."""
+
+    def __init__(self, destinations: List[Dict[str, Any]], min_confidence: float = MIN_CONFIDENCE):
+        self.min_confidence = min_confidence
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._exact: Dict[str, str] = {}                 # normalized alias -> canonical id
+        self._alias_grams: Dict[str, Set[str]] = {}      # normalized alias -> trigrams
+        self._alias_words: Dict[str, List[Set[str]]] = {}  # normalized alias -> trigrams per word
+        self._index: Dict[str, Set[str]] = defaultdict(set)  # trigram -> aliases
+        self._on_add: List[Callable[[], None]] = []      # caches derived from resolve()
+        for entry in destinations:
+            self.add(entry)
+
+    @classmethod
+    def from_file(cls, path: str = _DATA_PATH) -> "DestinationResolver":
+        try:
+            with open(path, encoding="utf-8") as fh:
+                destinations = json.load(fh).get("destinations", [])
+        except (OSError, ValueError) as e:
+            print(f"[Warning] Could not load destination catalog {path}: {e}")
+            destinations = []
+        return cls(destinations)
+
+    def add(self, entry: Dict[str, Any]) -> str:
+        """Register a destination (and its aliases) in the index; returns its canonical id."""
+        name = entry["name"]
+        canonical_id = entry.get("id") or _slug(normalize_destination_name(name))
+        entry = {**entry, "id": canonical_id}
+        self._entries[canonical_id] = entry
+
+        aliases = {name, *entry.get("aliases", [])}
+        if entry.get("country"):
+            aliases |= {f"{alias} {entry['country']}" for alias in list(aliases)}
+        for alias in aliases:
+            norm = normalize_destination_name(alias)
+            if not norm or norm in self._exact:
+                continue
+            self._exact[norm] = canonical_id
+            grams = _trigrams(norm)
+            self._alias_grams[norm] = grams
+            self._alias_words[norm] = [_trigrams(word) for word in norm.split()]
+            for gram in grams:
+                self._index[gram].add(norm)
+        for invalidate in self._on_add:
+            invalidate()
+        return canonical_id
+
+    def on_add(self, invalidate: Callable[[], None]) -> None:
+        """Call `invalidate` whenever a destination is added (memoized lookups may now resolve)."""
+        self._on_add.append(invalidate)
+
+    def get(self, canonical_id: str) -> Optional[Dict[str, Any]]:
+        return self._entries.get(canonical_id)
+
+    def aliases(self) -> Dict[str, str]:
+        """Every normalized alias (names, aliases, 'name country') -> canonical id."""
+        return dict(self._exact)
+
+    def resolve(self, name: str) -> Dict[str, Any]:
+        """
+        Resolve a destination name to {canonical_id, name, confidence, matched}.
+        Unknown names still get a stable, normalized id so they can be used as cache keys.
+        """
+        norm = normalize_destination_name(name)
+        if not norm:
+            return {"query": name, "canonical_id": "", "name": "", "confidence": 0.0, "matched": False}
+
+        if norm in self._exact:
+            return self._result(name, self._exact[norm], 1.0)
+
+        query_grams = _trigrams(norm)
+        shared: Dict[str, int] = defaultdict(int)
+        for gram in query_grams:
+            for alias in self._index.get(gram, ()):
+                shared[alias] += 1
+
+        # Trigram similarity alone lets one shared word carry a multi-word name ("York" ->
+        # "new york", "Paris Texas" -> "paris", "Mexico" -> "cancun mexico"), so scale it by
+        # the share of words matched on each side. Candidates go best-similarity first, and
+        # scaling only lowers a score, so stop once none can beat the best or the threshold.
+        similarity = sorted(
+            ((common / (len(query_grams) + len(self._alias_grams[alias]) - common), alias)
+             for alias, common in shared.items()), reverse=True)
+        query_words = [_trigrams(word) for word in norm.split()]
+        best_alias, best_score = None, 0.0
+        for jaccard, alias in similarity:
+            if jaccard <= best_score or jaccard < self.min_confidence:
+                break
+            score = (jaccard * _word_coverage(query_words, self._alias_grams[alias])
+                     * _word_coverage(self._alias_words[alias], query_grams))
+            if score > best_score:
+                best_alias, best_score = alias, score
+
+        if best_alias and best_score >= self.min_confidence:
+            return self._result(name, self._exact[best_alias], best_score)
+
+        return {
+            "query": name,
+            "canonical_id": _slug(norm),
+            "name": name.strip(),
+            "confidence": round(best_score, 3),
+            "matched": False,
+        }
+
+    def _result(self, query: str, canonical_id: str, score: float) -> Dict[str, Any]:
+        entry = self._entries[canonical_id]
+        return {
+            "query": query,
+            "canonical_id": canonical_id,
+            "name": entry["name"],
+            "country": entry.get("country"),
+            "country_code": entry.get("country_code"),
+            "confidence": round(score, 3),
+            "matched": True,
+        }
+
+
+# Singleton instance for use in other modules
+destination_resolver = DestinationResolver.from_file()
+
+
+def resolve_destination(name: str) -> Dict[str, Any]:
+    return destination_resolver.resolve(name)
+
+
+def canonical_destination_key(name: str) -> str:
+    """Canonical id used as the key for weather/Places caches and DB upserts."""
+    return destination_resolver.resolve(name)["canonical_id"]
+
+
+def weather_query_for(name: str) -> str:
+    """OpenWeatherMap `q=` value: 'Bangkok,TH' for known destinations, the raw name otherwise."""
+    match = destination_resolver.resolve(name)
+    if match["matched"] and match.get("country_code"):
+        return f"{match['name']},{match['country_code']}"
+    return name
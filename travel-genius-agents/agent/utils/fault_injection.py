@@ -0,0 +1,270 @@
+# utils/fault_injection.py
+import asyncio
+import json
+import math
+import os
+import random
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.plugins.base_plugin import BasePlugin
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.tool_context import ToolContext
+from google.genai import types
+
+# Fault injection for rehearsing incidents locally (FAULT_SCENARIO=path/to/scenario.json).
+# A scenario lists dependencies and what goes wrong with them:
+#   {"name": "weather_brownout", "seed": 7,
+#    "faults": {"openweathermap": {"latency": {"dist": "lognormal", "p50_ms": 800, "p99_ms": 6000},
+#                                  "error_rate": 0.2, "timeout_rate": 0.05, "partial_rate": 0.1}}}
+# Dependencies use the same names as the upstream labels in /metrics: openweathermap,
+# openmeteo, places, cloudsql, toolbox, gemini, plus tool:<name> for a single ADK tool
+# (tool:get_accommodation_analysis). Per dependency:
+#   latency       extra delay before the call: fixed_ms | uniform min_ms..max_ms |
+#                 normal mean_ms/stddev_ms | lognormal p50_ms/p99_ms | exponential mean_ms
+#   error_rate    share of calls that fail (message: "error")
+#   timeout_rate  share of calls that hang for timeout_s, then time out
+#   partial_rate  share of calls whose payload comes back truncated (lists/text cut in half)
+#   match         only calls whose agent, tool or operation name is listed
+#   window_s      [start, end] seconds after the scenario loaded; faults apply only inside it
+# With no scenario nothing is wrapped and the hooks return immediately.
+FAULT_SCENARIO = os.getenv("FAULT_SCENARIO", "")
+
+_Z99 = 2.326  # standard normal quantile of p99
+
+
+class InjectedFault(Exception):
+    """An error injected by the active fault scenario."""
+
+
+class InjectedTimeout(asyncio.TimeoutError):
+    """A timeout injected by the active fault scenario."""
+
+
+def _load_scenario(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        if path.endswith((".yaml", ".yml")):
+            import yaml  # optional; JSON scenarios need nothing extra
+            return yaml.safe_load(f) or {}
+        return json.load(f)
+
+
+def truncate_payload(payload: Any) -> Any:
+    """Cut every list and long string in half, keeping the shape (a partial upstream response)."""
+    if isinstance(payload, dict):
+        return {k: truncate_payload(v) for k, v in payload.items()}
+    if isinstance(payload, list):
+        return [truncate_payload(v) for v in payload[:len(payload) // 2]]
+    if isinstance(payload, str) and len(payload) > 16:
+        return payload[:len(payload) // 2]
+    return payload
+
+
+class Fault:
+    """What the scenario decided for one call: a delay, then fail / time out / truncate / pass."""
+
+    __slots__ = ("dependency", "delay_s", "kind", "message", "timeout_s")
+
+    def __init__(self, dependency: str, delay_s: float = 0.0, kind: Optional[str] = None,
+                 message: str = "", timeout_s: float = 0.0):
+        self.dependency, self.delay_s, self.kind = dependency, delay_s, kind
+        self.message, self.timeout_s = message, timeout_s
+
+    @property
+    def partial(self) -> bool:
+        return self.kind == "partial"
+
+    def _raise(self) -> None:
+        if self.kind == "error":
+            raise InjectedFault(f"{self.message} ({self.dependency}, injected)")
+        if self.kind == "timeout":
+            raise InjectedTimeout(f"{self.dependency} timed out after {self.timeout_s:.1f}s (injected)")
+
+    async def apply(self) -> "Fault":
+        wait = self.delay_s + (self.timeout_s if self.kind == "timeout" else 0.0)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        self._raise()
+        return self
+
+    def apply_blocking(self) -> "Fault":
+        wait = self.delay_s + (self.timeout_s if self.kind == "timeout" else 0.0)
+        if wait > 0:
+            time.sleep(wait)
+        self._raise()
+        return self
+
+    def mangle(self, payload: Any) -> Any:
+        return truncate_payload(payload) if self.partial else payload
+
+
+_NO_FAULT = Fault("")
+
+
+class FaultInjector:
+    def __init__(self, scenario_path: str = FAULT_SCENARIO):
+        self.scenario: Dict[str, Any] = {}
+        self.faults: Dict[str, Dict[str, Any]] = {}
+        self._loaded_at = time.monotonic()
+        self._rng = random.Random()
+        self._lock = threading.Lock()
+        self.stats_counter = Counter()
+        if scenario_path:
+            self.load(scenario_path)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.faults)
+
+    def load(self, path: str) -> None:
+        try:
+            scenario = _load_scenario(path)
+        except Exception as e:
+            print(f"[Faults] ❌ Could not load fault scenario {path}: {e}")
+            return
+        self.scenario = scenario
+        self.faults = scenario.get("faults") or {}
+        self._loaded_at = time.monotonic()
+        self._rng = random.Random(scenario.get("seed"))
+        print(f"[Faults] 💥 Scenario '{scenario.get('name', os.path.basename(path))}' active for: "
+              f"{', '.join(sorted(self.faults)) or 'nothing'}")
+
+    def _delay_s(self, latency: Optional[Dict[str, Any]]) -> float:
+        if not latency:
+            return 0.0
+        dist = latency.get("dist", "fixed")
+        rng = self._rng
+        if dist == "uniform":
+            ms = rng.uniform(latency.get("min_ms", 0), latency["max_ms"])
+        elif dist == "normal":
+            ms = rng.gauss(latency["mean_ms"], latency.get("stddev_ms", 0))
+        elif dist == "lognormal":
+            p50 = max(latency["p50_ms"], 1e-3)
+            sigma = max(0.0, math.log(max(latency.get("p99_ms", p50), p50) / p50) / _Z99)
+            ms = rng.lognormvariate(math.log(p50), sigma)
+        elif dist == "exponential":
+            ms = rng.expovariate(1.0 / latency["mean_ms"]) if latency["mean_ms"] > 0 else 0.0
+        else:
+            ms = latency.get("fixed_ms", 0)
+        return max(0.0, ms) / 1000
+
+    def plan(self, dependency: str, name: Optional[str] = None) -> Fault:
+        """Decide the fault for one call to `dependency` (`name`: agent, tool or operation)."""
+        spec = self.faults.get(dependency)
+        if spec is None:
+            return _NO_FAULT
+        if spec.get("match") and name not in spec["match"]:
+            return _NO_FAULT
+        window = spec.get("window_s")
+        if window:
+            elapsed = time.monotonic() - self._loaded_at
+            if elapsed < window[0] or (len(window) > 1 and elapsed > window[1]):
+                return _NO_FAULT
+
+        with self._lock:
+            delay = self._delay_s(spec.get("latency"))
+            roll = self._rng.random()
+        kind = None
+        for candidate in ("error", "timeout", "partial"):
+            rate = float(spec.get(f"{candidate}_rate", 0))
+            if roll < rate:
+                kind = candidate
+                break
+            roll -= rate
+
+        self.stats_counter[f"{dependency}.calls"] += 1
+        if delay:
+            self.stats_counter[f"{dependency}.delayed"] += 1
+        if kind:
+            self.stats_counter[f"{dependency}.{kind}"] += 1
+        return Fault(dependency, delay, kind, spec.get("error", "503 Service Unavailable"),
+                     float(spec.get("timeout_s", 10)))
+
+    async def inject(self, dependency: str, name: Optional[str] = None) -> Fault:
+        """Delay, then raise or return the fault (call .mangle(payload) on the result)."""
+        if not self.faults:
+            return _NO_FAULT
+        return await self.plan(dependency, name).apply()
+
+    def inject_blocking(self, dependency: str, name: Optional[str] = None) -> Fault:
+        if not self.faults:
+            return _NO_FAULT
+        return self.plan(dependency, name).apply_blocking()
+
+    def stats(self) -> Dict[str, Any]:
+        per_dependency: Dict[str, Dict[str, int]] = {}
+        for key, value in self.stats_counter.items():
+            dependency, field = key.rsplit(".", 1)
+            per_dependency.setdefault(dependency, {})[field] = value
+        return {"enabled": self.enabled, "scenario": self.scenario.get("name"),
+                "elapsed_s": round(time.monotonic() - self._loaded_at, 1), "dependencies": per_dependency}
+
+
+class FaultInjectionPlugin(BasePlugin):
+    """
+    Model and tool faults for the active scenario. `gemini` faults delay or fail the model call
+    (errors and timeouts raise like a failed Gemini request; partial responses lose the second
+    half of their text). `tool:<name>` and `toolbox` faults hand the model an error result, the
+    way get_accommodation_analysis fails, so the extra LLM turns a failing tool causes show up.
+    """
+
+    def __init__(self, injector: "FaultInjector", name: str = "travel_genius_faults"):
+        super().__init__(name=name)
+        self.injector = injector
+        self._partial_models = set()
+        self._partial_tools = set()
+
+    # ---------- MODEL ----------
+    async def before_model_callback(self, *, callback_context: CallbackContext,
+                                    llm_request: LlmRequest) -> Optional[LlmResponse]:
+        fault = await self.injector.inject("gemini", callback_context.agent_name)
+        if fault.partial:
+            self._partial_models.add((callback_context.invocation_id, callback_context.agent_name))
+        return None
+
+    async def after_model_callback(self, *, callback_context: CallbackContext,
+                                   llm_response: LlmResponse) -> Optional[LlmResponse]:
+        key = (callback_context.invocation_id, callback_context.agent_name)
+        if llm_response.partial or key not in self._partial_models:
+            return None
+        self._partial_models.discard(key)
+        if not llm_response.content or not llm_response.content.parts:
+            return None
+        parts = [types.Part(text=p.text[:len(p.text) // 2]) if p.text else p for p in llm_response.content.parts]
+        return llm_response.model_copy(update={"content": types.Content(role=llm_response.content.role, parts=parts)})
+
+    # ---------- TOOLS ----------
+    def _tool_dependency(self, tool: BaseTool) -> str:
+        if f"tool:{tool.name}" in self.injector.faults:
+            return f"tool:{tool.name}"
+        return "toolbox" if type(tool).__module__.startswith("toolbox") else f"tool:{tool.name}"
+
+    async def before_tool_callback(self, *, tool: BaseTool, tool_args: Dict[str, Any],
+                                   tool_context: ToolContext) -> Optional[dict]:
+        try:
+            fault = await self.injector.inject(self._tool_dependency(tool), tool.name)
+        except (InjectedFault, InjectedTimeout) as e:
+            return {"status": "error", "error": f"Error executing {tool.name}: {e}. "
+                                                "Please try a different search or proceed without this data."}
+        if fault.partial:
+            self._partial_tools.add(tool_context.function_call_id or tool.name)
+        return None
+
+    async def after_tool_callback(self, *, tool: BaseTool, tool_args: Dict[str, Any],
+                                  tool_context: ToolContext, result: dict) -> Optional[dict]:
+        key = tool_context.function_call_id or tool.name
+        if key not in self._partial_tools:
+            return None
+        self._partial_tools.discard(key)
+        truncated = truncate_payload(result)
+        return truncated if isinstance(truncated, dict) else {"result": truncated}
+
+
+# Singletons
+fault_injector = FaultInjector()
+fault_injection_plugin = FaultInjectionPlugin(fault_injector)
@@ -0,0 +1,38 @@
+# utils/forksafe.py
+import os
+from typing import Callable, List
+
+from toolbox_core import ToolboxSyncClient
+
+# Hooks that rebuild per-process network clients in a forked worker (serve.py prefork mode).
+# Module-level state that is plain data (indexes, caches, compiled agents) is inherited
+# copy-on-write and needs nothing. ddtrace restarts its own writer threads through its
+# forksafe hooks, and aiohttp sessions in WeatherService are opened per request.
+_after_fork_hooks: List[Callable[[], None]] = []
+
+
+def after_fork(hook: Callable[[], None]) -> Callable[[], None]:
+    """Register `hook` to run in the child after os.fork(); usable as a decorator."""
+    _after_fork_hooks.append(hook)
+    return hook
+
+
+def _reset_toolbox_loop() -> None:
+    # ToolboxSyncClient drives every instance through one class-level event loop thread.
+    # Threads do not survive fork, so the inherited loop would never run a coroutine again.
+    for attr in ("_ToolboxSyncClient__loop", "_ToolboxSyncClient__thread"):
+        if getattr(ToolboxSyncClient, attr, None) is not None:
+            setattr(ToolboxSyncClient, attr, None)
+
+
+def _run_after_fork_hooks() -> None:
+    _reset_toolbox_loop()
+    for hook in _after_fork_hooks:
+        try:
+            hook()
+        except Exception as e:  # a failed reconnect must not kill the worker
+            print(f"[Fork] ⚠️ After-fork hook {getattr(hook, '__name__', hook)} failed: {e}")
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_run_after_fork_hooks)
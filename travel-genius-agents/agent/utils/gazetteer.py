@@ -0,0 +1,149 @@
+# utils/gazetteer.py
+import re
+import unicodedata
+from collections import deque
+from typing import Dict, Any, List, Optional, Tuple
+from utils.destination_resolver import destination_resolver
+
+# Aliases that are also everyday words/abbreviations only count when written capitalized
+_AMBIGUOUS_ALIASES = {"nice", "male", "victoria", "rio", "reading", "split", "bath", "ncr"}
+_MAX_AMBIGUOUS_LEN = 2
+
+# Words that usually introduce the destination ("trip from Mumbai *to* Goa")
+_DESTINATION_CUES = {"to", "in", "at", "for", "visit", "visiting", "around", "explore", "exploring"}
+
+_WORD = re.compile(r"\S+")
+_ASCII_FOLD = {i: " " for i in range(128) if not chr(i).isalnum()}
+_ASCII_FOLD.update({i: chr(i).lower() for i in range(ord("A"), ord("Z") + 1)})
+
+
+def _fold_char(ch: str) -> str:
+    """Length-preserving normalization: lower-case, strip accents, punctuation -> space."""
+    base = unicodedata.normalize("NFKD", ch)[:1].lower() if ch else " "
+    return base if base.isalnum() else " "
+
+
+def fold_text(text: str) -> str:
+    if text.isascii():
+        return text.translate(_ASCII_FOLD)
+    return "".join(_fold_char(ch) for ch in text)
+
+
+class GazetteerAutomaton:
+    """
+    Aho-Corasick automaton over every gazetteer alias, with whole words as the alphabet.
+    Matching is one pass over the query's words and only ever yields whole-word matches.
+    """
+
+    def __init__(self, aliases: Dict[str, str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, str]]] = [[]]   # (alias length in words, canonical id)
+        self._alias_count = 0
+        for alias, canonical_id in aliases.items():
+            self._insert(alias.split(), canonical_id)
+        self._build_failure_links()
+
+    def __len__(self) -> int:
+        return self._alias_count
+
+    def _insert(self, words: List[str], canonical_id: str) -> None:
+        node = 0
+        for word in words:
+            nxt = self._goto[node].get(word)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][word] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append((len(words), canonical_id))
+        self._alias_count += 1
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for word, nxt in self._goto[node].items():
+                queue.append(nxt)
+                fail = self._fail[node]
+                while fail and word not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(word, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find_all(self, words: List[str]) -> List[Tuple[int, int, str]]:
+        """All matches as (first word index, last word index + 1, canonical_id)."""
+        matches = []
+        node = 0
+        goto, fail, out = self._goto, self._fail, self._out
+        for i, word in enumerate(words):
+            while node and word not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(word, 0)
+            for length, canonical_id in out[node]:
+                matches.append((i - length + 1, i + 1, canonical_id))
+        return matches
+
+
+class DestinationExtractor:
+    """Finds the destination mentioned in a free-text query using the bundled gazetteer."""
+
+    def __init__(self, resolver=destination_resolver):
+        self._resolver = resolver
+        self._automaton = GazetteerAutomaton(resolver.aliases())
+
+    def extract(self, query: str) -> Optional[Dict[str, Any]]:
+        if not query:
+            return None
+        folded = fold_text(query)
+        words = folded.split()
+        candidates = self._automaton.find_all(words)
+        if not candidates:
+            return None
+        # Character offsets are only needed once something matched
+        tokens = [(m.start(), m.end()) for m in _WORD.finditer(folded)]
+        candidates = [m for m in candidates if self._accept(query, words, tokens, m)]
+        if not candidates:
+            return None
+
+        # Leftmost-longest, non-overlapping spans ("new york city" beats "new york")
+        candidates.sort(key=lambda m: (m[0], -(m[1] - m[0])))
+        spans, last_end = [], -1
+        for first, last, canonical_id in candidates:
+            if first >= last_end:
+                spans.append((first, last, canonical_id))
+                last_end = last
+
+        cued = [span for span in spans if span[0] and words[span[0] - 1] in _DESTINATION_CUES]
+        first, last, canonical_id = cued[-1] if cued else spans[0]
+        start, end = tokens[first][0], tokens[last - 1][1]
+        entry = self._resolver.get(canonical_id)
+        return {
+            "destination": entry["name"],
+            "canonical_id": canonical_id,
+            "country": entry.get("country"),
+            "lat": entry.get("lat"),
+            "lng": entry.get("lng"),
+            "matched_text": query[start:end],
+            "span": [start, end],
+        }
+
+    @staticmethod
+    def _accept(query: str, words: List[str], tokens: List[Tuple[int, int]],
+                match: Tuple[int, int, str]) -> bool:
+        first, last, _ = match
+        if last - first == 1:
+            alias = words[first]
+            if len(alias) <= _MAX_AMBIGUOUS_LEN or alias in _AMBIGUOUS_ALIASES:
+                return query[tokens[first][0]].isupper()
+        return True
+
+
+# Compiled once at import; queries are matched in a single pass
+destination_extractor = DestinationExtractor()
+
+
+def extract_destination(query: str) -> Optional[Dict[str, Any]]:
+    return destination_extractor.extract(query)
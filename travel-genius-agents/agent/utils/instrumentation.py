@@ -0,0 +1,147 @@
+# utils/instrumentation.py
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from ddtrace import tracer
+from google.adk.agents.base_agent import BaseAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.plugins.base_plugin import BasePlugin
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.tool_context import ToolContext
+
+from utils.metrics import AGENT_SECONDS, MODEL_SECONDS, TOOL_SECONDS, registry
+
+# Timers of runs that died without after_run (client disconnect, crash) are dropped after this
+_STALE_TIMER_SECONDS = 600
+
+RUN_SECONDS = registry.histogram(
+    "travel_genius_run_duration_seconds", "Wall time of one runner invocation (one user message)")
+
+
+class MetricsPlugin(BasePlugin):
+    """
+    Per-request latency for every agent, model call and tool call, recorded into the local
+    /metrics registry, plus one ddtrace `travel_genius.workflow` span per invocation.
+
+    An agent whose before_agent_callback short-circuits (memo hit) or that is cancelled (deadline
+    guard) never reaches after_agent; it is closed at the end of the run with outcome=incomplete,
+    measured up to its last event.
+    """
+
+    def __init__(self, name: str = "travel_genius_metrics"):
+        super().__init__(name=name)
+        self._agents: Dict[Tuple[str, str], list] = {}  # (invocation, agent) -> [started, last_event]
+        self._models: Dict[Tuple[str, str], float] = {}
+        self._tools: Dict[str, float] = {}
+        self._runs: Dict[str, Tuple[float, Any]] = {}   # invocation -> (started, ddtrace span)
+
+    # ---------- RUN ----------
+    async def before_run_callback(self, *, invocation_context: InvocationContext) -> Optional[Any]:
+        self._drop_stale()
+        span = None
+        try:
+            span = tracer.start_span("travel_genius.workflow", service="travel-genius-agents", activate=False)
+            span.set_tag("workflow.name", "travel_itinerary_generation")
+            span.set_tag("invocation_id", invocation_context.invocation_id)
+            span.set_tag("session_id", invocation_context.session.id)
+        except Exception as e:
+            print(f"[Metrics] ⚠️ Could not start workflow span: {e}")
+        self._runs[invocation_context.invocation_id] = (time.perf_counter(), span)
+        return None
+
+    async def on_event_callback(self, *, invocation_context: InvocationContext, event: Event) -> Optional[Event]:
+        timer = self._agents.get((event.invocation_id, event.author))
+        if timer:
+            timer[1] = time.perf_counter()
+        return None
+
+    async def after_run_callback(self, *, invocation_context: InvocationContext) -> None:
+        invocation_id = invocation_context.invocation_id
+        now = time.perf_counter()
+        for key in [k for k in self._agents if k[0] == invocation_id]:
+            started, last_event = self._agents.pop(key)
+            AGENT_SECONDS.observe((last_event or now) - started, agent=key[1], outcome="incomplete")
+        for key in [k for k in self._models if k[0] == invocation_id]:
+            self._models.pop(key)
+
+        started, span = self._runs.pop(invocation_id, (None, None))
+        if started is None:
+            return
+        RUN_SECONDS.observe(now - started, app=invocation_context.app_name)
+        if span is not None:
+            span.set_tag("root_agent", invocation_context.agent.name)
+            span.finish()
+
+    # ---------- AGENTS ----------
+    async def before_agent_callback(self, *, agent: BaseAgent, callback_context: CallbackContext) -> Optional[Any]:
+        self._agents[(callback_context.invocation_id, agent.name)] = [time.perf_counter(), None]
+        return None
+
+    async def after_agent_callback(self, *, agent: BaseAgent, callback_context: CallbackContext) -> Optional[Any]:
+        timer = self._agents.pop((callback_context.invocation_id, agent.name), None)
+        if timer:
+            AGENT_SECONDS.observe(time.perf_counter() - timer[0], agent=agent.name, outcome="ok")
+        return None
+
+    # ---------- MODEL ----------
+    async def before_model_callback(self, *, callback_context: CallbackContext,
+                                    llm_request: LlmRequest) -> Optional[LlmResponse]:
+        self._models[(callback_context.invocation_id, callback_context.agent_name)] = time.perf_counter()
+        return None
+
+    async def after_model_callback(self, *, callback_context: CallbackContext,
+                                   llm_response: LlmResponse) -> Optional[LlmResponse]:
+        if llm_response.partial:
+            return None  # streamed chunk; the call ends with the aggregated response
+        self._finish_model(callback_context, "error" if llm_response.error_code else "ok")
+        return None
+
+    async def on_model_error_callback(self, *, callback_context: CallbackContext, llm_request: LlmRequest,
+                                      error: Exception) -> Optional[LlmResponse]:
+        self._finish_model(callback_context, "error")
+        return None
+
+    def _finish_model(self, callback_context: CallbackContext, outcome: str) -> None:
+        started = self._models.pop((callback_context.invocation_id, callback_context.agent_name), None)
+        if started is not None:
+            MODEL_SECONDS.observe(time.perf_counter() - started, agent=callback_context.agent_name, outcome=outcome)
+
+    # ---------- TOOLS ----------
+    async def before_tool_callback(self, *, tool: BaseTool, tool_args: Dict[str, Any],
+                                   tool_context: ToolContext) -> Optional[dict]:
+        self._tools[tool_context.function_call_id or tool.name] = time.perf_counter()
+        return None
+
+    async def after_tool_callback(self, *, tool: BaseTool, tool_args: Dict[str, Any],
+                                  tool_context: ToolContext, result: dict) -> Optional[dict]:
+        self._finish_tool(tool, tool_context, "ok")
+        return None
+
+    async def on_tool_error_callback(self, *, tool: BaseTool, tool_args: Dict[str, Any],
+                                     tool_context: ToolContext, error: Exception) -> Optional[dict]:
+        self._finish_tool(tool, tool_context, "error")
+        return None
+
+    def _finish_tool(self, tool: BaseTool, tool_context: ToolContext, outcome: str) -> None:
+        started = self._tools.pop(tool_context.function_call_id or tool.name, None)
+        if started is not None:
+            TOOL_SECONDS.observe(time.perf_counter() - started, tool=tool.name,
+                                 agent=tool_context.agent_name, outcome=outcome)
+
+    def _drop_stale(self) -> None:
+        cutoff = time.perf_counter() - _STALE_TIMER_SECONDS
+        for invocation_id in [i for i, (started, _) in self._runs.items() if started < cutoff]:
+            _, span = self._runs.pop(invocation_id)
+            if span is not None:
+                span.finish()
+        self._agents = {k: v for k, v in self._agents.items() if v[0] >= cutoff}
+        self._models = {k: v for k, v in self._models.items() if v >= cutoff}
+        self._tools = {k: v for k, v in self._tools.items() if v >= cutoff}
+
+
+# Singleton
+metrics_plugin = MetricsPlugin()
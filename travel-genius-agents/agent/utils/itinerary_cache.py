@@ -0,0 +1,124 @@
+# utils/itinerary_cache.py
+import math
+import os
+import threading
+import time
+from collections import OrderedDict, Counter
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional, Tuple
+
+from pydantic import ValidationError
+from models import TravelItinerary
+
+# OpenWeatherMap issues a new 5-day/3-hour forecast every 3 hours; an itinerary is only
+# as fresh as the forecast it was optimized against
+FORECAST_INTERVAL_SECONDS = 3 * 3600
+
+# Log-scale budget buckets, each 1.25x wide (bucket 47 is ₹35.9k-₹44.8k): ₹40k and ₹44k share
+# one, ₹40k and ₹48k don't, and neither do ₹44.5k and ₹45k across a boundary. Budgets 25% or
+# more apart never share a bucket; closer ones usually, not always, do.
+BUDGET_BUCKET_RATIO = 1.25
+
+ITINERARY_CACHE_ENABLED = os.getenv("ITINERARY_CACHE_ENABLED", "true").lower() not in ("0", "false", "no")
+ITINERARY_CACHE_MAX_ENTRIES = int(os.getenv("ITINERARY_CACHE_MAX_ENTRIES", "500"))
+
+
+def forecast_version(now: Optional[float] = None) -> Tuple[str, float]:
+    """(version label, expiry timestamp) of the forecast issuance window containing `now`."""
+    now = time.time() if now is None else now
+    window_start = now - (now % FORECAST_INTERVAL_SECONDS)
+    label = datetime.fromtimestamp(window_start, tz=timezone.utc).strftime("%Y%m%dT%H")
+    return label, window_start + FORECAST_INTERVAL_SECONDS
+
+
+def budget_bucket(budget: int) -> int:
+    """Log-scale bucket index for a total trip budget."""
+    return int(math.log(max(budget, 1), BUDGET_BUCKET_RATIO))
+
+
+def trip_fingerprint(trip: Dict[str, Any], version: str) -> Optional[str]:
+    """Normalized cache key for a parsed trip request (see parse_trip_request); None if not cacheable."""
+    destination = trip.get("canonical_id")
+    if not destination:
+        return None
+    if "default" in (trip.get("days_source"), trip.get("budget_source")):
+        return None  # the generator works from figures in the request the key cannot see
+    preferences = ",".join(sorted({p.strip().lower() for p in trip.get("preferences", []) if p.strip()}))
+    return "|".join([
+        destination,
+        f"{trip.get('days', 0)}d",
+        f"b{budget_bucket(trip.get('budget', 0))}",
+        f"g{trip.get('groupSize', 1)}",
+        trip.get("personality") or "any",
+        preferences,
+        version,
+    ])
+
+
+class ItineraryCache:
+    """
+    Bounded LRU of validated TravelItinerary dicts. Entries expire when the forecast window
+    they were generated in closes, so a hit never serves weather scores from a stale forecast.
+    """
+
+    def __init__(self, max_entries: int = ITINERARY_CACHE_MAX_ENTRIES, enabled: bool = ITINERARY_CACHE_ENABLED):
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.metrics = Counter()
+
+    def key_for(self, trip: Dict[str, Any], now: Optional[float] = None) -> Tuple[Optional[str], float]:
+        version, expires_at = forecast_version(now)
+        return trip_fingerprint(trip, version), expires_at
+
+    def get(self, key: Optional[str]) -> Optional[Dict[str, Any]]:
+        if not self.enabled or not key:
+            self.metrics["bypass"] += 1
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.time():
+                self._entries.move_to_end(key)
+                self.metrics["hits"] += 1
+                return entry[1]
+            if entry:
+                del self._entries[key]
+                self.metrics["expired"] += 1
+            self.metrics["misses"] += 1
+            return None
+
+    def put(self, key: Optional[str], itinerary: Any, expires_at: float) -> bool:
+        if not self.enabled or not key or expires_at <= time.time():
+            return False
+        try:
+            itinerary = TravelItinerary.model_validate(itinerary).model_dump()
+        except ValidationError as e:
+            print(f"[Cache Skip] Itinerary failed validation, not cached: {e.error_count()} errors")
+            self.metrics["rejected"] += 1
+            return False
+        with self._lock:
+            self._entries[key] = (expires_at, itinerary)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.metrics["evictions"] += 1
+            self.metrics["stores"] += 1
+        return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.metrics["hits"] + self.metrics["misses"]
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "hit_rate": round(self.metrics["hits"] / lookups, 4) if lookups else 0.0,
+            **{k: self.metrics[k] for k in ("hits", "misses", "expired", "bypass", "stores", "rejected", "evictions")},
+        }
+
+
+# Singleton
+itinerary_cache = ItineraryCache()
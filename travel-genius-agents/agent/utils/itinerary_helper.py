@@ -1,5 +1,8 @@
 # utils/itinerary_helpers.py
+from datetime import datetime, timezone
 from typing import Dict, Any, List
+from utils.weather_codec import expand_weather
+from utils.sustainability import trip_footprint
 
 # ---------- DAILY ACTIVITY GENERATOR ----------
 def create_daily_activities(day: int, destination: str,
@@ -76,7 +79,8 @@ def create_weather_optimized_itinerary(weather_data: dict,
     group_size  = user_input.get("groupSize",   1)
 
     cost_per_day   = budget // days
-    daily_forecast = weather_data.get("daily_forecast", []) if weather_data else []
+    weather_data   = expand_weather(weather_data)  # compact tool output -> full day dicts
+    daily_forecast = weather_data.get("daily_forecast", [])
     daily_plans    = []
 
     for d in range(1, days + 1):
@@ -108,3 +112,48 @@ def create_weather_optimized_itinerary(weather_data: dict,
         "generatedBy":  "AI Travel Genius",
         "generatedAt":  "2025-09-16T23:45:00+05:30"
     }
+
+# ---------- SCHEMA-COMPLIANT (TravelItinerary) BUILDER ----------
+def create_schema_itinerary(weather_data: dict, user_input: dict) -> dict:
+    """Same deterministic plan as above, shaped like models.TravelItinerary (camelCase, all fields)."""
+    weather_data = expand_weather(weather_data)
+    base        = create_weather_optimized_itinerary(weather_data, user_input, "")
+    destination = user_input.get("destination") or "Amazing Destination"
+    score       = float(weather_data.get("weather_score", 7))
+    alerts      = [a.get("message", "Weather alert") if isinstance(a, dict) else str(a)
+                   for a in weather_data.get("alerts", [])]
+
+    daily_plans = []
+    for plan in base["dailyPlans"]:
+        ws = plan["weather_summary"]
+        daily_plans.append({
+            "day": plan["day"],
+            "activities": plan["activities"],
+            "weatherSummary": {
+                "condition":       str(ws["condition"]).title(),
+                "outdoorScore":    max(1, min(10, int(ws["outdoor_score"]))),
+                "indoorScore":     max(1, min(10, int(ws["indoor_score"]))),
+                "recommendations": list(ws["recommendations"]),
+            },
+        })
+
+    footprint = trip_footprint(destination, len(daily_plans), user_input.get("groupSize", 1),
+                               [a for plan in daily_plans for a in plan["activities"]])
+
+    return {
+        "tripTitle":          base["tripTitle"],
+        "totalEstimatedCost": int(base["totalEstimatedCost"]),
+        "dailyPlans":         daily_plans,
+        "weatherOptimized":   bool(weather_data.get("daily_forecast")),
+        "sustainabilityScore": footprint["sustainabilityScore"],
+        "weatherSummary": {
+            "overallScore":       max(0.0, min(10.0, score)),
+            "suitableForOutdoor": bool(weather_data.get("weather_suitable", score >= 6)),
+            "alerts":             alerts,
+            "recommendations":    list(weather_data.get("recommendations", [])),
+        },
+        "aiRecommendations":  base["aiRecommendations"],
+        "instagramSpots":     [],
+        "generatedBy":        base["generatedBy"],
+        "generatedAt":        datetime.now(timezone.utc).isoformat(),
+    }
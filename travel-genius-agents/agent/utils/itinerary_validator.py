@@ -0,0 +1,281 @@
+# utils/itinerary_validator.py
+import json
+import re
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional, Tuple, Union
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+from pydantic import TypeAdapter, ValidationError
+
+from models import DailyPlan, TravelItinerary
+from utils.itinerary_helper import create_daily_activities
+from utils.json_parser import parse_tolerant
+from utils.request_parser import parse_trip_request
+
+# Built once at import: pydantic-core compiles the validator for the whole nested schema,
+# and validate_json parses straight from the model's bytes without an intermediate dict
+ITINERARY_ADAPTER = TypeAdapter(TravelItinerary)
+DAILY_PLAN_ADAPTER = TypeAdapter(DailyPlan)
+
+MIN_ACTIVITIES, MAX_ACTIVITIES = 2, 4
+ACTIVITY_TYPES = ("adventure", "food", "cultural", "instagram", "relaxation", "shopping", "nightlife")
+
+# Off-list activity types the model tends to use, mapped onto the schema's Literal
+_TYPE_SYNONYMS = {
+    "sightseeing": "cultural", "heritage": "cultural", "history": "cultural", "museum": "cultural",
+    "culture": "cultural", "art": "cultural", "spiritual": "cultural", "religious": "cultural",
+    "outdoor": "adventure", "nature": "adventure", "hiking": "adventure", "sports": "adventure",
+    "beach": "relaxation", "wellness": "relaxation", "spa": "relaxation", "leisure": "relaxation",
+    "dining": "food", "restaurant": "food", "cuisine": "food", "culinary": "food", "drinks": "nightlife",
+    "party": "nightlife", "entertainment": "nightlife", "market": "shopping", "photography": "instagram",
+    "photo": "instagram", "viewpoint": "instagram",
+}
+
+_NUMBER = re.compile(r'-?\d+(?:\.\d+)?')
+
+_lock = threading.Lock()
+validation_stats = Counter()
+
+
+# ---------- SCALAR COERCION ----------
+def _number(value: Any, default: float) -> float:
+    if isinstance(value, bool):
+        return default
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str) and (m := _NUMBER.search(value.replace(",", ""))):
+        return float(m.group())
+    return default
+
+
+def _score(value: Any, lo: float, hi: float, default: float, scale_from: Optional[float] = None) -> float:
+    """
+    Clamp into [lo, hi]. Values well past the top (more than 1.5x) are taken to be on a larger
+    scale, e.g. 85 for a 0-10 score or 9 for a 0-5 rating, and rescaled first; 11/10 just clamps.
+    """
+    v = _number(value, default)
+    if scale_from and hi * 1.5 < v <= scale_from:
+        v = v * hi / scale_from
+    return max(lo, min(hi, v))
+
+
+def _text(value: Any, default: str) -> str:
+    if isinstance(value, str) and value.strip():
+        return value
+    if value is None or value == "":
+        return default
+    return str(value)
+
+
+def _string_list(value: Any) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, (str, dict)):
+        value = [value]
+    out = []
+    for item in value:
+        if isinstance(item, dict):
+            item = item.get("message") or item.get("text") or item.get("name") or json.dumps(item)
+        if item not in (None, ""):
+            out.append(str(item))
+    return out
+
+
+def _activity_type(value: Any) -> str:
+    t = str(value or "").strip().lower()
+    if t in ACTIVITY_TYPES:
+        return t
+    return _TYPE_SYNONYMS.get(t, "cultural")
+
+
+# ---------- REPAIR ----------
+def _repair_activity(raw: Any, day: int, index: int, repairs: Counter) -> Optional[Dict[str, Any]]:
+    if not isinstance(raw, dict):
+        repairs["activity_dropped"] += 1
+        return None
+    title = _text(raw.get("title"), "")
+    if not title:
+        repairs["activity_dropped"] += 1
+        return None
+    activity = {
+        "id": _text(raw.get("id"), f"day{day}_activity{index + 1}"),
+        "title": title,
+        "description": _text(raw.get("description"), title),
+        "cost": int(max(0, _number(raw.get("cost"), 0))),
+        "duration": _text(raw.get("duration"), "2h"),
+        "type": _activity_type(raw.get("type")),
+        "timing": _text(raw.get("timing"), ""),
+        "rating": _score(raw.get("rating"), 0.0, 5.0, 4.5, scale_from=10.0),
+    }
+    if activity != {k: raw.get(k) for k in activity}:
+        repairs["activity_fields"] += 1
+    return activity
+
+
+def _repair_daily_plan(raw: Any, day: int, context: Dict[str, Any], repairs: Counter) -> Dict[str, Any]:
+    raw = raw if isinstance(raw, dict) else {}
+    ws = raw.get("weatherSummary") if isinstance(raw.get("weatherSummary"), dict) else {}
+    outdoor = int(round(_score(ws.get("outdoorScore"), 1, 10, 7, scale_from=100)))
+    indoor = int(round(_score(ws.get("indoorScore"), 1, 10, 6, scale_from=100)))
+    if (outdoor, indoor) != (ws.get("outdoorScore"), ws.get("indoorScore")):
+        repairs["weather_scores"] += 1
+
+    activities = [activity for i, item in enumerate(raw.get("activities") or [])
+                  if (activity := _repair_activity(item, day, i, repairs))]
+    if len(activities) > MAX_ACTIVITIES:
+        repairs["activities_trimmed"] += 1
+        activities = activities[:MAX_ACTIVITIES]
+    if len(activities) < MIN_ACTIVITIES:
+        # Top up from the deterministic weather-aware plan rather than regenerating the itinerary
+        repairs["activities_padded"] += 1
+        titles = {a["title"] for a in activities}
+        cost_per_day = int(context.get("budget", 50_000)) // max(1, int(context.get("days", 1)))
+        for filler in create_daily_activities(day, context.get("destination") or "the city",
+                                              cost_per_day, outdoor, indoor):
+            if len(activities) >= MIN_ACTIVITIES:
+                break
+            if filler["title"] not in titles:
+                activities.append(filler)
+
+    return {
+        "day": day,
+        "activities": activities,
+        "weatherSummary": {
+            "condition": _text(ws.get("condition"), "Pleasant"),
+            "outdoorScore": outdoor,
+            "indoorScore": indoor,
+            "recommendations": _string_list(ws.get("recommendations")),
+        },
+    }
+
+
+def repair_itinerary(data: Dict[str, Any], context: Optional[Dict[str, Any]] = None,
+                     repairs: Optional[Counter] = None) -> Dict[str, Any]:
+    """Coerce a near-miss itinerary dict onto the TravelItinerary schema (idempotent on valid input)."""
+    context = context or {}
+    repairs = repairs if repairs is not None else Counter()
+
+    plans = data.get("dailyPlans") if isinstance(data.get("dailyPlans"), list) else []
+    daily_plans = [_repair_daily_plan(plan, i + 1, context, repairs) for i, plan in enumerate(plans)]
+    if [p.get("day") if isinstance(p, dict) else None for p in plans] != [p["day"] for p in daily_plans]:
+        repairs["day_numbers"] += 1
+
+    ws = data.get("weatherSummary") if isinstance(data.get("weatherSummary"), dict) else {}
+    overall = _score(ws.get("overallScore"), 0.0, 10.0, 7.0, scale_from=100)
+    sustainability = _score(data.get("sustainabilityScore"), 0.0, 10.0, 7.0, scale_from=100)
+    if overall != ws.get("overallScore") or sustainability != data.get("sustainabilityScore"):
+        repairs["overall_scores"] += 1
+
+    total = _number(data.get("totalEstimatedCost"), -1)
+    if total < 0:
+        repairs["total_cost"] += 1
+        total = sum(a["cost"] for p in daily_plans for a in p["activities"])
+
+    return {
+        "tripTitle": _text(data.get("tripTitle"), f"{context.get('destination') or 'Your'} Trip Itinerary"),
+        "totalEstimatedCost": int(total),
+        "dailyPlans": daily_plans,
+        "weatherOptimized": bool(data.get("weatherOptimized", True)),
+        "sustainabilityScore": sustainability,
+        "weatherSummary": {
+            "overallScore": overall,
+            "suitableForOutdoor": bool(ws.get("suitableForOutdoor", overall >= 6)),
+            "alerts": _string_list(ws.get("alerts")),
+            "recommendations": _string_list(ws.get("recommendations")),
+        },
+        "aiRecommendations": _string_list(data.get("aiRecommendations")),
+        "instagramSpots": _string_list(data.get("instagramSpots")),
+        "generatedBy": _text(data.get("generatedBy"), "AI Travel Genius"),
+        "generatedAt": _text(data.get("generatedAt"), datetime.now(timezone.utc).isoformat()),
+    }
+
+
+# ---------- VALIDATION ----------
+def _record(outcome: str, started: float, repairs: Counter) -> None:
+    with _lock:
+        validation_stats[outcome] += 1
+        validation_stats["validation_us"] += int((time.perf_counter() - started) * 1e6)
+        for kind, n in repairs.items():
+            validation_stats[f"repair.{kind}"] += n
+
+
+def validate_itinerary_json(raw: Union[str, bytes], context: Optional[Dict[str, Any]] = None
+                            ) -> Tuple[Optional[TravelItinerary], str]:
+    """
+    Strict JSON fast path first; on a ValidationError, repair and re-validate.
+    Returns (itinerary or None, outcome) with outcome in "valid" | "repaired" | "invalid".
+    """
+    started = time.perf_counter()
+    try:
+        itinerary = ITINERARY_ADAPTER.validate_json(raw)
+        _record("valid", started, Counter())
+        return itinerary, "valid"
+    except ValidationError:
+        pass
+
+    repairs = Counter()
+    try:
+        data = parse_tolerant(raw.decode("utf-8", "replace") if isinstance(raw, bytes) else raw)
+        if not isinstance(data, dict) or not data.get("dailyPlans"):
+            raise ValueError("no daily plans to repair")
+        itinerary = ITINERARY_ADAPTER.validate_python(repair_itinerary(data, context, repairs))
+    except (ValueError, ValidationError) as e:
+        print(f"[Validation] Itinerary not repairable: {str(e)[:200]}")
+        _record("invalid", started, repairs)
+        return None, "invalid"
+
+    _record("repaired", started, repairs)
+    return itinerary, "repaired"
+
+
+def validate_daily_plan(data: Any, day: int, context: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    """Same strict-then-repair path for one streamed DailyPlan object (already parsed)."""
+    try:
+        return DAILY_PLAN_ADAPTER.validate_python(data).model_dump()
+    except ValidationError:
+        pass
+    try:
+        return DAILY_PLAN_ADAPTER.validate_python(
+            _repair_daily_plan(data, day, context or {}, Counter())).model_dump()
+    except ValidationError:
+        return None
+
+
+def validation_summary() -> Dict[str, Any]:
+    with _lock:
+        stats = dict(validation_stats)
+    total = sum(stats.get(k, 0) for k in ("valid", "repaired", "invalid"))
+    return {
+        **stats,
+        "total": total,
+        "retry_rate": round(stats.get("invalid", 0) / total, 4) if total else 0.0,
+        "repair_rate": round(stats.get("repaired", 0) / total, 4) if total else 0.0,
+        "avg_validation_us": round(stats.get("validation_us", 0) / total, 1) if total else 0.0,
+    }
+
+
+def validate_itinerary_response(callback_context: CallbackContext, llm_response: LlmResponse) -> Optional[LlmResponse]:
+    """
+    after_model_callback for itinerary_generator: validates the final response text before
+    ADK's output_schema parsing sees it, and swaps in the repaired JSON when a repair was
+    needed, so a near-miss no longer fails the turn and forces a full regeneration.
+    """
+    if llm_response.partial or not llm_response.content or not llm_response.content.parts:
+        return None
+    raw = "".join(p.text for p in llm_response.content.parts if p.text and not p.thought)
+    if not raw.strip():
+        return None
+
+    user = callback_context.user_content
+    trip = parse_trip_request(" ".join(p.text for p in (user.parts if user else []) if p.text))
+    itinerary, outcome = validate_itinerary_json(raw, trip)
+    if outcome != "repaired":
+        return None
+    print(f"[Validation] Repaired itinerary output for {trip['destination'] or 'request'}")
+    llm_response.content = types.Content(role="model", parts=[types.Part(text=itinerary.model_dump_json())])
+    return llm_response
@@ -0,0 +1,247 @@
+# utils/json_parser.py
+import ast
+import json
+import re
+from typing import Any, List, Tuple
+
+# One tokenizer for model and tool payloads: strict JSON, Python reprs (True/False/None,
+# single-quoted strings), trailing commas, ```json fences or prose around the object, and
+# truncated or still-streaming text. Literals are only converted outside strings, so
+# "None of the above" or "True North" in a description is left alone.
+#
+# The regex does the per-character work in C; Python only sees one step per token.
+_TOKEN = re.compile(r'''
+    [\s]*
+    (?:
+        (?P<dq>"(?:[^"\\]|\\.)*")
+      | (?P<sq>'(?:[^'\\]|\\.)*')
+      | (?P<punct>[{}\[\]:,])
+      | (?P<bare>[A-Za-z0-9_+\-.]+)
+    )
+''', re.VERBOSE | re.DOTALL)
+
+_LITERALS = {
+    "true": True, "True": True,
+    "false": False, "False": False,
+    "null": None, "None": None,
+}
+_ROOT_START = re.compile(r'[{\[]')
+# Second tier for double-quoted JSON with Python literals: one C-level pass that skips over
+# strings and rewrites only the bare words, then json.loads
+_STRING_OR_LITERAL = re.compile(r'("(?:[^"\\]|\\.)*")|\b(True|False|None)\b')
+_JSON_LITERALS = {"True": "true", "False": "false", "None": "null"}
+
+Path = Tuple[Any, ...]
+
+
+def _bare_value(token: str) -> Any:
+    if token in _LITERALS:
+        return _LITERALS[token]
+    try:
+        return int(token)
+    except ValueError:
+        pass
+    try:
+        return float(token)
+    except ValueError:
+        return token  # unquoted word; kept as a string
+
+
+def _string_value(token: str, single: bool) -> str:
+    if single:
+        try:
+            return ast.literal_eval(token)
+        except (ValueError, SyntaxError):
+            return token[1:-1]
+    try:
+        return json.loads(token, strict=False)
+    except ValueError:
+        return token[1:-1]
+
+
+class _Frame:
+    __slots__ = ("container", "key", "expect_key", "index")
+
+    def __init__(self, container):
+        self.container = container
+        self.key = None
+        self.expect_key = isinstance(container, dict)
+        self.index = 0
+
+
+class IncrementalJSONParser:
+    """
+    Resumable single-pass parser. feed() consumes each chunk once and returns
+    (path, value) for every value completed in it at depth <= emit_depth, e.g. with
+    emit_depth=2 an itinerary yields ("tripTitle",), then ("dailyPlans", 0), ... as each
+    day object closes. result() returns the root so far, closing any open containers.
+    """
+
+    def __init__(self, emit_depth: int = 1):
+        self.emit_depth = emit_depth
+        self._buf = ""
+        self._stack: List[_Frame] = []
+        self._root: Any = None
+        self._started = False
+        self.done = False
+
+    # -- public API --
+    def feed(self, chunk: str, final: bool = False) -> List[Tuple[Path, Any]]:
+        out: List[Tuple[Path, Any]] = []
+        if self.done:
+            return out
+        buf = self._buf + (chunk or "")
+        pos = 0
+
+        if not self._started:
+            m = _ROOT_START.search(buf)
+            if not m:
+                self._buf = ""
+                return out
+            pos = m.start()
+            self._started = True
+
+        n = len(buf)
+        while pos < n and not self.done:
+            m = _TOKEN.match(buf, pos)
+            if not m:
+                rest = buf[pos:].lstrip()
+                if not rest:
+                    pos = n
+                    break
+                if rest[0] in "\"'":
+                    if not final:
+                        break  # string still streaming in; resume from its opening quote
+                    self._scalar(rest[1:], out, is_string=True)  # truncated string: keep what arrived
+                    pos = n
+                    break
+                pos = n - len(rest) + 1  # stray character (fence backtick, comment marker): skip it
+                continue
+            kind = m.lastgroup
+            token = m.group(kind)
+            if kind == "bare" and m.end() == n and not final:
+                break  # a number/literal may continue in the next chunk
+            pos = m.end()
+
+            if kind == "punct":
+                self._punct(token, out)
+            elif kind in ("dq", "sq"):
+                self._scalar(_string_value(token, kind == "sq"), out, is_string=True)
+            else:
+                self._scalar(_bare_value(token), out, is_string=False)
+
+        self._buf = buf[pos:]
+        return out
+
+    def result(self) -> Any:
+        """Root value parsed so far; open containers are returned as they stand."""
+        return self._root
+
+    # -- internals --
+    def _path(self) -> Path:
+        return tuple(f.key if isinstance(f.container, dict) else f.index for f in self._stack)
+
+    def _attach(self, value: Any, out) -> None:
+        if not self._stack:
+            self._root = value
+            self.done = True
+            if self.emit_depth >= 0:
+                out.append(((), value))
+            return
+        frame = self._stack[-1]
+        path = self._path()
+        if isinstance(frame.container, dict):
+            if frame.key is None:
+                return  # value without a key; drop it
+            frame.container[frame.key] = value
+        else:
+            frame.container.append(value)
+        if len(path) <= self.emit_depth:
+            out.append((path, value))
+
+    def _scalar(self, value: Any, out, is_string: bool) -> None:
+        if not self._stack:
+            return
+        frame = self._stack[-1]
+        if isinstance(frame.container, dict) and frame.expect_key:
+            frame.key = value if is_string else str(value)
+            frame.expect_key = False
+            return
+        self._attach(value, out)
+
+    def _punct(self, ch: str, out) -> None:
+        if ch in "{[":
+            container = {} if ch == "{" else []
+            if not self._stack and self._root is None:
+                self._root = container
+            elif self._stack:
+                # Link into the parent now so result() sees partial content
+                parent = self._stack[-1]
+                if isinstance(parent.container, dict):
+                    if parent.key is not None:
+                        parent.container[parent.key] = container
+                else:
+                    parent.container.append(container)
+            self._stack.append(_Frame(container))
+            return
+
+        if not self._stack:
+            return
+        frame = self._stack[-1]
+        if ch in "}]":
+            self._stack.pop()
+            value = frame.container
+            if not self._stack:
+                self.done = True
+                if self.emit_depth >= 0:
+                    out.append(((), value))
+                return
+            parent = self._stack[-1]
+            path = self._path()
+            if len(path) <= self.emit_depth:
+                out.append((path, value))
+            self._advance(parent)
+        elif ch == ",":
+            self._advance(frame)
+        elif ch == ":" and isinstance(frame.container, dict):
+            frame.expect_key = False
+
+    @staticmethod
+    def _advance(frame: _Frame) -> None:
+        if isinstance(frame.container, dict):
+            frame.key = None
+            frame.expect_key = True
+        else:
+            frame.index = len(frame.container)
+
+
+def _literal_sub(m: re.Match) -> str:
+    literal = m.group(2)
+    return _JSON_LITERALS[literal] if literal else m.group(1)
+
+
+def parse_tolerant(text: Any, default: Any = None) -> Any:
+    """
+    Parse a JSON-ish payload. Valid JSON goes straight to json.loads; JSON with Python
+    literals gets a string-aware substitution; anything else (single quotes, fences,
+    trailing commas, truncation) goes through the tokenizer.
+    Returns `default` when no object or array can be found.
+    """
+    if not isinstance(text, str):
+        return text if text is not None else default
+    stripped = text.strip()
+    if not stripped:
+        return default
+    if stripped[0] in "{[":
+        try:
+            return json.loads(stripped)
+        except ValueError:
+            pass
+        try:
+            return json.loads(_STRING_OR_LITERAL.sub(_literal_sub, stripped))
+        except ValueError:
+            pass
+    parser = IncrementalJSONParser(emit_depth=-1)
+    parser.feed(stripped, final=True)
+    root = parser.result()
+    return default if root is None else root
@@ -0,0 +1,183 @@
+# utils/metrics.py
+import contextlib
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+# Process-local metrics in the Prometheus text format (GET /metrics). Datadog export is
+# unchanged; this is for looking at latency on a laptop or a single host without the SaaS.
+# With serve.py every worker keeps its own registry, so scrape each worker (or read the
+# numbers as per-worker samples).
+
+# Seconds. Covers a cached tool hit (~1 ms) up to a full pipeline run (~60 s).
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+Sample = Tuple[str, Dict[str, Any], float]  # (suffix, labels, value)
+
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(labels: Iterable[Tuple[str, str]]) -> str:
+    pairs = [f'{k}="{v.replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"' for k, v in labels]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class CounterMetric:
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str):
+        self.name, self.help = name, help_text
+        self._values: Dict[Labels, float] = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        with self._lock:
+            self._values[_labels(labels)] += amount
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            return [("", dict(k), v) for k, v in self._values.items()]
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name, self.help = name, help_text
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Labels, List[float]] = {}  # per-bucket counts, then +Inf, sum
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = _labels(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0.0] * (len(self.buckets) + 2)
+            series[bisect_left(self.buckets, value)] += 1
+            series[-1] += value
+
+    @contextlib.contextmanager
+    def time(self, **labels):
+        """Observe the duration of the block; labels gain outcome=ok|error."""
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            yield
+            outcome = "ok"
+        finally:
+            self.observe(time.perf_counter() - started, **labels, outcome=outcome)
+
+    def samples(self) -> List[Sample]:
+        out = []
+        with self._lock:
+            series = {k: list(v) for k, v in self._series.items()}
+        for key, counts in series.items():
+            labels = dict(key)
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                out.append(("_bucket", {**labels, "le": _format_value(bound)}, cumulative))
+            out.append(("_sum", labels, counts[-1]))
+            out.append(("_count", labels, cumulative))
+        return out
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, Any] = {}
+        self._collectors: List[Tuple[str, Callable[[], Iterable[Tuple[str, str, str, Dict[str, Any], float]]]]] = []
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, *args):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args)
+            return metric
+
+    def counter(self, name: str, help_text: str) -> CounterMetric:
+        return self._get_or_create(CounterMetric, name, help_text)
+
+    def histogram(self, name: str, help_text: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, help_text, buckets)
+
+    def register_collector(self, name: str, collect: Callable) -> None:
+        """collect() yields (metric, type, help, labels, value) read at scrape time from existing stats()."""
+        with self._lock:
+            self._collectors = [(n, c) for n, c in self._collectors if n != name] + [(name, collect)]
+
+    def render(self) -> str:
+        lines: List[str] = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for suffix, labels, value in metric.samples():
+                lines.append(f"{metric.name}{suffix}{_format_labels(labels.items())} {_format_value(value)}")
+
+        collected: Dict[str, Tuple[str, str, List[Tuple[Dict[str, Any], float]]]] = {}
+        for source, collect in collectors:
+            try:
+                for name, kind, help_text, labels, value in collect():
+                    collected.setdefault(name, (kind, help_text, []))[2].append((labels, value))
+            except Exception as e:
+                print(f"[Metrics] ⚠️ Collector {source} failed: {e}")
+        for name, (kind, help_text, samples) in collected.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{name}{_format_labels(_labels(labels))} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+# Singleton
+registry = MetricsRegistry()
+
+AGENT_SECONDS = registry.histogram(
+    "travel_genius_agent_duration_seconds", "Wall time of one agent run (sub-agents and wrappers)")
+MODEL_SECONDS = registry.histogram(
+    "travel_genius_model_call_duration_seconds", "Gemini call latency per agent, including quota wait")
+TOOL_SECONDS = registry.histogram(
+    "travel_genius_tool_duration_seconds", "ADK tool call latency (get_weather_analysis, toolbox tools, ...)")
+UPSTREAM_SECONDS = registry.histogram(
+    "travel_genius_upstream_call_duration_seconds", "Outbound HTTP / database call latency")
+QUEUE_WAIT_SECONDS = registry.histogram(
+    "travel_genius_rate_limit_wait_seconds", "Time spent waiting for an upstream quota token",
+    buckets=(0.0, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0))
+CACHE_LOOKUPS = registry.counter(
+    "travel_genius_cache_lookups_total", "Cache lookups by cache and result (hit/miss)")
+
+
+@contextlib.contextmanager
+def timed_upstream(upstream: str, operation: str):
+    """Record an outbound call in travel_genius_upstream_call_duration_seconds."""
+    with UPSTREAM_SECONDS.time(upstream=upstream, operation=operation):
+        yield
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    CACHE_LOOKUPS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def stats_collector(metric: str, help_text: str, stats: Callable[[], Dict[str, Any]],
+                    kind: str = "gauge", **labels) -> Callable:
+    """Collector exporting the numeric top-level fields of an existing stats() dict as one metric."""
+    def collect():
+        for key, value in stats().items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                yield metric, kind, help_text, {**labels, "field": key}, value
+    return collect
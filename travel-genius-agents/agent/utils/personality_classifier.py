@@ -0,0 +1,261 @@
+# utils/personality_classifier.py
+import json
+import os
+import re
+import threading
+from collections import Counter
+from typing import Dict, Any, List, Optional, Sequence
+
+import numpy as np
+
+from utils.request_parser import PERSONALITIES, parse_trip_request
+
+# Local stand-in for the personality_analyzer Gemini call: weighted keyword features and a
+# small softmax (multinomial logistic) regression trained with NumPy on the labelled
+# examples in data/personality_examples.json. Training takes a few milliseconds and runs
+# once per process, on first use. A prediction is one small dot product; a batch is one
+# matrix product. Below PERSONALITY_MIN_CONFIDENCE the caller should ask the LLM instead.
+PERSONALITY_MIN_CONFIDENCE = float(os.getenv("PERSONALITY_MIN_CONFIDENCE", "0.6"))
+
+_DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                          "data", "personality_examples.json")
+
+# Weighted keywords per personality type: how strongly a word points at each type (a word
+# may point at several: "palace" is heritage and luxury). The features are these weighted
+# sums per type, plus whether the type is named outright (the quiz result the frontend
+# sends) and how many cues matched; the regression learns from the examples how far to
+# trust each signal, which is what makes its confidence usable for the LLM fallback.
+PERSONALITY_KEYWORDS: Dict[str, Dict[str, float]] = {
+    "adventure": {
+        "trek": 1.5, "trekking": 1.5, "hike": 1.5, "hiking": 1.5, "camping": 1.5, "camp": 1.0, "tent": 1.0,
+        "rafting": 1.5, "paragliding": 1.5, "bungee": 1.5, "skydiving": 1.5, "scuba": 1.5, "diving": 1.2,
+        "dive": 1.2, "snorkel": 1.0, "snorkeling": 1.0, "surf": 1.2, "surfing": 1.2, "climbing": 1.5,
+        "climber": 1.5, "kayaking": 1.2, "canyoning": 1.2, "zip_lining": 1.5, "safari": 1.2, "jungle": 1.0,
+        "wildlife": 1.0, "mountain": 1.2, "peak": 1.2, "summit": 1.2, "glacier": 1.0, "cliff": 1.0,
+        "trail": 1.2, "thrill": 1.5, "adrenaline": 1.5, "extreme": 1.2, "outdoor": 1.0, "backpacking": 1.2,
+        "offbeat": 1.0, "off_the": 0.8, "remote": 1.0, "waterfall": 1.0, "cycling": 1.0, "biking": 1.2,
+        "motorbike": 1.0, "ski": 1.2, "skiing": 1.2, "dune": 1.2, "sandboarding": 1.5, "cave": 0.6,
+        "volcano": 1.0, "altitude": 1.0, "base_camp": 1.5, "road_trip": 1.0, "shark": 1.0, "wave": 0.6,
+        "conquering": 1.0, "wild": 0.8, "expedition": 1.5, "ice_climbing": 1.5, "tough": 0.6,
+    },
+    "luxury": {
+        "five_star": 2.0, "spa": 1.5, "villa": 1.2, "butler": 1.5, "yacht": 1.5, "champagne": 1.5,
+        "michelin": 1.5, "fine_dining": 1.5, "gourmet": 1.2, "premium": 1.5, "suite": 1.2, "chauffeur": 1.5,
+        "exclusive": 1.2, "vip": 1.2, "concierge": 1.2, "resort": 1.0, "splurge": 1.5, "indulgent": 1.2,
+        "pamper": 1.2, "massage": 1.0, "wellness": 1.0, "infinity_pool": 1.5, "caviar": 1.2, "elegant": 1.0,
+        "opulent": 1.2, "penthouse": 1.2, "designer": 1.0, "helicopter": 1.0, "first_class": 1.5,
+        "overwater": 1.2, "honeymoon": 0.8, "impeccable": 1.0, "finer": 1.0, "comfort": 1.0, "boutique": 0.8,
+        "lounge": 0.8, "tasting_menu": 1.2, "golf": 1.0, "no_expense": 1.5, "palace": 0.6, "grand_hotel": 1.2,
+        "private": 0.8, "upscale": 1.2, "lavish": 1.2, "retreat": 0.6,
+    },
+    "cultural": {
+        "local": 1.2, "authentic": 1.5, "artisan": 1.5, "cooking_class": 1.5, "cooking": 1.0,
+        "homestay": 1.5, "host_family": 1.5, "family": 0.6, "community": 1.5, "village": 1.0,
+        "festival": 0.8, "folk": 1.2, "street_food": 1.2, "market": 1.0, "bazaar": 1.0, "workshop": 1.2,
+        "craft": 1.2, "pottery": 1.2, "potter": 1.2, "weaving": 1.2, "weaver": 1.2, "theater": 1.2,
+        "theatre": 1.2, "performance": 1.0, "dance": 0.6, "language": 1.0, "tradition": 0.8,
+        "traditional": 0.6, "ceremony": 1.0, "recipe": 1.2, "culture": 1.2, "immersion": 1.2,
+        "storytelling": 1.0, "calligraphy": 1.2, "tea": 0.6, "learning": 1.0, "learn": 1.0,
+        "volunteering": 1.2, "neighbourhood": 1.0, "neighborhood": 1.0, "resident": 1.0, "daily_life": 1.2,
+        "cuisine": 0.8, "puja": 1.0, "music": 0.4, "art": 0.6, "temple": 0.5, "live_with": 1.2,
+    },
+    "party": {
+        "nightlife": 2.0, "club": 1.5, "clubbing": 1.5, "nightclub": 1.5, "bar": 1.2, "pub": 1.2,
+        "pub_crawl": 1.5, "dj": 1.5, "rave": 1.5, "dancing": 1.2, "till_dawn": 1.5, "all_night": 1.5,
+        "cocktail": 0.8, "drink": 1.2, "booze": 1.5, "shot": 0.8, "casino": 1.5, "bachelor": 1.5,
+        "bachelorette": 1.5, "karaoke": 1.2, "after_party": 1.5, "boat_party": 1.5, "beach_party": 1.5,
+        "gang": 1.0, "friend": 0.8, "social": 1.2, "celebrate": 1.2, "celebrating": 1.2,
+        "concert": 1.0, "shack": 1.0, "hostel": 0.6, "entertainment": 1.0, "fun": 1.0, "dance_floor": 1.5,
+        "partying": 2.0, "sunburn": 1.5, "full_moon": 1.2, "show": 0.5, "rooftop_bar": 1.2, "every_night": 1.2,
+        "festival": 0.6, "birthday": 0.8,
+    },
+    "heritage": {
+        "history": 1.5, "historical": 1.5, "historic": 1.5, "historian": 1.5, "fort": 1.5, "palace": 1.2,
+        "museum": 1.5, "monument": 1.5, "unesco": 1.5, "ruin": 1.5, "ancient": 1.2, "archaeology": 1.5,
+        "archaeological": 1.5, "castle": 1.5, "cathedral": 1.2, "haveli": 1.5, "medieval": 1.5,
+        "colonial": 1.2, "architecture": 1.2, "temple": 1.0, "tomb": 1.5, "stepwell": 1.5, "mughal": 1.5,
+        "empire": 1.2, "dynasty": 1.5, "citadel": 1.5, "inscription": 1.5, "monastery": 1.2,
+        "old_town": 1.2, "old_city": 1.2, "royal": 1.2, "pyramid": 1.2, "civilization": 1.2,
+        "artifact": 1.2, "memorial": 1.2, "battlefield": 1.2, "mansion": 1.0, "king": 1.0, "gallery": 0.6,
+        "century": 1.0, "restored": 1.0, "buff": 0.6, "roman": 1.0,
+    },
+}
+# The type name itself is the strongest cue of all (the quiz result the frontend sends)
+NAMED_TYPE_WEIGHT = 3.0
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+# "No luxury please", "Skip the luxury resorts", "I hate partying": keywords in the few
+# words after a negation are not cues for that type
+_NEGATIONS = frozenset({"no", "not", "never", "without", "skip", "avoid", "hate", "dont", "don", "nothing"})
+_NEGATION_SCOPE = 3
+
+
+def _stem(token: str) -> str:
+    """Just enough stemming for the vocabulary: plurals ('forts', 'galleries', 'bazaars')."""
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+class PersonalityClassifier:
+    def __init__(self, keywords: Dict[str, Dict[str, float]] = PERSONALITY_KEYWORDS,
+                 examples_path: str = _DATA_PATH, min_confidence: float = PERSONALITY_MIN_CONFIDENCE):
+        self.labels: List[str] = list(PERSONALITIES)
+        self._names = {label: i for i, label in enumerate(self.labels)}
+        # keyword -> weight per type, as a row of a (keywords, types) matrix
+        keywords = {label: {**keywords.get(label, {}), label: NAMED_TYPE_WEIGHT} for label in self.labels}
+        vocabulary = sorted({k for table in keywords.values() for k in table})
+        self.vocabulary: Dict[str, int] = {k: i for i, k in enumerate(vocabulary)}
+        self.keyword_matrix = np.array([[keywords.get(label, {}).get(k, 0.0) for label in self.labels]
+                                        for k in vocabulary], dtype=np.float64)
+        self.examples_path = examples_path
+        self.min_confidence = min_confidence
+        self.W: Optional[np.ndarray] = None   # (features, types)
+        self.b: Optional[np.ndarray] = None   # (types,)
+        self.training_accuracy = 0.0
+        self._lock = threading.Lock()
+        self.stats_counter = Counter()
+
+    @property
+    def n_features(self) -> int:
+        return 2 * len(self.labels) + 1
+
+    # ---------- FEATURES ----------
+    def _features(self, text: str) -> np.ndarray:
+        """
+        [weighted keyword score per type..., type named outright per type..., log(1 + cues)]
+        over stemmed unigrams and '_'-joined bigrams; a repeated keyword counts at most twice,
+        and keywords within _NEGATION_SCOPE words after a negation do not count.
+        """
+        tokens = [_stem(t) for t in _TOKEN.findall((text or "").lower())]
+        x = np.zeros(self.n_features)
+        k = len(self.labels)
+        seen: Dict[int, int] = {}
+        previous, negated = None, 0
+        for token in tokens:
+            if token in _NEGATIONS:
+                previous, negated = None, _NEGATION_SCOPE
+                continue
+            if negated:
+                previous, negated = None, negated - 1
+                continue
+            for gram in (token, f"{previous}_{token}" if previous else None):
+                index = self.vocabulary.get(gram) if gram else None
+                if index is not None and seen.get(index, 0) < 2:
+                    seen[index] = seen.get(index, 0) + 1
+                    x[:k] += self.keyword_matrix[index]
+            if token in self._names:
+                x[k + self._names[token]] = 1.0
+            previous = token
+        x[-1] = np.log1p(sum(seen.values()))
+        return x
+
+    def featurize(self, texts: Sequence[str]) -> np.ndarray:
+        """(len(texts), n_features) feature matrix."""
+        X = np.zeros((len(texts), self.n_features))
+        for row, text in enumerate(texts):
+            X[row] = self._features(text)
+        return X
+
+    # ---------- TRAINING ----------
+    def fit(self, texts: Sequence[str], labels: Sequence[str], epochs: int = 500,
+            learning_rate: float = 0.3, l2: float = 1e-2) -> "PersonalityClassifier":
+        """Full-batch gradient descent on the softmax cross-entropy; deterministic (zero init)."""
+        X = self.featurize(texts)
+        y = np.array([self._names[label] for label in labels])
+        Y = np.eye(len(self.labels))[y]
+        W = np.zeros((X.shape[1], len(self.labels)))
+        b = np.zeros(len(self.labels))
+        for _ in range(epochs):
+            grad = (_softmax(X @ W + b) - Y) / len(X)
+            W -= learning_rate * (X.T @ grad + l2 * W)
+            b -= learning_rate * grad.sum(axis=0)
+        self.W, self.b = W, b
+        self.training_accuracy = float((np.argmax(X @ W + b, axis=1) == y).mean())
+        return self
+
+    def _ensure_trained(self) -> None:
+        if self.W is not None:
+            return
+        with self._lock:
+            if self.W is not None:
+                return
+            try:
+                with open(self.examples_path, encoding="utf-8") as fh:
+                    examples = json.load(fh)["examples"]
+            except (OSError, ValueError, KeyError) as e:
+                print(f"[Personality] ⚠️ Could not load training examples {self.examples_path}: {e}")
+                examples = []
+            if examples:
+                self.fit([e["text"] for e in examples], [e["label"] for e in examples])
+                print(f"[Personality] 🧠 Classifier trained on {len(examples)} examples "
+                      f"({len(self.vocabulary)} keywords, training accuracy {self.training_accuracy:.0%})")
+            else:
+                # Untrained: uniform scores, so every request goes to the LLM
+                self.W = np.zeros((self.n_features, len(self.labels)))
+                self.b = np.zeros(len(self.labels))
+
+    # ---------- SCORING ----------
+    def _result(self, probabilities: np.ndarray) -> Dict[str, Any]:
+        best = int(np.argmax(probabilities))
+        confidence = float(probabilities[best])
+        confident = confidence >= self.min_confidence
+        self.stats_counter["confident" if confident else "low_confidence"] += 1
+        return {
+            "personality": self.labels[best],
+            "confidence": round(confidence, 3),
+            "confident": confident,
+            "scores": {label: round(float(p), 3) for label, p in zip(self.labels, probabilities)},
+        }
+
+    def classify(self, text: str) -> Dict[str, Any]:
+        """{personality, confidence, confident, scores} for one quiz answer set or request."""
+        self._ensure_trained()
+        return self._result(_softmax(self._features(text) @ self.W + self.b))
+
+    def classify_batch(self, texts: Sequence[str]) -> List[Dict[str, Any]]:
+        """classify() for many texts with a single matrix product."""
+        self._ensure_trained()
+        if not texts:
+            return []
+        return [self._result(p) for p in _softmax(self.featurize(texts) @ self.W + self.b)]
+
+    def classify_request(self, text: str) -> Dict[str, Any]:
+        """
+        classify() unless the request names its type (the frontend's "for 2 heritage ..."): that
+        is the user's own answer, and what budget_optimizer and sustainability_advisor plan
+        for, so it wins with confidence 1.0 however the preferences read.
+        """
+        return self.classify_requests([text])[0]
+
+    def classify_requests(self, texts: Sequence[str]) -> List[Dict[str, Any]]:
+        """classify_request() for many texts; the unnamed ones share one matrix product."""
+        parsed = [parse_trip_request(text) for text in texts]
+        named = [trip["personality"] if trip["personality_source"] == "request" else "" for trip in parsed]
+        modelled = iter(self.classify_batch([t for t, label in zip(texts, named) if not label]))
+        results = []
+        for label in named:
+            if label:
+                self.stats_counter["named"] += 1
+                results.append({"personality": label, "confidence": 1.0, "confident": True,
+                                "scores": {other: float(other == label) for other in self.labels},
+                                "source": "request"})
+            else:
+                results.append({**next(modelled), "source": "classifier"})
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        return {"trained": self.W is not None, "training_accuracy": round(self.training_accuracy, 4),
+                "min_confidence": self.min_confidence, "keywords": len(self.vocabulary), **self.stats_counter}
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    shifted = np.exp(logits - logits.max(axis=-1, keepdims=True))
+    return shifted / shifted.sum(axis=-1, keepdims=True)
+
+
+# Singleton
+personality_classifier = PersonalityClassifier()
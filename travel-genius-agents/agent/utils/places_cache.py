@@ -0,0 +1,46 @@
+# utils/places_cache.py
+import os
+import threading
+import time
+from collections import OrderedDict, Counter
+from typing import Dict, Any, Optional, Tuple
+
+# A destination's Places data (coordinates, rating, address) changes slowly; re-fetch daily
+PLACES_CACHE_TTL_SECONDS = float(os.getenv("PLACES_CACHE_TTL_SECONDS", str(24 * 3600)))
+PLACES_CACHE_MAX_ENTRIES = int(os.getenv("PLACES_CACHE_MAX_ENTRIES", "500"))
+
+
+class PlacesCache:
+    """Bounded LRU (like ItineraryCache) of gathered Places data keyed on canonical destination id."""
+
+    def __init__(self, max_entries: int = PLACES_CACHE_MAX_ENTRIES, ttl_seconds: float = PLACES_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.metrics = Counter()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.time():
+                self._entries.move_to_end(key)
+                return entry[1]
+            if entry:
+                del self._entries[key]
+                self.metrics["expired"] += 1
+            return None
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        if not key or not value:
+            return
+        with self._lock:
+            self._entries[key] = (time.time() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.metrics["evictions"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {"entries": len(self._entries), "max_entries": self.max_entries,
+                "expired": self.metrics["expired"], "evictions": self.metrics["evictions"]}
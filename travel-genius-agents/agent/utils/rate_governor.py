@@ -0,0 +1,167 @@
+# utils/rate_governor.py
+import asyncio
+import contextlib
+import contextvars
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Dict, Any, Optional, Tuple
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+
+from utils.metrics import QUEUE_WAIT_SECONDS
+
+# One token bucket per upstream: (requests per minute, burst). The buckets live in a small
+# SQLite file so every worker on the host (serve.py forks N of them) draws from the same
+# quota. Interactive calls may drain a bucket; background work (destination ingestion, run
+# under background_priority) only takes a token while a reserve is left, so user requests
+# keep headroom.
+UPSTREAM_LIMITS: Dict[str, Tuple[float, float]] = {
+    "gemini": (float(os.getenv("RATE_LIMIT_GEMINI_RPM", "300")), float(os.getenv("RATE_LIMIT_GEMINI_BURST", "30"))),
+    "openweathermap": (float(os.getenv("RATE_LIMIT_WEATHER_RPM", "60")), float(os.getenv("RATE_LIMIT_WEATHER_BURST", "10"))),
+    "openmeteo": (float(os.getenv("RATE_LIMIT_OPENMETEO_RPM", "300")), float(os.getenv("RATE_LIMIT_OPENMETEO_BURST", "20"))),
+    "places": (float(os.getenv("RATE_LIMIT_PLACES_RPM", "300")), float(os.getenv("RATE_LIMIT_PLACES_BURST", "20"))),
+}
+RATE_GOVERNOR_DB = os.getenv("RATE_GOVERNOR_DB", os.path.join(tempfile.gettempdir(), "travel_genius_rate.db"))
+RATE_GOVERNOR_ENABLED = os.getenv("RATE_GOVERNOR_ENABLED", "true").lower() not in ("0", "false", "no")
+# A token take holds the write lock for microseconds; if it is still held after this long,
+# something is wrong with the store and the call goes ahead unthrottled
+RATE_GOVERNOR_BUSY_TIMEOUT_S = float(os.getenv("RATE_GOVERNOR_BUSY_TIMEOUT_S", "0.25"))
+
+INTERACTIVE, BACKGROUND = "interactive", "background"
+BACKGROUND_RESERVE = 0.5  # share of the burst background work must leave untouched
+MAX_WAIT_SECONDS = {INTERACTIVE: 30.0, BACKGROUND: 300.0}
+
+_priority: contextvars.ContextVar[str] = contextvars.ContextVar("rate_priority", default=INTERACTIVE)
+
+
+@contextlib.contextmanager
+def background_priority():
+    """Calls made inside this block queue behind interactive traffic."""
+    token = _priority.set(BACKGROUND)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class RateGovernor:
+    """Host-wide token buckets; callers queue (sleep) until a token is available."""
+
+    def __init__(self, path: str = RATE_GOVERNOR_DB, limits: Dict[str, Tuple[float, float]] = UPSTREAM_LIMITS):
+        self.path = path
+        self.limits = limits
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.stats_counter: Dict[str, Counter] = defaultdict(Counter)
+
+    # ---------- SHARED STORE ----------
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():  # never reuse a parent's handle after fork
+            conn = sqlite3.connect(self.path, timeout=RATE_GOVERNOR_BUSY_TIMEOUT_S, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS buckets (name TEXT PRIMARY KEY, tokens REAL, updated REAL)")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def _try_take(self, upstream: str, priority: str) -> float:
+        """Take one token if allowed; returns 0.0 on success, else seconds until one should be."""
+        rpm, burst = self.limits[upstream]
+        rate = rpm / 60.0
+        floor = burst * BACKGROUND_RESERVE if priority == BACKGROUND else 0.0
+        conn = self._conn()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tokens, updated FROM buckets WHERE name = ?", (upstream,)).fetchone()
+            tokens = burst if row is None else min(burst, row[0] + (now - row[1]) * rate)
+            if tokens - 1.0 >= floor:
+                tokens -= 1.0
+                wait = 0.0
+            else:
+                wait = (floor + 1.0 - tokens) / rate
+            conn.execute("INSERT OR REPLACE INTO buckets (name, tokens, updated) VALUES (?, ?, ?)",
+                         (upstream, tokens, now))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return wait
+
+    def _record(self, upstream: str, priority: str, waited: float) -> None:
+        QUEUE_WAIT_SECONDS.observe(waited, upstream=upstream, priority=priority)
+        with self._lock:
+            stats = self.stats_counter[upstream]
+            stats[f"{priority}_calls"] += 1
+            stats[f"{priority}_wait_ms"] += int(waited * 1000)
+            if waited >= 0.01:
+                stats[f"{priority}_queued"] += 1
+
+    def _next_attempt(self, upstream: str, priority: str, started: float) -> Optional[float]:
+        """Seconds to sleep before retrying, or None when the caller may go ahead."""
+        if not RATE_GOVERNOR_ENABLED or upstream not in self.limits:
+            return None
+        try:
+            wait = self._try_take(upstream, priority)
+        except sqlite3.Error as e:
+            print(f"[Rate] ⚠️ Governor store unavailable ({e}); not throttling {upstream}")
+            return None
+        if wait <= 0:
+            return None
+        if time.perf_counter() - started + wait > MAX_WAIT_SECONDS[priority]:
+            print(f"[Rate] ⚠️ {upstream} quota still exhausted after {MAX_WAIT_SECONDS[priority]:.0f}s; proceeding")
+            with self._lock:
+                self.stats_counter[upstream]["over_quota"] += 1
+            return None
+        # Background pollers back off further so interactive waiters win the next refill
+        jitter = random.uniform(0, 0.05) if priority == INTERACTIVE else random.uniform(0.2, 0.5)
+        return wait + jitter
+
+    # ---------- PUBLIC API ----------
+    async def acquire(self, upstream: str, priority: Optional[str] = None) -> float:
+        """Wait (without blocking the loop) for one call's worth of quota; returns seconds waited."""
+        priority = priority or _priority.get()
+        started = time.perf_counter()
+        # The SQLite transaction may wait on another worker's lock: keep it off the loop
+        while (delay := await asyncio.to_thread(self._next_attempt, upstream, priority, started)) is not None:
+            await asyncio.sleep(delay)
+        waited = time.perf_counter() - started
+        if waited > 0.5:
+            print(f"[Rate] ⏳ {upstream} call queued {waited:.1f}s ({priority})")
+        self._record(upstream, priority, waited)
+        return waited
+
+    def acquire_blocking(self, upstream: str, priority: Optional[str] = None) -> float:
+        """Same for synchronous callers (requests-based clients); sleeps, so never call it on the loop."""
+        priority = priority or _priority.get()
+        started = time.perf_counter()
+        while (delay := self._next_attempt(upstream, priority, started)) is not None:
+            time.sleep(delay)
+        waited = time.perf_counter() - started
+        self._record(upstream, priority, waited)
+        return waited
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            per_upstream = {name: dict(c) for name, c in self.stats_counter.items()}
+        out = {"enabled": RATE_GOVERNOR_ENABLED, "store": self.path, "upstreams": {}}
+        for name, (rpm, burst) in self.limits.items():
+            out["upstreams"][name] = {"rpm": rpm, "burst": burst, **per_upstream.get(name, {})}
+        return out
+
+
+rate_governor = RateGovernor()
+
+
+async def throttle_model_call(callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[LlmResponse]:
+    """before_model_callback: take a Gemini token before the request goes out."""
+    await rate_governor.acquire("gemini")
+    return None
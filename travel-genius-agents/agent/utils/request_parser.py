@@ -0,0 +1,92 @@
+# utils/request_parser.py
+import re
+from typing import Dict, Any, List
+from utils.gazetteer import extract_destination
+from utils.destination_resolver import resolve_destination
+
+# Mirrors the query the frontend (adk-service.ts) and traffic generator send:
+# "Create a complete 2-day travel itinerary for Dubai, UAE with budget ₹150000 for 2 luxury
+#  travelers with preferences for five-star hotels, fine dining."
+_DAYS = re.compile(r'(\d{1,2})[-\s]?days?\b', re.IGNORECASE)
+_WEEKS = re.compile(r'\b(a|one|two|\d)[-\s]weeks?\b', re.IGNORECASE)
+_WEEK_COUNTS = {"a": 1, "one": 1, "two": 2}
+_BUDGET = re.compile(r'(?:₹|rs\.?|inr|budget(?: of)?)\s*([\d,]+(?:\.\d+)?)\s*(k|lakh|l)?', re.IGNORECASE)
+_DESTINATION = re.compile(r'itinerary for\s+(.+?)\s+with budget', re.IGNORECASE)
+_GROUP = re.compile(r'\bfor\s+(\d{1,2})\s+([a-z]+)', re.IGNORECASE)
+_PREFERENCES = re.compile(r'preferences for\s+(.+?)\.?$', re.IGNORECASE)
+# adk-service.ts appends preferences straight after the personality: "for 2 luxury five-star hotels, spa."
+_NO_PREFERENCES = ("no specific preferences", "travelers", "traveler", "")
+
+PERSONALITIES = ("heritage", "adventure", "cultural", "party", "luxury")
+_PERSONALITY_WORD = re.compile(r'\b(' + '|'.join(PERSONALITIES) + r')\b', re.IGNORECASE)
+
+# Used when the request states no trip length / no rupee budget (a "$2000" budget is not
+# parsed); days_source and budget_source say "default" so callers can tell.
+DEFAULT_DAYS = 3
+DEFAULT_BUDGET = 50_000
+
+
+def _parse_budget(text: str) -> int:
+    m = _BUDGET.search(text)
+    if not m:
+        return 0
+    value = float(m.group(1).replace(",", "") or 0)
+    unit = (m.group(2) or "").lower()
+    if unit == "k":
+        value *= 1_000
+    elif unit in ("lakh", "l"):
+        value *= 100_000
+    return int(value)
+
+
+def parse_trip_request(text: str) -> Dict[str, Any]:
+    """
+    Best-effort extraction of trip parameters from a generate request; missing fields use
+    defaults, and days_source / budget_source are "request" or "default" accordingly.
+    personality_source is "request" for the frontend's "for 2 heritage ...", "mention" when
+    a type is only named somewhere in the text, "" when none is.
+    """
+    text = text or ""
+    days = 0
+    if (m := _DAYS.search(text)):
+        days = int(m.group(1))
+    elif (m := _WEEKS.search(text)):
+        days = 7 * (_WEEK_COUNTS.get(m.group(1).lower()) or int(m.group(1)))
+    budget = _parse_budget(text)
+
+    destination, canonical_id = "", ""
+    if (match := extract_destination(text)):
+        destination, canonical_id = match["destination"], match["canonical_id"]
+    elif (m := _DESTINATION.search(text)):
+        resolved = resolve_destination(m.group(1))
+        destination, canonical_id = resolved["name"], resolved["canonical_id"]
+
+    group_size, personality, personality_source, trailing = 1, "", "", ""
+    for m in _GROUP.finditer(text):
+        if m.group(2).lower() in PERSONALITIES:
+            group_size, personality = int(m.group(1)), m.group(2).lower()
+            personality_source = "request"
+            trailing = text[m.end():].strip().rstrip(".").strip()
+            break
+    if not personality and (m := _PERSONALITY_WORD.search(text)):
+        # Only mentioned ("No luxury please"): a hint, not the user's chosen type
+        personality, personality_source = m.group(1).lower(), "mention"
+
+    preferences: List[str] = []
+    if (m := _PREFERENCES.search(text.strip())):
+        preferences = [p.strip().lower() for p in m.group(1).split(",") if p.strip()]
+    elif trailing.lower() not in _NO_PREFERENCES:
+        preferences = [p.strip().lower() for p in trailing.split(",") if p.strip()]
+
+    return {
+        "destination": destination,
+        "canonical_id": canonical_id,
+        "days": max(1, min(days or DEFAULT_DAYS, 30)),
+        "days_source": "request" if days else "default",
+        "budget": budget or DEFAULT_BUDGET,
+        "budget_source": "request" if budget else "default",
+        "groupSize": max(1, group_size),
+        "personality": personality,
+        "personality_source": personality_source,
+        "preferences": preferences,
+    }
@@ -1,35 +1,109 @@
 # utils/response_helpers.py
-import json
-from typing import Dict, Any, List
+from typing import Dict, Any, Iterable, AsyncIterable, List, Optional, Tuple
 from utils.itinerary_helper import create_weather_optimized_itinerary
 
-def parse_adk_response_data(adk_response: list,
-                            user_input: dict = None) -> dict:
-    """Collects tool outputs + text and returns structured itinerary."""
-    final_text, weather_data = "", None
-    for turn in adk_response:
-        for part in turn.get("content", {}).get("parts", []):
+WEATHER_FUNCTIONS = ("get_weather_analysis", "get_current_weather_report")
+DEFAULT_USER_INPUT = {"destination": "Goa", "days": 5, "budget": 50_000}
+
+
+def _event_parts(event: Any) -> Tuple[bool, List[Tuple[Optional[str], Optional[str], Any]]]:
+    """(partial, [(text, function_name, function_response), ...]) for a /run JSON event or an ADK Event."""
+    if isinstance(event, dict):
+        parts = (event.get("content") or {}).get("parts") or []
+        out = []
+        for part in parts:
             if "text" in part:
-                final_text += part["text"] + "\n"
+                out.append((part["text"], None, None))
             elif "functionResponse" in part:
                 resp = part["functionResponse"]
-                if resp.get("name") in ["get_weather_analysis",
-                                        "get_current_weather_report"]:
-                    weather_data = resp["response"]
-
-    if not user_input:
-        user_input = {"destination": "Goa", "days": 5, "budget": 50_000}
-
-    itinerary = create_weather_optimized_itinerary(weather_data,
-                                                   user_input,
-                                                   final_text)
-
-    return {
-        "success": True,
-        "itinerary": itinerary,
-        "conversational_response": final_text.strip(),
-        "weather_data": weather_data
-    }
+                out.append((None, resp.get("name"), resp.get("response")))
+        return bool(event.get("partial")), out
+    content = getattr(event, "content", None)
+    out = []
+    for part in (content.parts or []) if content else []:
+        if part.text is not None:
+            out.append((part.text, None, None))
+        elif part.function_response:
+            out.append((None, part.function_response.name, part.function_response.response))
+    return bool(getattr(event, "partial", False)), out
+
+
+class ADKResponseAssembler:
+    """
+    Consumes ADK events one at a time, so a run never has to be held as a list.
+    Keeps the text chunks, the latest response per weather function, and builds the
+    structured itinerary as soon as weather data is in. State is independent of the number
+    of events; only the text itself grows.
+    """
+
+    def __init__(self, user_input: dict = None):
+        self.user_input = user_input or DEFAULT_USER_INPUT
+        self.text_chunks: List[str] = []
+        self.weather_responses: Dict[str, Any] = {}
+        self.weather_data = None
+        self.itinerary: Optional[dict] = None
+        self.events = 0
+        self._partial_chunks: List[str] = []
+
+    def feed(self, event: Any) -> Optional[dict]:
+        """Consume one event; returns the itinerary when this event made it (re)buildable."""
+        self.events += 1
+        partial, parts = _event_parts(event)
+        weather_changed = False
+        texts = []
+        for text, name, response in parts:
+            if text is not None:
+                texts.append(text)
+            elif name in WEATHER_FUNCTIONS:
+                self.weather_responses[name] = response
+                self.weather_data = response
+                weather_changed = True
+
+        if partial:
+            # SSE deltas; ADK follows them with one aggregated event carrying the same text
+            self._partial_chunks.extend(texts)
+        elif texts or self._partial_chunks:
+            self._partial_chunks.clear()
+            self.text_chunks.extend(texts)
+
+        if weather_changed:
+            self.itinerary = create_weather_optimized_itinerary(self.weather_data, self.user_input,
+                                                                self.text)
+            return self.itinerary
+        return None
+
+    def feed_all(self, events: Iterable[Any]) -> "ADKResponseAssembler":
+        for event in events:
+            self.feed(event)
+        return self
+
+    async def afeed_all(self, events: AsyncIterable[Any]) -> "ADKResponseAssembler":
+        """Same as feed_all for runner.run_async(...) and other async event sources."""
+        async for event in events:
+            self.feed(event)
+        return self
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.text_chunks + self._partial_chunks)
+
+    def result(self) -> dict:
+        if self.itinerary is None:
+            self.itinerary = create_weather_optimized_itinerary(self.weather_data, self.user_input,
+                                                                self.text)
+        return {
+            "success": True,
+            "itinerary": self.itinerary,
+            "conversational_response": self.text.strip(),
+            "weather_data": self.weather_data
+        }
+
+
+def parse_adk_response_data(adk_response: Iterable[Any],
+                            user_input: dict = None) -> dict:
+    """Collects tool outputs + text and returns structured itinerary.
+    Accepts a list or any iterator of events (e.g. a generator reading /run_sse)."""
+    return ADKResponseAssembler(user_input).feed_all(adk_response).result()
 
 # -------- Pretty printer (copied verbatim) --------
 def format_weather_response_text(weather_report: Dict[str, Any]) -> str:
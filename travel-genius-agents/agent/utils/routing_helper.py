@@ -1,9 +1,21 @@
 # utils/routing_helpers.py
+import re
+
+from utils.request_parser import parse_trip_request
+
+# The frontend (adk-service.ts) and traffic generator open every generate request with this
+_GENERATE_TEMPLATE = re.compile(r'\bcreate a complete \d{1,2}-day travel itinerary for\b')
+
+
 def determine_intent(query: str, has_existing_itinerary: bool = False) -> str:
     q = query.lower()
     gen = ['create itinerary', 'plan a trip', 'generate itinerary', 'plan my vacation']
     chat = ['can you change', 'what about', 'suggest', 'alternative', 'cheaper']
-    if any(k in q for k in gen):   return "generate"
+    if any(k in q for k in gen) or _GENERATE_TEMPLATE.search(q):   return "generate"
+    # A new trip spelled out in full is a new trip, whatever itinerary the session holds
+    trip = parse_trip_request(query)
+    if trip["destination"] and trip["days_source"] == trip["budget_source"] == "request":
+        return "generate"
     if any(k in q for k in chat):  return "chat"
     return "chat" if has_existing_itinerary else "generate"
 
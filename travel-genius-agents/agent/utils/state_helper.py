@@ -0,0 +1,22 @@
+# utils/state_helper.py
+from typing import Any, Dict
+from utils.json_parser import parse_tolerant
+
+
+def load_json_value(value: Any) -> Dict[str, Any]:
+    """
+    Agents store their output in session state as text, so weather_data is usually a JSON
+    string (sometimes with Python literals or a ```json fence). Returns {} when unparseable.
+    """
+    if isinstance(value, dict):
+        return value
+    parsed = parse_tolerant(value) if isinstance(value, str) else None
+    return parsed if isinstance(parsed, dict) else {}
+
+
+def read_json_state(state: Any, key: str) -> Dict[str, Any]:
+    """load_json_value(state[key]) for ADK State objects and plain dicts alike."""
+    try:
+        return load_json_value(state.get(key))
+    except Exception:
+        return {}
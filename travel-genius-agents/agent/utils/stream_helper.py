@@ -0,0 +1,68 @@
+# utils/stream_helper.py
+from typing import Any, Dict, List, Tuple
+from utils.itinerary_validator import validate_daily_plan
+from utils.json_parser import IncrementalJSONParser
+
+# Top-level TravelItinerary fields emitted before the first day ("header")
+HEADER_FIELDS = ("tripTitle", "totalEstimatedCost")
+
+
+class ItineraryStreamAssembler:
+    """
+    Feeds the itinerary JSON into the incremental parser as the model streams it and reports
+    ("header", {...}), ("day", DailyPlan dict) and ("summary", {...}) as soon as each piece
+    is complete. Each chunk is tokenized once; nothing is re-parsed.
+    """
+
+    def __init__(self, context: Dict[str, Any] = None):
+        self.context = context or {}  # parsed trip request, used when a day needs repair
+        self._parser = IncrementalJSONParser(emit_depth=2)
+        self.header: Dict[str, Any] = {}
+        self.summary: Dict[str, Any] = {}
+        self.days: List[Dict[str, Any]] = []
+        self.header_sent = False
+        self.complete = False
+        self._seen_days = False
+
+    def feed(self, chunk: str) -> List[Tuple[str, Dict[str, Any]]]:
+        out: List[Tuple[str, Dict[str, Any]]] = []
+        if self.complete or not chunk:
+            return out
+        for path, value in self._parser.feed(chunk):
+            if not path:
+                self._finish(out)
+            elif path[0] == "dailyPlans":
+                if len(path) == 2:
+                    self._seen_days = True
+                    self._send_header(out)
+                    self._emit_day(value, out)
+            elif len(path) == 1:
+                (self.summary if self._seen_days else self.header)[path[0]] = value
+                if not self._seen_days and all(f in self.header for f in HEADER_FIELDS):
+                    self._send_header(out)
+        return out
+
+    def _emit_day(self, data: Any, out) -> None:
+        day = validate_daily_plan(data, len(self.days) + 1, self.context)
+        if day is None:
+            out.append(("day_error", {"index": len(self.days)}))
+            return
+        self.days.append(day)
+        out.append(("day", day))
+
+    def _send_header(self, out) -> None:
+        if not self.header_sent:
+            self.header_sent = True
+            out.append(("header", dict(self.header)))
+
+    def _finish(self, out) -> None:
+        self.complete = True
+        self._send_header(out)
+        out.append(("summary", dict(self.summary)))
+
+
+def itinerary_as_stream(itinerary: Dict[str, Any]) -> List[Tuple[str, Dict[str, Any]]]:
+    """Same event sequence for an itinerary that arrived in one piece (cache hit, degraded mode)."""
+    header = {k: itinerary[k] for k in HEADER_FIELDS if k in itinerary}
+    summary = {k: v for k, v in itinerary.items() if k not in HEADER_FIELDS and k != "dailyPlans"}
+    return [("header", header)] + [("day", d) for d in itinerary.get("dailyPlans", [])] + [("summary", summary)]
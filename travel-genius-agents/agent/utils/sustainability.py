@@ -0,0 +1,249 @@
+# utils/sustainability.py
+import math
+import os
+from functools import lru_cache
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+from utils.destination_resolver import destination_resolver
+
+# Deterministic carbon footprint and sustainability score for a trip, shared by Places
+# ingestion (catalog scores), the fallback itinerary builder and the sustainability_advisor
+# pipeline step. Pure arithmetic on the tables below: no I/O once the destination catalog
+# is loaded, a few microseconds per trip.
+
+# Where trips start when the request does not say ("... from Mumbai to Goa")
+SUSTAINABILITY_ORIGIN = os.getenv("SUSTAINABILITY_ORIGIN", "New Delhi")
+
+# kg CO2e per passenger-km (UK DEFRA/DESNZ 2023 conversion factors; flights include the
+# radiative-forcing uplift). Car is per vehicle-km and is shared by the group.
+EMISSION_FACTORS: Dict[str, float] = {
+    "flight_domestic": 0.272,
+    "flight_short_haul": 0.186,   # international, < 3700 km
+    "flight_long_haul": 0.148,
+    "train": 0.035,
+    "bus": 0.027,
+    "car": 0.170,
+    "ferry": 0.019,
+}
+CAR_SEATS = 4
+LONG_HAUL_KM = 3700
+FLIGHT_UPLIFT = 1.08        # great-circle -> flown distance (routing, stacking)
+SURFACE_DETOUR = 1.25       # great-circle -> road/rail distance
+MAX_SURFACE_KM = 1000       # beyond this a same-country trip is assumed to fly
+# How green each mode is, 1-10, for the trip score
+MODE_SCORES = {"train": 9, "bus": 9, "ferry": 8, "car": 6,
+               "flight_domestic": 2, "flight_short_haul": 3, "flight_long_haul": 3}
+MODE_LABELS = {"flight_domestic": "domestic flight", "flight_short_haul": "short-haul flight",
+               "flight_long_haul": "long-haul flight"}
+# Only suggest switching mode when it saves at least this share of the transport footprint
+MIN_SWITCH_SAVING = 0.3
+
+# Getting around at the destination: km per person per day, by auto/taxi/metro mix
+LOCAL_KM_PER_DAY = 15
+LOCAL_KG_PER_KM = 0.09
+
+# kg CO2e per room-night by price tier (the hotels.price_tier values ingestion writes)
+HOTEL_NIGHT_KG = {"Budget": 12.0, "Upper Midscale": 18.0, "Upscale": 25.0,
+                  "Upper Upscale": 32.0, "Luxury": 45.0}
+DEFAULT_HOTEL_NIGHT_KG = 20.0
+GUESTS_PER_ROOM = 2
+
+# Per activity type (models.Activity.type): (sustainability score 1-10, kg CO2e per person)
+ACTIVITY_PROFILES: Dict[str, Tuple[int, float]] = {
+    "cultural": (9, 0.5),
+    "instagram": (8, 0.3),
+    "food": (8, 2.5),
+    "relaxation": (7, 2.0),
+    "adventure": (6, 4.0),
+    "shopping": (5, 1.5),
+    "nightlife": (4, 2.5),
+}
+DEFAULT_ACTIVITY_PROFILE = (7, 1.5)
+
+# Google Places types that move a place's score up or down (parks and museums over casinos)
+_GREEN_PLACE_TYPES = {"park", "natural_feature", "campground", "museum", "art_gallery",
+                      "hindu_temple", "church", "historical_site", "library", "hiking_area"}
+_HEAVY_PLACE_TYPES = {"amusement_park", "casino", "shopping_mall", "night_club", "stadium",
+                      "water_park", "golf_course"}
+_UNCROWDED_RATINGS = 1000   # fewer reviews than this = less crowded = more sustainable
+
+# Trip score: footprint per person per day scores 5/10 at this value, 10/10 at zero
+REFERENCE_KG_PER_PERSON_DAY = 50.0
+SCORE_WEIGHTS = {"footprint": 0.5, "activities": 0.3, "stay": 0.2}
+
+_EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle distance in km."""
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp, dl = p2 - p1, math.radians(lng2 - lng1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * _EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+@lru_cache(maxsize=1024)
+def locate(name: str) -> Optional[Dict[str, Any]]:
+    """Catalog entry (lat/lng, country_code) for a destination name, None when unknown."""
+    match = destination_resolver.resolve(name or "")
+    if not match["matched"]:
+        return None
+    entry = destination_resolver.get(match["canonical_id"]) or {}
+    if entry.get("lat") is None or entry.get("lng") is None:
+        return None
+    return {"id": entry["id"], "name": entry["name"], "lat": entry["lat"], "lng": entry["lng"],
+            "country_code": entry.get("country_code")}
+
+
+# Unknown names are memoized as None; a destination discovered later must not stay unknown
+destination_resolver.on_add(locate.cache_clear)
+
+
+def choose_mode(distance_km: float, same_country: bool) -> str:
+    """Mode a typical traveller would take for this great-circle distance."""
+    if same_country and distance_km <= MAX_SURFACE_KM:
+        return "train"
+    if same_country:
+        return "flight_domestic"
+    return "flight_long_haul" if distance_km >= LONG_HAUL_KM else "flight_short_haul"
+
+
+def transport_kg(mode: str, distance_km: float, group_size: int = 1) -> float:
+    """Return-trip kg CO2e for the whole group, from a one-way great-circle distance."""
+    group_size = max(1, int(group_size))
+    factor = EMISSION_FACTORS.get(mode, EMISSION_FACTORS["car"])
+    km = distance_km * (FLIGHT_UPLIFT if mode.startswith("flight") else SURFACE_DETOUR) * 2
+    if mode == "car":
+        return km * factor * math.ceil(group_size / CAR_SEATS)
+    return km * factor * group_size
+
+
+def activity_profile(activity: Dict[str, Any]) -> Tuple[float, float]:
+    """(score, kg per person) for an activity; a catalog sustainability_score wins over the type default."""
+    score, kg = ACTIVITY_PROFILES.get(str(activity.get("type", "")).lower(), DEFAULT_ACTIVITY_PROFILE)
+    catalog = activity.get("sustainability_score")
+    if isinstance(catalog, (int, float)) and catalog > 0:
+        score = float(catalog)
+    return float(score), kg
+
+
+def hotel_night_kg(hotel: Optional[Dict[str, Any]] = None) -> float:
+    """Room-night footprint by price tier; greener hotels (catalog score) shave up to a third off."""
+    hotel = hotel or {}
+    kg = HOTEL_NIGHT_KG.get(hotel.get("price_tier"), DEFAULT_HOTEL_NIGHT_KG)
+    score = hotel.get("sustainability_score")
+    if isinstance(score, (int, float)) and score > 5:
+        kg *= 1.0 - 0.33 * (min(10.0, score) - 5.0) / 5.0
+    return kg
+
+
+def place_sustainability_score(rating: Optional[float], rating_count: Optional[int] = None,
+                               types: Iterable[str] = ()) -> int:
+    """
+    1-10 score for a Google Places result (destination, activity or hotel): well rated and
+    uncrowded places score higher, parks/museums/heritage get a point, casinos and malls lose one.
+    """
+    score = int((rating if rating is not None else 4.0) * 2)
+    if rating_count is not None and rating_count < _UNCROWDED_RATINGS:
+        score += 1
+    types = set(types or ())
+    if types & _GREEN_PLACE_TYPES:
+        score += 1
+    if types & _HEAVY_PLACE_TYPES:
+        score -= 1
+    return max(1, min(10, score))
+
+
+def _footprint_score(kg_per_person_day: float) -> float:
+    return 10.0 * REFERENCE_KG_PER_PERSON_DAY / (REFERENCE_KG_PER_PERSON_DAY + max(0.0, kg_per_person_day))
+
+
+def trip_footprint(destination: str, days: int, group_size: int = 1,
+                   activities: Iterable[Dict[str, Any]] = (), hotel: Optional[Dict[str, Any]] = None,
+                   origin: Optional[str] = None, mode: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Carbon footprint (kg CO2e) and 0-10 sustainability score of a trip. `activities` are
+    itinerary/catalog activity dicts (type, optional sustainability_score); `hotel` a catalog
+    hotel (price_tier, sustainability_score). Unknown places leave transport at zero and say so.
+    """
+    days = max(1, int(days))
+    group_size = max(1, int(group_size))
+    origin = origin or SUSTAINABILITY_ORIGIN
+    start, end = locate(origin), locate(destination)
+
+    distance_km = 0.0
+    alternatives: Dict[str, float] = {}
+    if start and end:
+        distance_km = haversine_km(start["lat"], start["lng"], end["lat"], end["lng"])
+        same_country = start["country_code"] == end["country_code"]
+        mode = mode or choose_mode(distance_km, same_country)
+        if same_country and distance_km <= MAX_SURFACE_KM * 2:
+            candidates = ("train", "bus", "car", "flight_domestic")
+        else:
+            candidates = (mode,)
+        alternatives = {m: round(transport_kg(m, distance_km, group_size), 1) for m in candidates}
+    mode = mode or "unknown"  # origin or destination not in the catalog: no transport estimate
+    transport = transport_kg(mode, distance_km, group_size)
+
+    rooms = math.ceil(group_size / GUESTS_PER_ROOM)
+    nights = max(1, days - 1)
+    stay = hotel_night_kg(hotel) * rooms * nights
+    local = LOCAL_KM_PER_DAY * LOCAL_KG_PER_KM * days * group_size
+
+    profiles = [activity_profile(a) for a in activities if isinstance(a, dict)]
+    activities_kg = sum(kg for _, kg in profiles) * group_size
+    activity_score = sum(s for s, _ in profiles) / len(profiles) if profiles else float(DEFAULT_ACTIVITY_PROFILE[0])
+    hotel_score = (hotel or {}).get("sustainability_score")
+    stay_score = float(hotel_score) if isinstance(hotel_score, (int, float)) and hotel_score > 0 else 6.0
+
+    total = transport + stay + local + activities_kg
+    per_person_day = total / (group_size * days)
+    footprint_score = _footprint_score(per_person_day)
+    # The mode itself counts too: a short flight is never a green trip, however short the stay
+    footprint_score = min(footprint_score, (footprint_score + MODE_SCORES.get(mode, 6)) / 2)
+    score = (SCORE_WEIGHTS["footprint"] * footprint_score + SCORE_WEIGHTS["activities"] * activity_score
+             + SCORE_WEIGHTS["stay"] * stay_score)
+
+    return {
+        "origin": start["name"] if start else origin,
+        "destination": end["name"] if end else destination,
+        "distance_km": round(distance_km),
+        "mode": mode,
+        "days": days,
+        "group_size": group_size,
+        "kg_co2e": {
+            "transport": round(transport, 1),
+            "accommodation": round(stay, 1),
+            "local_transport": round(local, 1),
+            "activities": round(activities_kg, 1),
+            "total": round(total, 1),
+        },
+        "kg_co2e_per_person_day": round(per_person_day, 1),
+        "transport_alternatives": alternatives,
+        "sustainabilityScore": round(max(0.0, min(10.0, score)), 1),
+        "located": bool(start and end),
+    }
+
+
+def sustainability_tips(footprint: Dict[str, Any], weather: Optional[Dict[str, Any]] = None) -> List[str]:
+    """Short, concrete advice derived from the footprint (and forecast, when there is one)."""
+    tips = []
+    alternatives = footprint.get("transport_alternatives") or {}
+    current = alternatives.get(footprint["mode"])
+    greenest = min(alternatives, key=alternatives.get) if alternatives else None
+    if greenest and current and (current - alternatives[greenest]) / current >= MIN_SWITCH_SAVING:
+        saved = current - alternatives[greenest]
+        tips.append(f"Travel by {MODE_LABELS.get(greenest, greenest)} instead of "
+                    f"{MODE_LABELS.get(footprint['mode'], footprint['mode'])} to save about "
+                    f"{saved:.0f} kg CO2e ({saved / current:.0%})")
+    elif footprint["mode"].startswith("flight"):
+        tips.append("Fly direct and economy; take trains or buses for hops at the destination")
+    kg = footprint["kg_co2e"]
+    if kg["accommodation"] >= 0.25 * kg["total"]:
+        tips.append("Pick a certified eco-stay or homestay: the room is a large share of this trip's footprint")
+    tips.append("Use metro, buses or walking between sights; carry a reusable bottle")
+    forecast = (weather or {}).get("daily_forecast") or []
+    hot = [d for d in forecast if isinstance(d, dict) and (d.get("max_temp") or 0) >= 35]
+    if hot:
+        tips.append(f"{len(hot)} very hot day(s) ahead: plan outdoor sights early to avoid long air-conditioned taxi rides")
+    return tips
@@ -0,0 +1,164 @@
+# utils/upstream_tape.py
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+# Record/replay for outbound API calls (OpenWeatherMap, Open-Meteo, Places, googlemaps),
+# so benchmarks and load tests can run the real weather and ingestion code paths offline.
+#   record: calls go out as usual; each successful response is appended, with its latency,
+#           to <UPSTREAM_TAPE_DIR>/<upstream>.jsonl (one compact JSON line per call).
+#   replay: nothing goes out; the response is served from the tape after sleeping the
+#           recorded latency x UPSTREAM_TAPE_LATENCY_SCALE (0 = instant). A call that is not
+#           on the tape raises TapeMissError instead of touching the network.
+# Calls are matched on upstream, method, the last path segment, the query string (API keys
+# dropped) and the JSON body, so a tape recorded against the real hosts also replays when
+# the base URLs point elsewhere. Repeated identical calls replay their recordings in turn.
+UPSTREAM_TAPE_MODE = os.getenv("UPSTREAM_TAPE_MODE", "off").lower()  # off | record | replay
+UPSTREAM_TAPE_DIR = os.getenv("UPSTREAM_TAPE_DIR", os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "benchmarks", "data", "tapes"))
+UPSTREAM_TAPE_LATENCY_SCALE = float(os.getenv("UPSTREAM_TAPE_LATENCY_SCALE", "1.0"))
+
+_SECRET_PARAMS = {"appid", "key", "apikey", "api_key"}
+
+
+class TapeMissError(Exception):
+    """Replay mode was asked for a call that was never recorded."""
+
+
+def _request_key(upstream: str, method: str, target: str, body: Any = None) -> Tuple[str, str]:
+    """(key, redacted request description) for an URL, or a client method name for googlemaps."""
+    parts = urlsplit(target)
+    endpoint = parts.path.rstrip("/").rsplit("/", 1)[-1] if parts.scheme else target
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                   if k.lower() not in _SECRET_PARAMS)
+    canonical = json.dumps([upstream, method.upper(), endpoint, query, body], sort_keys=True, default=str)
+    described = f"{method.upper()} {endpoint}" + (f"?{'&'.join(f'{k}={v}' for k, v in query)}" if query else "")
+    return hashlib.sha1(canonical.encode()).hexdigest()[:16], described
+
+
+class UpstreamTape:
+    def __init__(self, mode: str = UPSTREAM_TAPE_MODE, directory: str = UPSTREAM_TAPE_DIR,
+                 latency_scale: float = UPSTREAM_TAPE_LATENCY_SCALE):
+        if mode not in ("off", "record", "replay"):
+            raise ValueError(f"UPSTREAM_TAPE_MODE must be off, record or replay, not {mode!r}")
+        self.mode = mode
+        self.directory = directory
+        self.latency_scale = max(0.0, latency_scale)
+        self._tapes: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}  # upstream -> key -> recordings
+        self._cursor: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+        self.stats_counter = Counter()
+        if mode != "off":
+            print(f"[Tape] 📼 Upstream tape in {mode} mode ({directory}, latency x{self.latency_scale})")
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == "record"
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    def _path(self, upstream: str) -> str:
+        return os.path.join(self.directory, f"{upstream}.jsonl")
+
+    # ---------- RECORD ----------
+    def record(self, upstream: str, method: str, target: str, body: Any, response: Any, latency_s: float) -> None:
+        if not self.recording:
+            return
+        key, described = _request_key(upstream, method, target, body)
+        line = json.dumps({"key": key, "request": described, "latency_ms": round(latency_s * 1000, 1),
+                           "response": response}, separators=(",", ":"), ensure_ascii=False)
+        try:
+            with self._lock:
+                os.makedirs(self.directory, exist_ok=True)
+                # O_APPEND of one line at a time, so prefork workers can share a tape file
+                with open(self._path(upstream), "a", encoding="utf-8") as f:
+                    f.write(line + "\n")
+            self.stats_counter[f"recorded.{upstream}"] += 1
+        except Exception as e:
+            print(f"[Tape] ⚠️ Could not record {upstream} {described}: {e}")
+
+    # ---------- REPLAY ----------
+    def _load(self, upstream: str) -> Dict[str, List[Dict[str, Any]]]:
+        tape = self._tapes.get(upstream)
+        if tape is None:
+            tape = defaultdict(list)
+            try:
+                with open(self._path(upstream), encoding="utf-8") as f:
+                    for line in f:
+                        if line.strip():
+                            entry = json.loads(line)
+                            tape[entry["key"]].append(entry)
+            except FileNotFoundError:
+                print(f"[Tape] ⚠️ No tape for {upstream} at {self._path(upstream)}")
+            self._tapes[upstream] = tape
+        return tape
+
+    def _lookup(self, upstream: str, method: str, target: str, body: Any) -> Dict[str, Any]:
+        key, described = _request_key(upstream, method, target, body)
+        with self._lock:
+            recordings = self._load(upstream).get(key)
+            if not recordings:
+                self.stats_counter[f"misses.{upstream}"] += 1
+                raise TapeMissError(f"{upstream} {described} is not on the tape")
+            entry = recordings[self._cursor[key] % len(recordings)]
+            self._cursor[key] += 1
+        self.stats_counter[f"replayed.{upstream}"] += 1
+        return entry
+
+    async def replay(self, upstream: str, method: str, target: str, body: Any = None) -> Any:
+        entry = self._lookup(upstream, method, target, body)
+        if self.latency_scale:
+            await asyncio.sleep(entry["latency_ms"] / 1000 * self.latency_scale)
+        return entry["response"]
+
+    def replay_blocking(self, upstream: str, method: str, target: str, body: Any = None) -> Any:
+        entry = self._lookup(upstream, method, target, body)
+        if self.latency_scale:
+            time.sleep(entry["latency_ms"] / 1000 * self.latency_scale)
+        return entry["response"]
+
+    # ---------- CLIENT WRAPPER ----------
+    def client(self, factory: Callable[[], Any], upstream: str) -> Any:
+        """
+        A client object (googlemaps.Client) whose method calls are recorded or replayed by
+        method name and arguments. With the tape off this is just factory(); when replaying
+        the real client is never built, so no API key is needed.
+        """
+        if self.mode == "off":
+            return factory()
+        return _TapedClient(self, factory, upstream)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"mode": self.mode, "directory": self.directory, "latency_scale": self.latency_scale,
+                **self.stats_counter}
+
+
+class _TapedClient:
+    def __init__(self, tape: UpstreamTape, factory: Callable[[], Any], upstream: str):
+        self._tape, self._factory, self._upstream = tape, factory, upstream
+        self._client = None
+
+    def __getattr__(self, name: str) -> Callable:
+        def call(*args, **kwargs):
+            body = {"args": list(args), "kwargs": kwargs}
+            if self._tape.replaying:
+                return self._tape.replay_blocking(self._upstream, "CALL", name, body)
+            if self._client is None:
+                self._client = self._factory()
+            started = time.perf_counter()
+            result = getattr(self._client, name)(*args, **kwargs)
+            self._tape.record(self._upstream, "CALL", name, body, result, time.perf_counter() - started)
+            return result
+        return call
+
+
+# Singleton
+upstream_tape = UpstreamTape()
@@ -0,0 +1,104 @@
+# utils/weather_codec.py
+from typing import Dict, Any, List
+
+from utils.state_helper import load_json_value
+
+# Compact form of a get_weather_analysis result, as stored in state.weather_data and read
+# by the LLM agents. One row per day instead of one verbose dict per day:
+#
+#   {"v": 1, "dst": "Goa", "ok": true, "sc": 8.0, "rec": ["..."],
+#    "cols": ["date", "cond", "tmin", "tmax", "tavg", "rain", "wind", "hum", "uv", "out", "in", "beach", "tips"],
+#    "days": [["2025-01-01", "clear sky", 24.1, 31.6, 27.9, 0.0, 4.2, 68, 5, 9, 7, 9, [0]], ...],
+#    "tips": ["Perfect day for outdoor sightseeing and adventure activities", ...],
+#    "alerts": [["2025-01-02", "heavy_rain", "Heavy rain expected (18.2mm) - plan indoor activities"]]}
+#
+# "tips" is a shared string table; each day references its recommendations by index.
+# expand_weather(compact_weather(x)) == x for every analysis the weather tool produces.
+CODEC_VERSION = 1
+
+_DAY_FIELDS = (
+    ("date", "date"),
+    ("cond", "condition"),
+    ("tmin", "min_temp"),
+    ("tmax", "max_temp"),
+    ("tavg", "avg_temp"),
+    ("rain", "precipitation"),
+    ("wind", "wind_speed"),
+    ("hum", "humidity"),
+    ("uv", "uv_index"),
+)
+_SCORE_FIELDS = (("out", "outdoor"), ("in", "indoor"), ("beach", "beach"))
+COLUMNS = [short for short, _ in _DAY_FIELDS] + [short for short, _ in _SCORE_FIELDS] + ["tips"]
+
+
+def is_compact(weather: Any) -> bool:
+    return isinstance(weather, dict) and weather.get("v") == CODEC_VERSION and "days" in weather
+
+
+def compact_weather(analysis: Dict[str, Any]) -> Dict[str, Any]:
+    """Encode a get_weather_analysis result; errors and unknown shapes pass through unchanged."""
+    if not isinstance(analysis, dict) or "daily_forecast" not in analysis or is_compact(analysis):
+        return analysis
+
+    tips: List[str] = []
+    tip_index: Dict[str, int] = {}
+    rows = []
+    for day in analysis["daily_forecast"]:
+        scores = day.get("suitability_scores", {})
+        refs = []
+        for tip in day.get("recommendations", []):
+            if tip not in tip_index:
+                tip_index[tip] = len(tips)
+                tips.append(tip)
+            refs.append(tip_index[tip])
+        rows.append([day.get(name) for _, name in _DAY_FIELDS]
+                    + [scores.get(name) for _, name in _SCORE_FIELDS]
+                    + [refs])
+
+    return {
+        "v": CODEC_VERSION,
+        "dst": analysis.get("destination", ""),
+        "ok": analysis.get("weather_suitable"),
+        "sc": analysis.get("weather_score"),
+        "rec": analysis.get("recommendations", []),
+        "cols": COLUMNS,
+        "days": rows,
+        "tips": tips,
+        "alerts": [[a.get("date"), a.get("type"), a.get("message")] for a in analysis.get("alerts", [])],
+    }
+
+
+def expand_weather(weather: Any) -> Dict[str, Any]:
+    """Inverse of compact_weather for the deterministic code paths; full-form input is returned as is."""
+    if not is_compact(weather):
+        return weather if isinstance(weather, dict) else {}
+
+    tips = weather.get("tips", [])
+    n_day = len(_DAY_FIELDS)
+    daily = []
+    for row in weather["days"]:
+        day = {name: row[i] for i, (_, name) in enumerate(_DAY_FIELDS)}
+        day["suitability_scores"] = {name: row[n_day + i] for i, (_, name) in enumerate(_SCORE_FIELDS)}
+        day["recommendations"] = [tips[i] for i in row[-1]]
+        daily.append(day)
+
+    return {
+        "destination": weather.get("dst", ""),
+        "weather_suitable": weather.get("ok"),
+        "weather_score": weather.get("sc"),
+        "recommendations": weather.get("rec", []),
+        "daily_forecast": daily,
+        "alerts": [{"date": d, "type": t, "message": m} for d, t, m in weather.get("alerts", [])],
+    }
+
+
+def load_weather(value: Any) -> Dict[str, Any]:
+    """state.weather_data (compact or full, dict or JSON text) -> full analysis dict."""
+    return expand_weather(load_json_value(value))
+
+
+def read_weather_state(state: Any) -> Dict[str, Any]:
+    try:
+        return load_weather(state.get("weather_data"))
+    except Exception:
+        return {}
@@ -1,23 +1,22 @@
 # utils/weather_helpers.py
 import re
 from typing import Dict, Any, List
+from utils.gazetteer import extract_destination
+from utils.destination_resolver import resolve_destination
+
+# Only used when the gazetteer has no match; compiled once at import
+_CUE_PATTERN = re.compile(r'\b(?:in|at|for|to|visit(?:ing)?)\s+([A-Z][a-zA-Z]+(?:\s+[A-Z][a-zA-Z]+)*)')
 
 def extract_destination_from_text(query: str) -> str:
-    """Pure regex destination extractor (pulled from agent.py)."""
-    query = re.sub(r'\b(the|in|at|for|weather|forecast|what|is|how|will|be)\b',
-                   '', query, flags=re.IGNORECASE)
-    patterns = [
-        r'(?:weather|forecast).*?(?:in|at|for)\s+([A-Z][a-zA-Z\s]+?)(?:\?|$|\.)',
-        r'([A-Z][a-zA-Z]+(?:\s+[A-Z][a-zA-Z]+)*)',
-    ]
-    for pattern in patterns:
-        if (m := re.findall(pattern, query)):
-            dest = m[0].strip()
-            if len(dest) > 2 and dest.lower() not in ["tomorrow", "today", "next", "this"]:
-                return dest
-    for word in query.split():
-        if word and word[0].isupper() and len(word) > 2:
-            return word
+    """Gazetteer lookup (single Aho-Corasick pass), then a cue-word fallback resolved fuzzily."""
+    if not query:
+        return ""
+    if (match := extract_destination(query)):
+        return match["destination"]
+    if (m := _CUE_PATTERN.search(query)):
+        candidate = m.group(1).strip()
+        resolved = resolve_destination(candidate)
+        return resolved["name"] if resolved["matched"] else candidate
     return ""
 
 def analyze_weather_suitability(weather_result: dict, destination: str) -> dict:
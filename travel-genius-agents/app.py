@@ -1,14 +1,28 @@
 import os
+import sys
+import importlib
+from typing import Optional
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from google.adk.cli.fast_api import get_fast_api_app
+from google.adk.runners import Runner
+from google.genai import types
+from pydantic import BaseModel
+from session_store import register_session_store, get_session_service, session_store_stats
+from admission import AdmissionMiddleware, admission_controller
 
 # 1. Create the FastAPI app and load the ADK app
 app = FastAPI(title="Travel Genius Agents API")
 
 
 
-# 2. Configure CORS using FastAPI's standard middleware
+# 2. Admission control for pipeline runs (/run, /run_sse, /run_itinerary_sse): caps in-flight
+# pipelines per worker and answers 429 + Retry-After once the fair wait queue is full.
+# Added before CORS so that CORS wraps it and browsers can read the 429.
+app.add_middleware(AdmissionMiddleware, controller=admission_controller)
+
+# Configure CORS using FastAPI's standard middleware
 # Replace "*" with your specific frontend origin(s) for better security
 app.add_middleware(
     CORSMiddleware,
@@ -21,10 +35,189 @@ app.add_middleware(
 # 3. Get the ADK FastAPI application
 # Set your agents directory path here
 agents_dir = "./agent"  # Or the absolute path to your agents directory
-adk_app = get_fast_api_app(agents_dir=agents_dir, web=True, allow_origins=["*"])
+# Sessions persist to SESSION_DB_URL (SQLite by default) with a bounded in-memory hot set
+session_service_uri = register_session_store()
+adk_app = get_fast_api_app(agents_dir=agents_dir, web=True, allow_origins=["*"],
+                           session_service_uri=session_service_uri)
+
+
+# 4. Streaming itinerary endpoint (same body as /run; header, each day and summary as separate SSE events)
+class RunItineraryRequest(BaseModel):
+    appName: str = "agent"
+    userId: str
+    sessionId: str
+    newMessage: types.Content
+
+
+_stream_runner: Optional[Runner] = None
+
+
+def get_stream_runner() -> Runner:
+    global _stream_runner
+    if _stream_runner is None:
+        # Same import path the ADK loader uses: agents_dir on sys.path, then `import agent`
+        agent_path = os.path.abspath(agents_dir)
+        if agent_path not in sys.path:
+            sys.path.insert(0, agent_path)
+        # The App carries the metrics plugin, so streamed runs are measured like /run ones
+        agent_app = importlib.import_module("agent").app
+        _stream_runner = Runner(app=agent_app, session_service=get_session_service())
+    return _stream_runner
+
+
+@app.post("/run_itinerary_sse")
+async def run_itinerary_sse(req: RunItineraryRequest):
+    from pipeline.streaming import stream_itinerary, format_sse
+
+    runner = get_stream_runner()
+    session = await runner.session_service.get_session(
+        app_name=runner.app_name, user_id=req.userId, session_id=req.sessionId
+    )
+    if session is None:
+        await runner.session_service.create_session(
+            app_name=runner.app_name, user_id=req.userId, session_id=req.sessionId
+        )
+
+    async def event_generator():
+        try:
+            async for kind, payload in stream_itinerary(runner, req.userId, req.sessionId, req.newMessage):
+                yield format_sse(kind, payload)
+        except Exception as e:
+            print(f"[Error] Itinerary stream failed: {e}")
+            yield format_sse("error", {"message": str(e)})
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/itinerary_cache/stats")
+async def itinerary_cache_stats():
+    get_stream_runner()  # makes the agent modules importable
+    from utils.itinerary_cache import itinerary_cache
+    from utils.agent_memo import agent_memo
+    return {**itinerary_cache.stats(), "agents": agent_memo.stats()}
+
+
+@app.get("/token_usage")
+async def token_usage():
+    get_stream_runner()
+    from utils.context_projection import token_usage_stats
+    return token_usage_stats()
+
+
+@app.get("/itinerary_validation/stats")
+async def itinerary_validation_stats():
+    get_stream_runner()
+    from utils.itinerary_validator import validation_summary
+    return validation_summary()
+
+
+@app.get("/rate_governor/stats")
+async def rate_governor_stats():
+    get_stream_runner()
+    from utils.rate_governor import rate_governor
+    return rate_governor.stats()
+
+
+@app.get("/weather/hedging/stats")
+async def weather_hedging_stats():
+    get_stream_runner()
+    from services.weather_service import weather_service
+    return weather_service.forecaster.stats()
+
+
+@app.get("/faults/stats")
+async def fault_injection_stats():
+    get_stream_runner()
+    from utils.fault_injection import fault_injector
+    return fault_injector.stats()
+
+
+@app.get("/admission/stats")
+async def admission_stats():
+    return admission_controller.stats()
+
+
+@app.get("/sessions/stats")
+async def sessions_stats():
+    return session_store_stats()
+
+
+_metric_collectors_registered = False
+
+
+def _register_metric_collectors():
+    """Expose the existing stats() of caches, queues and limiters next to the latency histograms."""
+    global _metric_collectors_registered
+    if _metric_collectors_registered:
+        return
+    get_stream_runner()
+    from utils.metrics import registry, stats_collector
+    from utils.itinerary_cache import itinerary_cache
+    from utils.agent_memo import agent_memo
+    from utils.rate_governor import rate_governor
+    from utils.upstream_tape import upstream_tape
+    from utils.fault_injection import fault_injector
+    from services.weather_service import weather_service
+    from pipeline.router import route_counts
+    from pipeline.deadline import degraded_counts
+    from pipeline.personality import personality_counts
+
+    registry.register_collector("itinerary_cache", stats_collector(
+        "travel_genius_itinerary_cache", "Itinerary cache counters and hit_rate", itinerary_cache.stats))
+    registry.register_collector("agent_memo", lambda: (
+        ("travel_genius_agent_memo", "gauge", "Sub-agent memo hits, misses and hit_rate", {"agent": agent, "field": k}, v)
+        for agent, fields in agent_memo.stats().items() if isinstance(fields, dict)
+        for k, v in fields.items()))
+    registry.register_collector("agent_memo_store", stats_collector(
+        "travel_genius_agent_memo_store", "Sub-agent memo entries, expiries and LRU evictions", agent_memo.stats))
+    registry.register_collector("sessions", stats_collector(
+        "travel_genius_session_store", "Session store counters and hot_hit_rate", session_store_stats))
+    registry.register_collector("admission", stats_collector(
+        "travel_genius_admission", "Admission in-flight runs, queue depth and rejections", admission_controller.stats))
+    registry.register_collector("admission_wait", lambda: (
+        ("travel_genius_admission_queue_wait_ms", "gauge", "Queue wait before a pipeline run starts (recent runs)",
+         {"stat": k}, v) for k, v in admission_controller.stats()["wait_ms"].items()))
+    registry.register_collector("weather_hedging", stats_collector(
+        "travel_genius_weather_hedging", "Forecast requests, hedges, failovers and wins per provider",
+        weather_service.forecaster.stats))
+    registry.register_collector("rate_governor", lambda: (
+        ("travel_genius_rate_governor", "gauge", "Upstream quota calls, queued calls and wait", {"upstream": name, "field": k}, v)
+        for name, fields in rate_governor.stats()["upstreams"].items() for k, v in fields.items()))
+    registry.register_collector("upstream_tape", lambda: (
+        ("travel_genius_upstream_tape_total", "counter", "Upstream calls recorded to / replayed from the tape",
+         {"action": k.split(".", 1)[0], "upstream": k.split(".", 1)[1]}, v)
+        for k, v in upstream_tape.stats_counter.items()))
+    registry.register_collector("fault_injection", lambda: (
+        ("travel_genius_faults_injected_total", "counter", "Calls seen and faults injected by the active scenario",
+         {"dependency": dependency, "fault": fault}, v)
+        for dependency, fields in fault_injector.stats()["dependencies"].items() for fault, v in fields.items()))
+    registry.register_collector("pipeline", lambda: [
+        *(("travel_genius_routes_total", "counter", "Requests per router decision", {"route": k}, v)
+          for k, v in route_counts.items()),
+        *(("travel_genius_degraded_total", "counter", "Deterministic fallbacks per reason", {"reason": k}, v)
+          for k, v in degraded_counts.items()),
+        *(("travel_genius_personality_total", "counter", "Personality verdicts by source (classifier or LLM)",
+           {"source": k}, v) for k, v in personality_counts.items()),
+    ])
+    _metric_collectors_registered = True
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus text format; per worker process when running under serve.py."""
+    _register_metric_collectors()
+    from utils.metrics import registry
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
 
-app.mount("/", adk_app)
 
 @app.get("/health")
 async def health():
-    return {"status": "healthy"}
\ No newline at end of file
+    return {"status": "healthy"}
+
+
+# Mounted last: the ADK app catches every path not registered above
+app.mount("/", adk_app)
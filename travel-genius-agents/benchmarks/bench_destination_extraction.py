@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Accuracy + latency benchmark for destination extraction.
+Compares the gazetteer extractor against the old per-call regex scan
+on the labelled queries in benchmarks/data/destination_queries.json, and checks the
+fuzzy resolver on its resolve_cases (typos must match, partial names must not).
+
+Usage: python benchmarks/bench_destination_extraction.py [--iterations 2000]
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+AGENT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "agent")
+sys.path.insert(0, AGENT_DIR)
+
+from utils.destination_resolver import resolve_destination  # noqa: E402
+from utils.weather_helper import extract_destination_from_text  # noqa: E402
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "destination_queries.json")
+
+
+def legacy_extract_destination_from_text(query: str) -> str:
+    """The regex implementation this benchmark replaced, kept verbatim for comparison."""
+    query = re.sub(r'\b(the|in|at|for|weather|forecast|what|is|how|will|be)\b',
+                   '', query, flags=re.IGNORECASE)
+    patterns = [
+        r'(?:weather|forecast).*?(?:in|at|for)\s+([A-Z][a-zA-Z\s]+?)(?:\?|$|\.)',
+        r'([A-Z][a-zA-Z]+(?:\s+[A-Z][a-zA-Z]+)*)',
+    ]
+    for pattern in patterns:
+        if (m := re.findall(pattern, query)):
+            dest = m[0].strip()
+            if len(dest) > 2 and dest.lower() not in ["tomorrow", "today", "next", "this"]:
+                return dest
+    for word in query.split():
+        if word and word[0].isupper() and len(word) > 2:
+            return word
+    return ""
+
+
+def evaluate(name, extractor, cases, iterations):
+    correct, misses = 0, []
+    for case in cases:
+        got = extractor(case["query"])
+        if got == case["expected"]:
+            correct += 1
+        else:
+            misses.append((case["query"], case["expected"], got))
+
+    queries = [case["query"] for case in cases]
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for q in queries:
+            extractor(q)
+    elapsed = time.perf_counter() - start
+    per_query_us = elapsed / (iterations * len(queries)) * 1e6
+
+    return {
+        "name": name,
+        "accuracy": round(correct / len(cases), 4),
+        "correct": correct,
+        "total": len(cases),
+        "per_query_us": round(per_query_us, 2),
+        "misses": misses,
+    }
+
+
+def resolve_canonical_id(name: str):
+    match = resolve_destination(name)
+    return match["canonical_id"] if match["matched"] else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--show-misses", action="store_true")
+    parser.add_argument("--json", action="store_true", help="print machine-readable results only")
+    args = parser.parse_args()
+
+    with open(DATA_PATH, encoding="utf-8") as fh:
+        data = json.load(fh)
+
+    results = [
+        evaluate("legacy_regex", legacy_extract_destination_from_text, data["cases"], args.iterations),
+        evaluate("gazetteer", extract_destination_from_text, data["cases"], args.iterations),
+        evaluate("resolver", resolve_canonical_id, data["resolve_cases"], args.iterations),
+    ]
+
+    if args.json:
+        print(json.dumps([{k: v for k, v in r.items() if k != "misses"} for r in results], indent=2))
+        return
+
+    print("=" * 60)
+    print("Destination Extraction Benchmark")
+    print("=" * 60)
+    for r in results:
+        print(f"{r['name']:<14} accuracy {r['accuracy']:.1%} ({r['correct']}/{r['total']})"
+              f"  {r['per_query_us']:>8.2f} µs/query")
+        if args.show_misses:
+            for query, expected, got in r["misses"]:
+                print(f"    ✗ {query!r}: expected {expected!r}, got {got!r}")
+
+
+if __name__ == "__main__":
+    main()
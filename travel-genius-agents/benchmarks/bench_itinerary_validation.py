@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Validation cost + retry-rate benchmark for itinerary_generator output.
+
+Builds a seeded corpus of TravelItinerary JSON payloads, a share of which carry the
+small violations seen in practice (scores out of range, 1 or 5 activities in a day,
+off-list activity types, ratings on a 0-10 scale, percentage sustainability scores),
+and compares:
+  generic_dict     - json.loads + TravelItinerary.model_validate
+  model_json       - TravelItinerary.model_validate_json (ADK's output_schema path)
+  adapter_per_call - TypeAdapter(TravelItinerary) built for every payload
+  adapter_json     - ITINERARY_ADAPTER.validate_json on raw bytes (precompiled)
+plus the retry rate (payloads that fail and would force a regeneration) with and
+without the repair step in utils/itinerary_validator.py.
+
+Usage: python benchmarks/bench_itinerary_validation.py [--payloads 500] [--violation-rate 0.3]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import time
+
+AGENT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "agent")
+sys.path.insert(0, AGENT_DIR)
+
+from pydantic import TypeAdapter, ValidationError  # noqa: E402
+from models import TravelItinerary  # noqa: E402
+from utils.itinerary_validator import ITINERARY_ADAPTER, validate_itinerary_json  # noqa: E402
+
+TYPES = ["adventure", "food", "cultural", "instagram", "relaxation", "shopping", "nightlife"]
+
+
+def make_itinerary(rng: random.Random, days: int) -> dict:
+    plans = []
+    for d in range(1, days + 1):
+        plans.append({
+            "day": d,
+            "activities": [{
+                "id": f"d{d}a{i}",
+                "title": f"Activity {d}.{i} at a well known place",
+                "description": "A fairly long description of what the traveller will do, see and eat here. " * 2,
+                "cost": rng.randint(200, 5000),
+                "duration": "2-3 hours",
+                "type": rng.choice(TYPES),
+                "timing": "9:00 AM - 12:00 PM",
+                "rating": round(rng.uniform(3.5, 5.0), 1),
+            } for i in range(rng.randint(2, 4))],
+            "weatherSummary": {"condition": "Partly Cloudy", "outdoorScore": rng.randint(1, 10),
+                               "indoorScore": rng.randint(1, 10),
+                               "recommendations": ["Carry water", "Start early"]},
+        })
+    return {
+        "tripTitle": "A Weather-Optimized Escape", "totalEstimatedCost": rng.randint(20_000, 200_000),
+        "dailyPlans": plans, "weatherOptimized": True, "sustainabilityScore": round(rng.uniform(5, 9), 1),
+        "weatherSummary": {"overallScore": round(rng.uniform(4, 9), 1), "suitableForOutdoor": True,
+                           "alerts": [], "recommendations": ["Pack light layers"]},
+        "aiRecommendations": ["Book early"], "instagramSpots": ["Old town"],
+        "generatedBy": "AI Travel Genius", "generatedAt": "2025-01-01T00:00:00Z",
+    }
+
+
+def inject_violation(rng: random.Random, it: dict) -> None:
+    plan = rng.choice(it["dailyPlans"])
+    kind = rng.choice(["score", "one_activity", "five_activities", "type", "rating", "percent"])
+    if kind == "score":
+        plan["weatherSummary"]["outdoorScore"] = rng.choice([0, 11, 12])
+    elif kind == "one_activity":
+        plan["activities"] = plan["activities"][:1]
+    elif kind == "five_activities":
+        plan["activities"] = (plan["activities"] * 3)[:5]
+    elif kind == "type":
+        plan["activities"][0]["type"] = rng.choice(["sightseeing", "beach", "museum"])
+    elif kind == "rating":
+        plan["activities"][0]["rating"] = rng.choice([7.5, 9.0, 5.5])
+    else:
+        it["sustainabilityScore"] = rng.choice([72, 85, 90])
+
+
+def build_corpus(n: int, violation_rate: float, seed: int):
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(n):
+        it = make_itinerary(rng, rng.randint(2, 7))
+        if rng.random() < violation_rate:
+            for _ in range(rng.randint(1, 2)):
+                inject_violation(rng, it)
+        corpus.append(json.dumps(it).encode())
+    return corpus
+
+
+def time_strategy(fn, corpus, repeat: int):
+    best = float("inf")
+    failures = 0
+    for r in range(repeat):
+        failures = 0
+        start = time.perf_counter()
+        for raw in corpus:
+            try:
+                fn(raw)
+            except ValidationError:
+                failures += 1
+        best = min(best, time.perf_counter() - start)
+    return best / len(corpus) * 1e6, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--payloads", type=int, default=500)
+    parser.add_argument("--violation-rate", type=float, default=0.3)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", action="store_true", help="print machine-readable results only")
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.payloads, args.violation_rate, args.seed)
+    strategies = {
+        "generic_dict": lambda raw: TravelItinerary.model_validate(json.loads(raw)),
+        "model_json": TravelItinerary.model_validate_json,
+        "adapter_per_call": lambda raw: TypeAdapter(TravelItinerary).validate_json(raw),
+        "adapter_json": ITINERARY_ADAPTER.validate_json,
+    }
+    results = {"payloads": len(corpus), "violation_rate": args.violation_rate, "strategies": {}}
+    for name, fn in strategies.items():
+        us, failures = time_strategy(fn, corpus, args.repeat if name != "adapter_per_call" else 1)
+        results["strategies"][name] = {"us_per_payload": round(us, 1), "retry_rate": round(failures / len(corpus), 4)}
+
+    outcomes = {"valid": 0, "repaired": 0, "invalid": 0}
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for raw in corpus:
+            outcomes[validate_itinerary_json(raw, {"destination": "Goa", "days": 3, "budget": 60_000})[1]] += 1
+    elapsed = time.perf_counter() - start
+    repaired_cost = elapsed / len(corpus) * 1e6
+    results["with_repair"] = {
+        "us_per_payload": round(repaired_cost, 1),
+        **outcomes,
+        "retry_rate": round(outcomes["invalid"] / len(corpus), 4),
+    }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print("=" * 64)
+    print(f"Itinerary Validation Benchmark ({len(corpus)} payloads, "
+          f"{args.violation_rate:.0%} with violations)")
+    print("=" * 64)
+    for name, r in results["strategies"].items():
+        print(f"{name:<18} {r['us_per_payload']:>9.1f} µs/payload   retry rate {r['retry_rate']:.1%}")
+    r = results["with_repair"]
+    print(f"{'adapter+repair':<18} {r['us_per_payload']:>9.1f} µs/payload   retry rate {r['retry_rate']:.1%}"
+          f"  ({r['valid']} valid, {r['repaired']} repaired, {r['invalid']} invalid)")
+
+
+if __name__ == "__main__":
+    main()
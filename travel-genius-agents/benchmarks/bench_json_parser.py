@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Parse cost + correctness benchmark for JSON-ish model and tool payloads.
+
+Builds seeded itinerary/weather payloads in the shapes that reach the parsers and compares
+  legacy    - the old _fix_python_json regex substitutions + json.loads
+  tolerant  - utils/json_parser.parse_tolerant (json.loads, string-aware literal pass, tokenizer)
+on four corpora:
+  json            - valid JSON
+  json_literals   - JSON text with Python True/False/None (what str() of a model dict leaks)
+  python_repr     - repr() of the dict (single quotes as well)
+  literal_strings - Python literals plus descriptions containing "True", "None", "False"
+A payload counts as correct only when the parsed value equals the source dict.
+
+The streaming section feeds the JSON text in fixed-size chunks and compares re-parsing the
+accumulated buffer after every chunk (try json.loads until it succeeds) with one
+IncrementalJSONParser that emits each day as it closes.
+
+Usage: python benchmarks/bench_json_parser.py [--payloads 200] [--days 7] [--chunk 64] [--json]
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+
+AGENT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "agent")
+sys.path.insert(0, AGENT_DIR)
+
+from utils.json_parser import IncrementalJSONParser, parse_tolerant  # noqa: E402
+
+TYPES = ["adventure", "food", "cultural", "instagram", "relaxation", "shopping", "nightlife"]
+TRAPS = ["True North viewpoint", "None of the cafes open before 9", "False Creek ferry ride",
+         "Nonetheless worth the queue", "Truely local thali"]
+
+
+def legacy_parse(text: str):
+    """The pipeline tools/itinerary_tools.py used before: blind word substitution, then json.loads."""
+    text = re.sub(r'\bTrue\b', 'true', text)
+    text = re.sub(r'\bFalse\b', 'false', text)
+    text = re.sub(r'\bNone\b', 'null', text)
+    return json.loads(text)
+
+
+def make_payload(rng: random.Random, days: int, traps: bool) -> dict:
+    plans = []
+    for d in range(1, days + 1):
+        plans.append({
+            "day": d,
+            "activities": [{
+                "id": f"d{d}a{i}",
+                "title": rng.choice(TRAPS) if traps and rng.random() < 0.3 else f"Activity {d}.{i}",
+                "description": "Walk, eat and look around the old quarter. " * 3,
+                "cost": rng.randint(200, 5000),
+                "type": rng.choice(TYPES),
+                "rating": round(rng.uniform(3.5, 5.0), 1),
+                "indoor": rng.random() < 0.4,
+                "booking": None,
+            } for i in range(rng.randint(2, 4))],
+            "weatherSummary": {"condition": "Partly Cloudy", "outdoorScore": rng.randint(1, 10),
+                               "suitable": rng.random() < 0.7, "alerts": None},
+        })
+    return {"tripTitle": "Weather-Optimized Escape", "weatherOptimized": True,
+            "totalEstimatedCost": rng.randint(20_000, 200_000), "dailyPlans": plans}
+
+
+def python_literal_json(data: dict) -> str:
+    # json.dumps output with Python's spelling of the literals outside strings
+    text = json.dumps(data)
+    return re.sub(r'(?<=[:\[,\s])(true|false|null)(?=[,\]}])',
+                  lambda m: {"true": "True", "false": "False", "null": "None"}[m.group()], text)
+
+
+def build_corpora(n: int, days: int, seed: int):
+    rng = random.Random(seed)
+    corpora = {"json": [], "json_literals": [], "python_repr": [], "literal_strings": []}
+    for _ in range(n):
+        plain = make_payload(rng, days, traps=False)
+        trapped = make_payload(rng, days, traps=True)
+        corpora["json"].append((json.dumps(plain), plain))
+        corpora["json_literals"].append((python_literal_json(plain), plain))
+        corpora["python_repr"].append((repr(plain), plain))
+        corpora["literal_strings"].append((python_literal_json(trapped), trapped))
+    return corpora
+
+
+def run(fn, corpus, repeat: int):
+    best, correct = float("inf"), 0
+    for _ in range(repeat):
+        correct = 0
+        start = time.perf_counter()
+        for text, expected in corpus:
+            try:
+                correct += fn(text) == expected
+            except ValueError:
+                pass
+        best = min(best, time.perf_counter() - start)
+    return best / len(corpus) * 1e6, correct / len(corpus)
+
+
+def stream_reparse(text: str, chunk: int) -> int:
+    buf, parses = "", 0
+    for i in range(0, len(text), chunk):
+        buf += text[i:i + chunk]
+        parses += 1
+        try:
+            json.loads(buf)
+            break
+        except ValueError:
+            continue
+    return parses
+
+
+def stream_incremental(text: str, chunk: int) -> int:
+    parser, days = IncrementalJSONParser(emit_depth=2), 0
+    for i in range(0, len(text), chunk):
+        days += sum(1 for path, _ in parser.feed(text[i:i + chunk]) if path[:1] == ("dailyPlans",) and len(path) == 2)
+    return days
+
+
+def time_stream(fn, corpus, chunk: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text, _ in corpus:
+            fn(text, chunk)
+        best = min(best, time.perf_counter() - start)
+    return best / len(corpus) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--payloads", type=int, default=200)
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--chunk", type=int, default=64, help="streaming chunk size in characters")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", action="store_true", help="print machine-readable results only")
+    args = parser.parse_args()
+
+    corpora = build_corpora(args.payloads, args.days, args.seed)
+    avg_chars = sum(len(t) for t, _ in corpora["json"]) // len(corpora["json"])
+    results = {"payloads": args.payloads, "avg_chars": avg_chars, "corpora": {}}
+    for name, corpus in corpora.items():
+        row = {}
+        for strategy, fn in (("legacy", legacy_parse), ("tolerant", parse_tolerant)):
+            us, accuracy = run(fn, corpus, args.repeat)
+            row[strategy] = {"us_per_payload": round(us, 1), "correct": round(accuracy, 4)}
+        results["corpora"][name] = row
+
+    stream = corpora["json"]
+    results["streaming"] = {
+        "chunk": args.chunk,
+        "reparse_us": round(time_stream(stream_reparse, stream, args.chunk, args.repeat), 1),
+        "incremental_us": round(time_stream(stream_incremental, stream, args.chunk, args.repeat), 1),
+    }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print("=" * 72)
+    print(f"JSON Parser Benchmark ({args.payloads} payloads, {args.days} days, ~{avg_chars:,} chars each)")
+    print("=" * 72)
+    print(f"{'corpus':<16} {'legacy µs':>10} {'correct':>8}   {'tolerant µs':>11} {'correct':>8}")
+    for name, row in results["corpora"].items():
+        lg, tl = row["legacy"], row["tolerant"]
+        print(f"{name:<16} {lg['us_per_payload']:>10.1f} {lg['correct']:>8.1%}   "
+              f"{tl['us_per_payload']:>11.1f} {tl['correct']:>8.1%}")
+    s = results["streaming"]
+    print(f"\nstreaming ({s['chunk']}-char chunks): re-parse buffer {s['reparse_us']:,.1f} µs/payload, "
+          f"incremental {s['incremental_us']:,.1f} µs/payload")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Accuracy + latency benchmark for the local personality classifier.
+Scores the held-out queries in benchmarks/data/personality_queries.json (cases with
+"expected": null carry no clear signal, or a mixed one, and should go to the LLM) the way the
+pipeline does (a type the request chooses, "for 2 heritage ...", wins; the model classifies the
+rest, including negated and in-word mentions such as "No luxury please"), times the model
+one at a time and through the batch API, and reports how many requests would still need Gemini.
+
+Usage: python benchmarks/bench_personality.py [--iterations 2000] [--min-confidence 0.6]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+AGENT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "agent")
+sys.path.insert(0, AGENT_DIR)
+
+from utils.personality_classifier import PersonalityClassifier  # noqa: E402
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "personality_queries.json")
+
+
+def evaluate(classifier, cases):
+    results = classifier.classify_requests([case["query"] for case in cases])
+    labelled = [(c, r) for c, r in zip(cases, results) if c["expected"]]
+    neutral = [(c, r) for c, r in zip(cases, results) if not c["expected"]]
+    accepted = [(c, r) for c, r in labelled if r["confident"]]
+    correct = sum(r["personality"] == c["expected"] for c, r in labelled)
+    accepted_correct = sum(r["personality"] == c["expected"] for c, r in accepted)
+    misses = [(c["query"], c["expected"], r["personality"], r["confidence"])
+              for c, r in labelled + neutral
+              if (r["personality"] != c["expected"] if c["expected"] else r["confident"])]
+    return {
+        "accuracy": round(correct / len(labelled), 4) if labelled else None,
+        "accepted_accuracy": round(accepted_correct / len(accepted), 4) if accepted else None,
+        "coverage": round(len(accepted) / len(labelled), 4) if labelled else None,
+        "neutral_fallback_rate": round(sum(not r["confident"] for _, r in neutral) / len(neutral), 4) if neutral else None,
+        "llm_calls_per_100": round(100 * sum(not r["confident"] for r in results) / len(results), 1),
+        "named": sum(r["source"] == "request" for r in results),
+        "labelled": len(labelled),
+        "neutral": len(neutral),
+        "misses": misses,
+    }
+
+
+def time_it(fn, iterations, n_queries):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return round((time.perf_counter() - start) / (iterations * n_queries) * 1e6, 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--min-confidence", type=float, default=None,
+                        help="confidence threshold (default: PERSONALITY_MIN_CONFIDENCE or 0.6)")
+    parser.add_argument("--show-misses", action="store_true")
+    parser.add_argument("--json", action="store_true", help="print machine-readable results only")
+    args = parser.parse_args()
+
+    with open(DATA_PATH, encoding="utf-8") as fh:
+        cases = json.load(fh)["cases"]
+
+    classifier = PersonalityClassifier()
+    if args.min_confidence is not None:
+        classifier.min_confidence = args.min_confidence
+    start = time.perf_counter()
+    classifier.classify("")  # trains on first use
+    train_ms = round((time.perf_counter() - start) * 1000, 1)
+
+    queries = [case["query"] for case in cases]
+    result = evaluate(classifier, cases)
+    result.update({
+        "min_confidence": classifier.min_confidence,
+        "train_ms": train_ms,
+        "training_accuracy": round(classifier.training_accuracy, 4),
+        "single_us_per_query": time_it(lambda: [classifier.classify(q) for q in queries], args.iterations, len(queries)),
+        "batch_us_per_query": time_it(lambda: classifier.classify_batch(queries), args.iterations, len(queries)),
+    })
+
+    if args.json:
+        print(json.dumps({k: v for k, v in result.items() if k != "misses"}, indent=2))
+        return
+
+    print("=" * 60)
+    print("Personality Classifier Benchmark")
+    print("=" * 60)
+    print(f"trained in {result['train_ms']} ms (training accuracy {result['training_accuracy']:.1%}), "
+          f"threshold {result['min_confidence']}")
+    print(f"accuracy          {result['accuracy']:.1%} of {result['labelled']} labelled queries")
+    print(f"named type        {result['named']} queries taken as written, the model scores the rest")
+    print(f"confident         {result['coverage']:.1%} of labelled queries, "
+          f"{result['accepted_accuracy']:.1%} of those correct")
+    print(f"unclear -> LLM    {result['neutral_fallback_rate']:.1%} of {result['neutral']} queries without a clear signal")
+    print(f"LLM calls         {result['llm_calls_per_100']} per 100 requests (was 100)")
+    print(f"latency           {result['single_us_per_query']:.2f} µs/query single, "
+          f"{result['batch_us_per_query']:.2f} µs/query batch")
+    if args.show_misses:
+        for query, expected, got, confidence in result["misses"]:
+            print(f"    ✗ {query!r}: expected {expected!r}, got {got!r} ({confidence:.2f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Offline end-to-end throughput benchmark for the itinerary pipeline.
+
+Runs the real ASGI app from app.py (ADK /run, admission control, session store, router,
+cache, deadline guard, all seven sub-agents) in a uvicorn subprocess, with:
+  Gemini                    -> benchmarks/standins.py StandInLlm (fixed latency + decode rate)
+  OpenWeatherMap/Open-Meteo -> local mock server (configurable latency)
+  Places                    -> same mock server (only reached if ingestion runs)
+then drives N sessions at a fixed concurrency, one generate request each, and reports:
+  rps                  completed requests per second
+  latency_ms           end-to-end p50/p95/p99 of POST /run
+  stages_ms            p50/p95/p99 wall time per agent (before_agent -> after_agent, server side)
+  cpu_ms_per_request   server process CPU (user+sys) over the measured phase / requests
+  peak_rss_mb          server process high-water mark (VmHWM)
+Results are printed as a table or as JSON (--json, --output FILE) tagged with the git
+commit, so runs can be compared across commits. Linux only (reads /proc); no API keys
+or network access needed.
+
+--replay-tape DIR serves weather and Places calls from an upstream tape recorded against
+the real APIs (UPSTREAM_TAPE_MODE=record, see utils/upstream_tape.py) instead of the mock
+payloads, at the recorded latency x --tape-latency-scale. --fault-scenario FILE runs the
+server under a fault scenario (utils/fault_injection.py, benchmarks/fault_scenarios/) to
+see how latency and the error budget respond to a degraded dependency.
+
+Usage: python benchmarks/bench_pipeline.py [--sessions 40] [--concurrency 8]
+           [--llm-latency-ms 400] [--llm-tokens-per-s 150] [--output-tokens 150]
+           [--upstream-latency-ms 50] [--replay-tape DIR] [--tape-latency-scale 1.0]
+           [--fault-scenario FILE] [--warm] [--rate-governor] [--json] [--output FILE]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(BENCH_DIR)
+AGENT_DIR = os.path.join(BASE_DIR, "agent")
+
+DESTINATIONS = ["Goa", "Bangkok, Thailand", "Tokyo, Japan", "Paris, France", "Mumbai", "Bali, Indonesia",
+                "Jaipur", "Lisbon, Portugal", "Kyoto, Japan", "Cape Town, South Africa"]
+PERSONALITIES = ["adventure", "heritage", "cultural", "luxury", "party"]
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def request_text(i: int) -> str:
+    destination = DESTINATIONS[i % len(DESTINATIONS)]
+    days = 1 + i % 5
+    return (f"Create a complete {days}-day travel itinerary for {destination} with budget "
+            f"₹{40000 + 5000 * (i % 7)} for {1 + i % 3} {PERSONALITIES[i % len(PERSONALITIES)]} "
+            f"no specific preferences.")
+
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "mean": 0.0}
+    ordered = sorted(values)
+
+    def pct(p: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))], 1)
+
+    return {"p50": pct(0.50), "p95": pct(0.95), "p99": pct(0.99), "mean": round(sum(ordered) / len(ordered), 1)}
+
+
+# ---------- SERVER PROCESS ----------
+def proc_cpu_seconds(pid: int) -> float:
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")  # utime + stime
+
+
+def proc_peak_rss_mb(pid: int) -> float:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return round(int(line.split()[1]) / 1024, 1)
+    return 0.0
+
+
+def serve(args) -> None:
+    """--serve: the app as uvicorn would run it, with Gemini replaced in place."""
+    import uvicorn
+
+    sys.path.insert(0, BASE_DIR)
+    from serve import preload  # imports app.py, the agent graph and the indexes
+    app = preload()
+    sys.path.insert(0, BENCH_DIR)
+    from standins import StageRecorder, install_stand_in_llm
+    agent_module = sys.modules["agent"]
+    install_stand_in_llm(agent_module.root_agent, latency_s=args.llm_latency_ms / 1000,
+                         tokens_per_s=args.llm_tokens_per_s, output_tokens=args.output_tokens)
+    # The /run runner is built on the first request, from the App's plugin list
+    recorder = StageRecorder()
+    agent_module.app.plugins.append(recorder)
+    app.add_api_route("/bench/stages", recorder.drain, methods=["GET"])
+    app.router.routes.insert(0, app.router.routes.pop())  # ahead of the ADK catch-all mount
+    print(f"[Bench] Server {os.getpid()} ready", flush=True)
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+# ---------- LOAD ----------
+async def run_session(http, base: str, i: int, cold: bool, results: List[Dict[str, Any]]) -> None:
+    user, session = f"bench_u{i}", f"bench_s{i}"
+    state = {"skip_itinerary_cache": True} if cold else {}
+    async with http.post(f"{base}/apps/agent/users/{user}/sessions/{session}", json=state) as r:
+        await r.read()
+    body = {"appName": "agent", "userId": user, "sessionId": session,
+            "newMessage": {"role": "user", "parts": [{"text": request_text(i)}]}}
+    started = time.perf_counter()
+    async with http.post(f"{base}/run", json=body) as r:
+        await r.read()
+        status = r.status
+    results.append({"status": status, "latency_ms": (time.perf_counter() - started) * 1000})
+
+
+async def drive(base: str, sessions: int, concurrency: int, cold: bool, offset: int = 0) -> List[Dict[str, Any]]:
+    import aiohttp
+
+    results: List[Dict[str, Any]] = []
+    queue = asyncio.Queue()
+    for i in range(sessions):
+        queue.put_nowait(offset + i)
+
+    async def worker(http):
+        while not queue.empty():
+            await run_session(http, base, queue.get_nowait(), cold, results)
+
+    timeout = aiohttp.ClientTimeout(total=300)
+    async with aiohttp.ClientSession(timeout=timeout) as http:
+        await asyncio.gather(*(worker(http) for _ in range(concurrency)))
+    return results
+
+
+async def wait_healthy(base: str, proc: subprocess.Popen, timeout: float) -> None:
+    import aiohttp
+
+    deadline = time.perf_counter() + timeout
+    async with aiohttp.ClientSession() as http:
+        while time.perf_counter() < deadline:
+            if proc.poll() is not None:
+                raise RuntimeError("benchmark server exited during startup")
+            try:
+                async with http.get(f"{base}/health") as r:
+                    if r.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"benchmark server not healthy after {timeout}s")
+
+
+async def fetch(base: str, path: str) -> str:
+    import aiohttp
+
+    async with aiohttp.ClientSession() as http:
+        async with http.get(f"{base}{path}") as r:
+            return await r.text()
+
+
+def model_calls(base: str) -> int:
+    text = asyncio.run(fetch(base, "/metrics"))
+    return int(sum(float(line.rsplit(" ", 1)[1]) for line in text.splitlines()
+                   if line.startswith("travel_genius_model_call_duration_seconds_count")))
+
+
+def stage_samples(base: str) -> Dict[str, List[float]]:
+    return json.loads(asyncio.run(fetch(base, "/bench/stages")))
+
+
+def git_revision() -> Dict[str, Any]:
+    def git(*cmd):
+        return subprocess.run(["git", *cmd], cwd=BASE_DIR, capture_output=True, text=True).stdout.strip()
+    return {"commit": git("rev-parse", "--short", "HEAD"), "dirty": bool(git("status", "--porcelain", "--", "."))}
+
+
+def benchmark(args) -> Dict[str, Any]:
+    sys.path.insert(0, BENCH_DIR)
+    sys.path.insert(0, AGENT_DIR)
+    from standins import MockUpstreams
+
+    workdir = tempfile.mkdtemp(prefix="bench_pipeline_")
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    with MockUpstreams(latency_s=args.upstream_latency_ms / 1000) as upstreams:
+        env = dict(os.environ, **upstreams.env(),
+                   PYTHONUNBUFFERED="1",
+                   DD_API_KEY=os.getenv("DD_API_KEY", "benchmark"),
+                   DD_TRACE_ENABLED="false",
+                   ITINERARY_CACHE_ENABLED="true" if args.warm else "false",
+                   RATE_GOVERNOR_ENABLED="true" if args.rate_governor else "false",
+                   RATE_GOVERNOR_DB=os.path.join(workdir, "rate.db"),
+                   SESSION_DB_URL=f"sqlite+aiosqlite:///{os.path.join(workdir, 'sessions.db')}")
+        if args.fault_scenario:
+            env["FAULT_SCENARIO"] = os.path.abspath(args.fault_scenario)
+        if args.replay_tape:
+            env.update(UPSTREAM_TAPE_MODE="replay", UPSTREAM_TAPE_DIR=os.path.abspath(args.replay_tape),
+                       UPSTREAM_TAPE_LATENCY_SCALE=str(args.tape_latency_scale))
+        log_path = os.path.join(workdir, "server.log")
+        with open(log_path, "w") as log:
+            proc = subprocess.Popen(
+                [sys.executable, os.path.abspath(__file__), "--serve", "--port", str(port),
+                 "--llm-latency-ms", str(args.llm_latency_ms), "--llm-tokens-per-s", str(args.llm_tokens_per_s),
+                 "--output-tokens", str(args.output_tokens)],
+                cwd=BASE_DIR, env=env, stdout=log, stderr=subprocess.STDOUT,
+            )
+        try:
+            asyncio.run(wait_healthy(base, proc, args.startup_timeout))
+            asyncio.run(drive(base, args.warmup, 1, not args.warm, offset=10_000))
+            calls_before = model_calls(base)
+            stage_samples(base)  # drop the warm-up runs
+            cpu_before = proc_cpu_seconds(proc.pid)
+            started = time.perf_counter()
+            results = asyncio.run(drive(base, args.sessions, args.concurrency, not args.warm))
+            wall = time.perf_counter() - started
+            cpu = proc_cpu_seconds(proc.pid) - cpu_before
+            calls = model_calls(base) - calls_before
+            stages = stage_samples(base)
+            peak_rss = proc_peak_rss_mb(proc.pid)
+            faults = json.loads(asyncio.run(fetch(base, "/faults/stats")))["dependencies"]
+        except Exception:
+            with open(log_path) as f:
+                print(f.read()[-4000:], file=sys.stderr)
+            raise
+        finally:
+            proc.terminate()
+            try:
+                proc.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+        shutil.rmtree(workdir, ignore_errors=True)  # kept (with server.log) when the run fails
+        upstream_requests = dict(upstreams.requests)
+
+    ok = [r for r in results if r["status"] == 200]
+    return {
+        "benchmark": "pipeline",
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        **git_revision(),
+        "config": {k: getattr(args, k) for k in ("sessions", "concurrency", "llm_latency_ms", "llm_tokens_per_s",
+                                                 "output_tokens", "upstream_latency_ms", "replay_tape",
+                                                 "tape_latency_scale", "fault_scenario", "warm",
+                                                 "rate_governor")},
+        "requests": len(results),
+        "ok": len(ok),
+        "rejected_429": sum(1 for r in results if r["status"] == 429),
+        "errors": sum(1 for r in results if r["status"] not in (200, 429)),
+        "wall_s": round(wall, 2),
+        "rps": round(len(ok) / wall, 3) if wall else 0.0,
+        "latency_ms": percentiles([r["latency_ms"] for r in ok]),
+        "stages_ms": {agent: percentiles(values) for agent, values in stages.items()},
+        "cpu_ms_per_request": round(cpu * 1000 / max(1, len(ok)), 1),
+        "peak_rss_mb": peak_rss,
+        "model_calls_per_request": round(calls / max(1, len(ok)), 2),
+        "upstream_requests": upstream_requests,
+        "faults_injected": faults,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=2, help="sequential requests before measuring")
+    parser.add_argument("--llm-latency-ms", type=float, default=400)
+    parser.add_argument("--llm-tokens-per-s", type=float, default=150)
+    parser.add_argument("--output-tokens", type=int, default=150)
+    parser.add_argument("--upstream-latency-ms", type=float, default=50)
+    parser.add_argument("--replay-tape", metavar="DIR", help="serve upstream calls from a recorded tape")
+    parser.add_argument("--tape-latency-scale", type=float, default=1.0, help="x recorded latency (0 = instant)")
+    parser.add_argument("--fault-scenario", metavar="FILE", help="inject faults from this scenario file")
+    parser.add_argument("--warm", action="store_true", help="leave the itinerary cache and agent memo on")
+    parser.add_argument("--rate-governor", action="store_true", help="keep the outbound quota governor on")
+    parser.add_argument("--startup-timeout", type=float, default=180)
+    parser.add_argument("--json", action="store_true", help="print machine-readable results only")
+    parser.add_argument("--output", help="also write the JSON results to this file")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args)
+        return
+
+    result = benchmark(args)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+
+    cfg = result["config"]
+    print("=" * 78)
+    print(f"Pipeline Benchmark ({cfg['sessions']} sessions, concurrency {cfg['concurrency']}, "
+          f"LLM {cfg['llm_latency_ms']:.0f}ms + {cfg['output_tokens']} tok @ {cfg['llm_tokens_per_s']:.0f} tok/s, "
+          f"{'warm' if cfg['warm'] else 'cold'})")
+    print("=" * 78)
+    print(f"commit {result['commit']}{' (dirty)' if result['dirty'] else ''}   ok {result['ok']}/{result['requests']}   "
+          f"429 {result['rejected_429']}   errors {result['errors']}")
+    print(f"throughput {result['rps']:.2f} req/s   cpu {result['cpu_ms_per_request']:.0f} ms/req   "
+          f"peak RSS {result['peak_rss_mb']:.0f} MB   model calls {result['model_calls_per_request']}/req")
+    print()
+    print(f"{'stage':<26} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, p in [("end-to-end", result["latency_ms"]), *result["stages_ms"].items()]:
+        print(f"{name:<26} {p['p50']:>9.0f} {p['p95']:>9.0f} {p['p99']:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Startup time + per-worker memory benchmark for serve.py.
+
+Starts serve.py once in each mode with N workers:
+  spawn    - every worker re-imports app.py and the agent graph (uvicorn --workers N)
+  prefork  - the parent imports once and forks (copy-on-write)
+then waits for every worker's ready line and a 200 from /health, and reads
+/proc/<pid>/smaps_rollup for each worker:
+  rss  - resident pages, shared ones counted in full (what `ps` shows)
+  pss  - shared pages divided between the processes that map them
+  uss  - pages private to the worker (what it actually costs)
+Linux only. Needs the backend's dependencies; no upstream APIs are called.
+
+Usage: python benchmarks/bench_prefork.py [--workers 4] [--json]
+"""
+
+import argparse
+import json
+import os
+import re
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_READY = re.compile(r"\[Serve\] Worker (\d+) ready")
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def memory_kb(pid: int) -> dict:
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[1].isdigit():
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    return {
+        "rss": fields.get("Rss", 0),
+        "pss": fields.get("Pss", 0),
+        "uss": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+    }
+
+
+def measure(mode: str, workers: int, timeout: float) -> dict:
+    port = free_port()
+    env = dict(os.environ, PYTHONUNBUFFERED="1")
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "serve.py", "--mode", mode, "--workers", str(workers),
+         "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=BASE_DIR, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+    )
+    pids = []
+    try:
+        while len(pids) < workers:
+            line = proc.stdout.readline()
+            if not line:
+                raise RuntimeError(f"serve.py exited early in {mode} mode")
+            if (m := _READY.search(line)):
+                pids.append(int(m.group(1)))
+            if time.perf_counter() - start > timeout:
+                raise RuntimeError(f"workers not ready after {timeout}s")
+        while True:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as r:
+                    if r.status == 200:
+                        break
+            except OSError:
+                time.sleep(0.05)
+        ready_s = time.perf_counter() - start
+
+        per_worker = [memory_kb(pid) for pid in pids]
+        totals = {k: sum(w[k] for w in per_worker) for k in ("rss", "pss", "uss")}
+        parent = memory_kb(proc.pid)
+        return {
+            "mode": mode,
+            "workers": workers,
+            "ready_s": round(ready_s, 2),
+            "parent_rss_mb": round(parent["rss"] / 1024, 1),
+            "avg_worker_mb": {k: round(v / workers / 1024, 1) for k, v in totals.items()},
+            # Parent + workers, shared pages counted once
+            "total_pss_mb": round((totals["pss"] + parent["pss"]) / 1024, 1),
+        }
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        try:
+            proc.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--timeout", type=float, default=300)
+    parser.add_argument("--json", action="store_true", help="print machine-readable results only")
+    args = parser.parse_args()
+
+    results = [measure(mode, args.workers, args.timeout) for mode in ("spawn", "prefork")]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print("=" * 78)
+    print(f"Pre-fork Benchmark ({args.workers} workers)")
+    print("=" * 78)
+    print(f"{'mode':<8} {'ready s':>8} {'RSS/worker':>11} {'PSS/worker':>11} {'USS/worker':>11} {'total PSS':>10}")
+    for r in results:
+        w = r["avg_worker_mb"]
+        print(f"{r['mode']:<8} {r['ready_s']:>8.2f} {w['rss']:>9.1f}MB {w['pss']:>9.1f}MB "
+              f"{w['uss']:>9.1f}MB {r['total_pss_mb']:>8.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Token-size benchmark for the weather payload that weather_planner stores in
+state.weather_data and every downstream agent re-reads.
+
+Feeds synthetic OpenWeatherMap 3-hour forecasts through the real WeatherService
+aggregation and get_weather_analysis, then compares:
+  legacy   - full day dicts, unrounded aggregates (previous behaviour)
+  full     - full day dicts, rounded at the source
+  compact  - utils/weather_codec.py row format (what agents now see)
+
+Tokens are approximated with a JSON-aware word/punctuation split (digit runs count
+one token per 3 digits), which tracks Gemini's tokenizer closely enough for
+relative comparisons.
+
+Usage: python benchmarks/bench_weather_payload.py [--days 1 3 5 7] [--json]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import random
+import re
+import sys
+from datetime import date, timedelta
+
+os.environ.setdefault("WEATHER_API_KEY", "benchmark")
+AGENT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "agent")
+sys.path.insert(0, AGENT_DIR)
+
+from services.weather_service import weather_service  # noqa: E402
+from tools import weather_tools  # noqa: E402
+from utils.weather_codec import expand_weather  # noqa: E402
+from utils.weather_helper import analyze_weather_suitability  # noqa: E402
+from utils.context_projection import CONTEXT_POLICIES  # noqa: E402
+
+_TOKEN = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]")
+CONDITIONS = ["clear sky", "few clouds", "scattered clouds", "light rain", "moderate rain", "overcast clouds"]
+
+
+def approx_tokens(text: str) -> int:
+    return sum(-(-len(t) // 3) if t.isdigit() else 1 for t in _TOKEN.findall(text))
+
+
+def synthetic_owm(days: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    start = date(2025, 1, 1)
+    items = []
+    for d in range(days):
+        base = rng.uniform(12, 36)
+        rainy = rng.random() < 0.35
+        for slot in range(8):
+            item = {
+                "dt_txt": f"{start + timedelta(days=d)} {slot * 3:02d}:00:00",
+                "main": {"temp": base + rng.uniform(-4, 4), "temp_min": base - rng.uniform(0, 6),
+                         "temp_max": base + rng.uniform(0, 6), "humidity": rng.uniform(35, 95)},
+                "wind": {"speed": rng.uniform(0.5, 12)},
+                "weather": [{"description": rng.choice(CONDITIONS[3:] if rainy else CONDITIONS[:3])}],
+            }
+            if rainy:
+                item["rain"] = {"3h": rng.uniform(0, 6)}
+            items.append(item)
+    return {"list": items}
+
+
+def legacy_round_trip(analysis: dict, owm: dict) -> dict:
+    """The pre-rounding payload: same structure, aggregates left at full float precision."""
+    raw = {}
+    for item in owm["list"]:
+        raw.setdefault(item["dt_txt"].split(" ")[0], []).append(item)
+    legacy = json.loads(json.dumps(analysis))
+    for day in legacy["daily_forecast"]:
+        items = raw[day["date"]]
+        day["min_temp"] = min(i["main"]["temp_min"] for i in items)
+        day["max_temp"] = max(i["main"]["temp_max"] for i in items)
+        day["avg_temp"] = sum(i["main"]["temp"] for i in items) / len(items)
+        day["precipitation"] = sum(i.get("rain", {}).get("3h", 0) for i in items)
+        day["wind_speed"] = max(i["wind"]["speed"] for i in items)
+        day["humidity"] = sum(i["main"]["humidity"] for i in items) / len(items)
+    return legacy
+
+
+def measure(days: int, seed: int) -> dict:
+    owm = synthetic_owm(days, seed)
+
+    async def fake_fetch(url, retries=3, timeout=10):
+        return owm
+
+    weather_service._fetch_json = fake_fetch
+    weather_tools._weather_cache.clear()
+    # get_weather_analysis drives the same event loop synchronously, as it does inside ADK tools
+    summary = asyncio.get_event_loop().run_until_complete(
+        weather_service.get_weather_summary_for_dates("Goa,IN", "", days))
+    full = analyze_weather_suitability(summary, "Goa")
+    compact = weather_tools.get_weather_analysis("Goa", "", days)
+    assert expand_weather(compact) == full, "compact encoding must round-trip"
+    legacy = legacy_round_trip(full, owm)
+
+    sizes = {}
+    for name, payload in (("legacy", legacy), ("full", full), ("compact", compact)):
+        text = json.dumps(payload)  # what ends up in the prompt after state serialization
+        sizes[name] = {"chars": len(text), "tokens": approx_tokens(text)}
+    return sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, nargs="+", default=[1, 3, 5, 7])
+    parser.add_argument("--seeds", type=int, default=20, help="synthetic forecasts per trip length")
+    parser.add_argument("--json", action="store_true", help="print machine-readable results only")
+    args = parser.parse_args()
+
+    # Copies per request: tool result fed back to weather_planner, its verbatim output,
+    # then one state block per agent that declares weather_data in CONTEXT_POLICIES
+    consumers = sum(1 for p in CONTEXT_POLICIES.values() if "weather_data" in p["state_keys"])
+    copies = 2 + consumers
+
+    asyncio.set_event_loop(asyncio.new_event_loop())
+    results = []
+    for days in args.days:
+        totals = {"legacy": 0, "full": 0, "compact": 0}
+        for seed in range(args.seeds):
+            with contextlib.redirect_stdout(io.StringIO()):  # the service logs every step
+                sizes = measure(days, seed)
+            for name in totals:
+                totals[name] += sizes[name]["tokens"]
+        avg = {name: total / args.seeds for name, total in totals.items()}
+        results.append({
+            "days": days,
+            "tokens_per_copy": {k: round(v, 1) for k, v in avg.items()},
+            "copies_per_request": copies,
+            "tokens_per_request": {k: round(v * copies) for k, v in avg.items()},
+            "saved_per_request_vs_legacy": round((avg["legacy"] - avg["compact"]) * copies),
+            "reduction_vs_legacy": round(1 - avg["compact"] / avg["legacy"], 4),
+        })
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print("=" * 72)
+    print(f"Weather Payload Benchmark ({copies} copies of weather_data per request)")
+    print("=" * 72)
+    print(f"{'days':>4}  {'legacy':>8}  {'full':>8}  {'compact':>8}  {'saved/request':>14}  {'reduction':>9}")
+    for r in results:
+        t = r["tokens_per_copy"]
+        print(f"{r['days']:>4}  {t['legacy']:>8.0f}  {t['full']:>8.0f}  {t['compact']:>8.0f}  "
+              f"{r['saved_per_request_vs_legacy']:>14,}  {r['reduction_vs_legacy']:>9.1%}")
+
+
+if __name__ == "__main__":
+    main()
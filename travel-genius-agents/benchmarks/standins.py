@@ -0,0 +1,310 @@
+"""
+Offline stand-ins for the paid backends, shared by the pipeline benchmarks.
+
+  StandInLlm       deterministic BaseLlm replacing Gemini: fixed latency plus a decode
+                   rate, answers shaped like each agent's real output (tool call for
+                   weather_planner, schema-valid TravelItinerary JSON for itinerary_generator)
+  StageRecorder    ADK plugin keeping every agent's wall time (for percentiles per stage)
+  MockUpstreams    local HTTP server for OpenWeatherMap, Open-Meteo and the Places API;
+                   .env() returns the *_BASE_URL variables that point the services at it
+
+Import after AGENT_DIR is on sys.path (the LLM stand-in uses the agent's request parser).
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from collections import defaultdict
+from typing import Any, AsyncGenerator, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+from google.adk.agents import LlmAgent
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.plugins.base_plugin import BasePlugin
+from google.genai import types
+
+# System-instruction markers of the agents whose output has a fixed shape
+_WEATHER_MARKER = "Weather Data Provider"
+_ITINERARY_MARKER = "Travel Genius - an expert"
+_ASSISTANT_MARKER = "Travel Genius assistant"
+
+_FILLER = ("local market heritage walk sunset viewpoint street food cooking class eco lodge "
+           "homestay ferry ride museum temple garden trail workshop cafe rooftop").split()
+
+
+def _seed(text: str) -> int:
+    return int(hashlib.sha1(text.encode()).hexdigest()[:8], 16)
+
+
+def _filler(tokens: int, seed: int) -> str:
+    return " ".join(_FILLER[(seed + i * 7) % len(_FILLER)] for i in range(max(1, tokens)))
+
+
+def _user_text(llm_request: LlmRequest) -> str:
+    for content in llm_request.contents or []:
+        if content.role == "user":
+            text = "".join(p.text or "" for p in content.parts or [])
+            if text.strip():
+                return text
+    return ""
+
+
+class StandInLlm(BaseLlm):
+    """Deterministic Gemini stand-in: same request in, same response out."""
+
+    latency_s: float = 0.4          # time to first token (network + prefill)
+    tokens_per_s: float = 150.0     # decode rate; output_tokens / tokens_per_s is added
+    output_tokens: int = 150        # free-text answer length; itineraries scale with it
+    calls: int = 0
+
+    @classmethod
+    def supported_models(cls):
+        return [r"stand-in.*"]
+
+    async def generate_content_async(self, llm_request: LlmRequest,
+                                     stream: bool = False) -> AsyncGenerator[LlmResponse, None]:
+        self.calls += 1
+        instruction = str(llm_request.config.system_instruction or "") if llm_request.config else ""
+        user_text = _user_text(llm_request)
+        last = llm_request.contents[-1] if llm_request.contents else None
+        tool_response = next((p.function_response for p in (last.parts or []) if p.function_response), None) \
+            if last else None
+
+        if _WEATHER_MARKER in instruction and tool_response is None:
+            from utils.request_parser import parse_trip_request
+            trip = parse_trip_request(user_text)
+            part = types.Part(function_call=types.FunctionCall(name="get_weather_analysis", args={
+                "destination": trip["destination"] or "Goa",
+                "start_date": date.today().isoformat(),
+                "duration_days": trip["days"],
+            }))
+            text, tokens = None, 20
+        elif _WEATHER_MARKER in instruction:
+            text = json.dumps(tool_response.response.get("result", tool_response.response)
+                              if isinstance(tool_response.response, dict) else tool_response.response)
+            part, tokens = None, len(text) // 4
+        elif _ITINERARY_MARKER in instruction:
+            text = json.dumps(self.itinerary(user_text))
+            part, tokens = None, len(text) // 4
+        elif _ASSISTANT_MARKER in instruction:
+            text = json.dumps({"answer": _filler(self.output_tokens // 2, _seed(user_text)), "emoji": "✨"})
+            part, tokens = None, self.output_tokens // 2
+        else:
+            text = _filler(self.output_tokens, _seed(instruction[:200] + user_text))
+            part, tokens = None, self.output_tokens
+
+        await asyncio.sleep(self.latency_s + tokens / self.tokens_per_s)
+        prompt_chars = sum(len(p.text or "") for c in llm_request.contents or [] for p in c.parts or [])
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[part or types.Part(text=text)]),
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=(prompt_chars + len(instruction)) // 4, candidates_token_count=tokens),
+        )
+
+    def itinerary(self, user_text: str) -> Dict[str, Any]:
+        from utils.request_parser import parse_trip_request
+        trip = parse_trip_request(user_text)
+        seed = _seed(user_text)
+        words = max(4, self.output_tokens // 12)
+        kinds = ["adventure", "food", "cultural", "instagram", "relaxation"]
+        plans = []
+        for day in range(1, trip["days"] + 1):
+            score = 3 + (seed + day) % 7
+            plans.append({
+                "day": day,
+                "activities": [{
+                    "id": f"d{day}a{i}",
+                    "title": _filler(3, seed + day * 10 + i).title(),
+                    "description": _filler(words, seed + day * 10 + i),
+                    "cost": 500 + 250 * i,
+                    "duration": f"{1 + i}h",
+                    "type": kinds[(seed + day + i) % len(kinds)],
+                    "timing": ["9:00 AM", "1:30 PM", "6:00 PM"][i],
+                    "rating": 4.0 + i / 10,
+                } for i in range(3)],
+                "weatherSummary": {"condition": "Sunny" if score > 6 else "Cloudy", "outdoorScore": score,
+                                   "indoorScore": 10 - score, "recommendations": [_filler(6, seed + day)]},
+            })
+        return {
+            "tripTitle": f"{trip['days']}-day trip to {trip['destination'] or 'Goa'}",
+            "totalEstimatedCost": 1500 * trip["days"] * 3,
+            "dailyPlans": plans,
+            "weatherOptimized": True,
+            "sustainabilityScore": 7.5,
+            "weatherSummary": {"overallScore": 7.0, "suitableForOutdoor": True, "alerts": [],
+                               "recommendations": [_filler(8, seed)]},
+            "aiRecommendations": [_filler(8, seed + 1), _filler(8, seed + 2)],
+            "instagramSpots": [_filler(2, seed + 3).title()],
+            "generatedBy": "AI Travel Genius",
+            "generatedAt": datetime.now(timezone.utc).isoformat(),
+        }
+
+
+def install_stand_in_llm(agent, **settings) -> StandInLlm:
+    """Point every LlmAgent under `agent` at one shared StandInLlm (in place)."""
+    # Keeps a Gemini model name: built-in tools (google_search) refuse other models
+    llm = StandInLlm(model="gemini-2.0-flash", **settings)
+
+    def walk(node):
+        if isinstance(node, LlmAgent):
+            node.model = llm
+        for child in node.sub_agents:
+            walk(child)
+
+    walk(agent)
+    return llm
+
+
+class StageRecorder(BasePlugin):
+    """Raw before_agent -> after_agent durations (ms) per agent; drain() hands them over and resets."""
+
+    def __init__(self):
+        super().__init__(name="bench_stage_recorder")
+        self._open: Dict[tuple, float] = {}
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+
+    async def before_agent_callback(self, *, agent, callback_context):
+        self._open[(callback_context.invocation_id, agent.name)] = time.perf_counter()
+
+    async def after_agent_callback(self, *, agent, callback_context):
+        started = self._open.pop((callback_context.invocation_id, agent.name), None)
+        if started is not None:
+            self.samples[agent.name].append((time.perf_counter() - started) * 1000)
+
+    def drain(self) -> Dict[str, List[float]]:
+        samples, self.samples = dict(self.samples), defaultdict(list)
+        self._open.clear()
+        return samples
+
+
+# ---------- UPSTREAM HTTP MOCKS ----------
+class _Handler(BaseHTTPRequestHandler):
+    server: "MockUpstreams"
+
+    def log_message(self, *args):  # keep benchmark output clean
+        pass
+
+    def _reply(self, payload: Dict[str, Any]) -> None:
+        time.sleep(self.server.latency_s)
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        self.server.count(url.path)
+        if url.path == "/owm/forecast":
+            self._reply(owm_forecast(query.get("q", "")))
+        elif url.path == "/owm/weather":
+            day = owm_forecast(query.get("q", ""))["list"][0]
+            self._reply({"weather": day["weather"], "main": {**day["main"], "feels_like": day["main"]["temp"]}})
+        elif url.path == "/open-meteo/forecast":
+            self._reply(open_meteo_forecast(query.get("latitude", "0"), int(query.get("forecast_days", "5"))))
+        elif url.path == "/open-meteo-geo/search":
+            self._reply({"results": [{"latitude": 15.3, "longitude": 74.1}]})
+        else:
+            self.send_error(404)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+        path = urlparse(self.path).path
+        self.server.count(path)
+        if path == "/places/places:searchText":
+            self._reply({"places": [{"displayName": {"text": body.get("textQuery", "Goa")},
+                                     "formattedAddress": f"{body.get('textQuery', 'Goa')}, India",
+                                     "location": {"latitude": 15.3, "longitude": 74.1},
+                                     "types": ["locality"], "rating": 4.5}]})
+        elif path == "/places/places:searchNearby":
+            self._reply({"places": [{"displayName": {"text": f"Place {i}"}, "types": ["tourist_attraction"],
+                                     "rating": 4.0 + i / 10, "priceLevel": "PRICE_LEVEL_MODERATE",
+                                     "location": {"latitude": 15.3, "longitude": 74.1}} for i in range(10)]})
+        else:
+            self.send_error(404)
+
+
+def owm_forecast(query: str, days: int = 5) -> Dict[str, Any]:
+    """OpenWeatherMap /forecast: 3-hour steps from today, deterministic per query."""
+    seed = _seed(query)
+    start = datetime.combine(date.today(), datetime.min.time())
+    items = []
+    for step in range(days * 8):
+        t = start + timedelta(hours=3 * step)
+        temp = 24 + 6 * math.sin((step % 8) / 8 * 2 * math.pi) + (seed % 7) - 3
+        rainy = (seed + step // 8) % 4 == 0
+        items.append({
+            "dt_txt": t.strftime("%Y-%m-%d %H:%M:%S"),
+            "main": {"temp": temp, "temp_min": temp - 1.5, "temp_max": temp + 1.5, "humidity": 60 + (step % 5) * 4},
+            "weather": [{"description": "light rain" if rainy else "clear sky"}],
+            "wind": {"speed": 2 + (seed + step) % 6},
+            **({"rain": {"3h": 1.2}} if rainy else {}),
+        })
+    return {"list": items}
+
+
+def open_meteo_forecast(latitude: str, days: int) -> Dict[str, Any]:
+    seed = _seed(latitude)
+    dates = [(date.today() + timedelta(days=i)).isoformat() for i in range(days)]
+    return {"daily": {
+        "time": dates,
+        "weather_code": [61 if (seed + i) % 4 == 0 else 1 for i in range(days)],
+        "temperature_2m_max": [30 + (seed + i) % 4 for i in range(days)],
+        "temperature_2m_min": [22 + (seed + i) % 3 for i in range(days)],
+        "temperature_2m_mean": [26 + (seed + i) % 3 for i in range(days)],
+        "precipitation_sum": [4.0 if (seed + i) % 4 == 0 else 0.0 for i in range(days)],
+        "wind_speed_10m_max": [4.0] * days,
+        "relative_humidity_2m_mean": [70] * days,
+        "uv_index_max": [7] * days,
+    }}
+
+
+class MockUpstreams(ThreadingHTTPServer):
+    """OpenWeatherMap, Open-Meteo and Places on one local port (served from a daemon thread)."""
+
+    daemon_threads = True
+
+    def __init__(self, latency_s: float = 0.05, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), _Handler)
+        self.latency_s = latency_s
+        self.requests: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def count(self, path: str) -> None:
+        with self._lock:
+            self.requests[path] = self.requests.get(path, 0) + 1
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.server_address[0]}:{self.server_address[1]}"
+
+    def env(self) -> Dict[str, str]:
+        return {
+            "OPENWEATHERMAP_BASE_URL": f"{self.base_url}/owm",
+            "WEATHER_SECONDARY_PROVIDER": "open-meteo",  # the stand-in serves it, so hedging is exercised
+            "OPEN_METEO_BASE_URL": f"{self.base_url}/open-meteo",
+            "OPEN_METEO_GEOCODING_URL": f"{self.base_url}/open-meteo-geo",
+            "PLACES_API_BASE_URL": f"{self.base_url}/places",
+            "WEATHER_API_KEY": "stand-in",
+            "GOOGLE_MAPS_API_KEY": "stand-in",
+        }
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever, name="mock-upstreams", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Multi-worker launcher for the Travel Genius API.
+
+  prefork (default)  the parent imports app.py, the agent graph (agent.agent: agents, tools,
+                     LLMObs, MCP toolbox) and the static indexes once, freezes the GC and
+                     forks the workers. They share those pages copy-on-write and only rebuild
+                     per-process network clients (utils/forksafe.py, session_store.py hooks).
+  spawn              what `uvicorn app:app --workers N` does: every worker is a fresh
+                     interpreter that repeats the full import. Kept for comparison.
+
+All workers accept on one listening socket opened by the parent. A worker that dies is
+replaced; SIGINT/SIGTERM stops them all.
+
+Usage: python serve.py [--workers 4] [--host 0.0.0.0] [--port 8000] [--mode prefork|spawn]
+"""
+
+import argparse
+import gc
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def preload():
+    """Import everything a worker needs before it can serve the first request."""
+    os.chdir(BASE_DIR)
+    if BASE_DIR not in sys.path:
+        sys.path.insert(0, BASE_DIR)
+    import app as app_module
+    app_module.get_stream_runner()  # agent.agent: the agent graph, tools, LLMObs, MCP toolbox
+    from utils.destination_resolver import destination_resolver
+    from utils.gazetteer import destination_extractor
+    destination_resolver.resolve("Goa")  # touch the static indexes so their pages are final
+    destination_extractor.extract("Goa")
+    return app_module.app
+
+
+def _worker(sock: socket.socket, launched_at: float, log_level: str) -> None:
+    import uvicorn
+
+    app = preload()  # already imported in prefork mode, so this is a dictionary lookup
+    print(f"[Serve] Worker {os.getpid()} ready in {time.time() - launched_at:.2f}s", flush=True)
+    config = uvicorn.Config(app, log_level=log_level, lifespan="on")
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def _bind(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1)))
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--mode", choices=("prefork", "spawn"), default="prefork")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    started = time.time()
+    sock = _bind(args.host, args.port)
+    if args.mode == "prefork":
+        preload()
+        # Objects allocated so far move to a permanent generation the collector never walks,
+        # so GC passes in the workers do not write to (and un-share) the inherited pages
+        gc.freeze()
+        print(f"[Serve] Parent {os.getpid()} preloaded in {time.time() - started:.2f}s", flush=True)
+    ctx = multiprocessing.get_context("fork" if args.mode == "prefork" else "spawn")
+
+    def launch():
+        proc = ctx.Process(target=_worker, args=(sock, time.time(), args.log_level), daemon=False)
+        proc.start()
+        return proc
+
+    workers = [launch() for _ in range(args.workers)]
+    print(f"[Serve] {args.mode} mode: {args.workers} workers on {args.host}:{args.port}", flush=True)
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for proc in workers:
+            if proc.is_alive():
+                proc.terminate()
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    while not stopping:
+        for i, proc in enumerate(workers):
+            if not proc.is_alive() and not stopping:
+                print(f"[Serve] ⚠️ Worker {proc.pid} exited ({proc.exitcode}); restarting", flush=True)
+                workers[i] = launch()
+        time.sleep(0.5)
+
+    for proc in workers:
+        proc.join(timeout=10)
+        if proc.is_alive():
+            proc.kill()
+    sock.close()
+
+
+if __name__ == "__main__":
+    main()